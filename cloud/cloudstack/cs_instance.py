@@ -30,7 +30,8 @@ options:
   name:
     description:
       - Host name of the instance. C(name) can only contain ASCII letters.
-    required: true
+      - Required unless C(instances) is given.
+    required: false
   display_name:
     description:
       - Custom display name of the instances.
@@ -168,6 +169,36 @@ options:
       - Poll async jobs until job has finished.
     required: false
     default: true
+  lookup_cache:
+    description:
+      - Path of a file used to cache the listings of service offerings, templates, ISOs, disk offerings and networks across runs.
+      - Names, display texts and IDs are resolved from hash indexes built over the cached listings.
+      - The file can be shared by concurrent and subsequent runs against the same API endpoint.
+      - If not set, listings are only cached for the duration of a single run.
+    required: false
+    default: null
+    version_added: '2.0'
+  lookup_cache_ttl:
+    description:
+      - Seconds a cached listing is considered valid.
+    required: false
+    default: 300
+    version_added: '2.0'
+  lookup_cache_invalidate:
+    description:
+      - Discard all listings in C(lookup_cache) before resolving names, e.g. after offerings or templates were changed.
+    required: false
+    default: false
+    version_added: '2.0'
+  instances:
+    description:
+      - List of instances to deploy in one batch, only supported with C(state=present).
+      - Each entry is a dictionary with a required C(name) and optionally C(display_name), C(group), C(service_offering), C(template), C(iso), C(networks), C(ip_address), C(ip6_address), C(disk_offering), C(disk_size), C(keyboard), C(hypervisor), C(security_groups), C(affinity_groups), C(user_data), C(ssh_key) and C(tags). Omitted keys default to the module options of the same name.
+      - All deployments are submitted first and their async jobs are then polled together, so the batch takes about as long as the slowest deployment.
+      - Existing instances are left untouched.
+    required: false
+    default: null
+    version_added: '2.0'
 extends_documentation_fragment: cloudstack
 '''
 
@@ -217,10 +248,38 @@ EXAMPLES = '''
 
 # Remove a instance
 - local_action: cs_instance name=web-vm-1 state=absent
+
+# Deploy a batch of instances and wait for all of them at once
+- local_action:
+    module: cs_instance
+    template: Linux Debian 7 64-bit
+    service_offering: Tiny
+    zone: ch-zrh-ix-01
+    instances:
+      - name: web-vm-1
+      - name: web-vm-2
+      - name: db-vm-1
+        service_offering: 2cpu_2gb
+
+# Deploy many instances, resolving offerings, templates and networks from a shared lookup cache
+- local_action:
+    module: cs_instance
+    name: "{{ inventory_hostname_short }}"
+    template: Linux Debian 7 64-bit
+    service_offering: Tiny
+    networks:
+      - Server Integration
+    lookup_cache: /tmp/cs_lookup_cache.json
+    lookup_cache_ttl: 600
 '''
 
 RETURN = '''
 ---
+instances:
+  description: Results of a batch deployment, one entry per requested instance with the same keys as a single instance result.
+  returned: success, if C(instances) is given
+  type: list
+  sample: [ { "name": "web-vm-1", "id": "04589590-ac63-4ffc-93f5-b698b8ac38b6", "state": "Running", "changed": true } ]
 id:
   description: ID of the instance.
   returned: success
@@ -339,6 +398,11 @@ instance_name:
 '''
 
 import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
 
 try:
     from cs import CloudStack, CloudStackException, read_config
@@ -350,6 +414,99 @@ except ImportError:
 from ansible.module_utils.cloudstack import *
 
 
+class CloudStackLookupCache(object):
+    """Cache of CloudStack list API results, optionally backed by a file.
+
+    Listings are keyed by the API endpoint, key, domain, account and project
+    they were fetched with, and by API command and arguments, and expire
+    after ttl seconds. Hash indexes over the listings resolve names, display texts
+    and IDs without scanning.
+    """
+
+    def __init__(self, module, path=None, ttl=300):
+        self.module = module
+        self.path = path
+        self.ttl = ttl
+        self.listings = {}
+        self.indexes = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                f = open(path)
+                try:
+                    self.listings = json.load(f)
+                finally:
+                    f.close()
+            except (IOError, ValueError):
+                self.listings = {}
+
+
+    def _get_identity(self, cs):
+        # listings differ per endpoint and per account, the API key is only stored hashed
+        api_key = getattr(cs, 'key', None) or ''
+        return '|'.join([
+            str(getattr(cs, 'endpoint', None)),
+            hashlib.sha1(api_key).hexdigest(),
+            str(self.module.params.get('domain')),
+            str(self.module.params.get('account')),
+            str(self.module.params.get('project')),
+        ])
+
+
+    def _get_key(self, cs, command, args):
+        key_args = ['%s=%s' % (k, args[k]) for k in sorted(args.keys()) if args[k] is not None]
+        return '%s %s?%s' % (self._get_identity(cs), command, '&'.join(key_args))
+
+
+    def invalidate(self, command=None):
+        for key in list(self.listings.keys()):
+            if command is None or key.split(' ', 1)[-1].startswith(command + '?'):
+                del self.listings[key]
+                self.dirty = True
+        self.indexes = {}
+
+
+    def get_list(self, cs, command, result_key, **args):
+        key = self._get_key(cs, command, args)
+        entry = self.listings.get(key)
+        if entry is None or time.time() - entry['time'] > self.ttl:
+            res = getattr(cs, command)(**args)
+            if 'errortext' in res:
+                self.module.fail_json(msg="Failed: '%s'" % res['errortext'])
+            entry = {'time': time.time(), 'items': res.get(result_key, [])}
+            self.listings[key] = entry
+            self.indexes.pop(key, None)
+            self.dirty = True
+        return key, entry['items']
+
+
+    def find(self, cs, command, result_key, value, fields, **args):
+        key, items = self.get_list(cs, command, result_key, **args)
+        index = self.indexes.get(key)
+        if index is None:
+            index = {}
+            # the first item matching any of the fields wins, like a linear scan would
+            for item in items:
+                for field in fields:
+                    if field in item:
+                        index.setdefault(item[field], item)
+            self.indexes[key] = index
+        return index.get(value)
+
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump(self.listings, f)
+        finally:
+            f.close()
+        self.module.atomic_move(tmp_path, self.path)
+        self.dirty = False
+
+
 class AnsibleCloudStackInstance(AnsibleCloudStack):
 
     def __init__(self, module):
@@ -357,19 +514,25 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         self.instance = None
         self.template = None
         self.iso = None
+        lookup_cache = module.params.get('lookup_cache')
+        if lookup_cache:
+            lookup_cache = os.path.expanduser(lookup_cache)
+        self.lookup_cache = CloudStackLookupCache(module, lookup_cache, module.params.get('lookup_cache_ttl'))
+        if module.params.get('lookup_cache_invalidate'):
+            self.lookup_cache.invalidate()
 
 
     def get_service_offering_id(self):
         service_offering = self.module.params.get('service_offering')
 
-        service_offerings = self.cs.listServiceOfferings()
-        if service_offerings:
-            if not service_offering:
-                return service_offerings['serviceoffering'][0]['id']
-
-            for s in service_offerings['serviceoffering']:
-                if service_offering in [ s['name'], s['id'] ]:
-                    return s['id']
+        if not service_offering:
+            key, service_offerings = self.lookup_cache.get_list(self.cs, 'listServiceOfferings', 'serviceoffering')
+            if service_offerings:
+                return service_offerings[0]['id']
+        else:
+            s = self.lookup_cache.find(self.cs, 'listServiceOfferings', 'serviceoffering', service_offering, [ 'name', 'id' ])
+            if s:
+                return s['id']
         self.module.fail_json(msg="Service offering '%s' not found" % service_offering)
 
 
@@ -395,24 +558,20 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
                 return self._get_by_key(key, self.template)
 
             args['templatefilter'] = 'executable'
-            templates = self.cs.listTemplates(**args)
-            if templates:
-                for t in templates['template']:
-                    if template in [ t['displaytext'], t['name'], t['id'] ]:
-                        self.template = t
-                        return self._get_by_key(key, self.template)
+            t = self.lookup_cache.find(self.cs, 'listTemplates', 'template', template, [ 'displaytext', 'name', 'id' ], **args)
+            if t:
+                self.template = t
+                return self._get_by_key(key, self.template)
             self.module.fail_json(msg="Template '%s' not found" % template)
 
         elif iso:
             if self.iso:
                 return self._get_by_key(key, self.iso)
             args['isofilter'] = 'executable'
-            isos = self.cs.listIsos(**args)
-            if isos:
-                for i in isos['iso']:
-                    if iso in [ i['displaytext'], i['name'], i['id'] ]:
-                        self.iso = i
-                        return self._get_by_key(key, self.iso)
+            i = self.lookup_cache.find(self.cs, 'listIsos', 'iso', iso, [ 'displaytext', 'name', 'id' ], **args)
+            if i:
+                self.iso = i
+                return self._get_by_key(key, self.iso)
             self.module.fail_json(msg="ISO '%s' not found" % iso)
 
 
@@ -422,11 +581,9 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         if not disk_offering:
             return None
 
-        disk_offerings = self.cs.listDiskOfferings()
-        if disk_offerings:
-            for d in disk_offerings['diskoffering']:
-                if disk_offering in [ d['displaytext'], d['name'], d['id'] ]:
-                    return d['id']
+        d = self.lookup_cache.find(self.cs, 'listDiskOfferings', 'diskoffering', disk_offering, [ 'displaytext', 'name', 'id' ])
+        if d:
+            return d['id']
         self.module.fail_json(msg="Disk offering '%s' not found" % disk_offering)
 
 
@@ -460,18 +617,17 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         args['projectid']   = self.get_project(key='id')
         args['zoneid']      = self.get_zone(key='id')
 
-        networks = self.cs.listNetworks(**args)
+        key, networks = self.lookup_cache.get_list(self.cs, 'listNetworks', 'network', **args)
         if not networks:
             self.module.fail_json(msg="No networks available")
 
         network_ids = []
         network_displaytexts = []
         for network_name in network_names:
-            for n in networks['network']:
-                if network_name in [ n['displaytext'], n['name'], n['id'] ]:
-                    network_ids.append(n['id'])
-                    network_displaytexts.append(n['name'])
-                    break
+            n = self.lookup_cache.find(self.cs, 'listNetworks', 'network', network_name, [ 'displaytext', 'name', 'id' ], **args)
+            if n:
+                network_ids.append(n['id'])
+                network_displaytexts.append(n['name'])
 
         if len(network_ids) != len(network_names):
             self.module.fail_json(msg="Could not find all networks, networks list found: %s" % network_displaytexts)
@@ -505,7 +661,7 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         return display_name
 
 
-    def deploy_instance(self):
+    def deploy_instance(self, poll_async=None):
         self.result['changed'] = True
 
         args                        = {}
@@ -539,12 +695,116 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
             if 'errortext' in instance:
                 self.module.fail_json(msg="Failed: '%s'" % instance['errortext'])
 
-            poll_async = self.module.params.get('poll_async')
+            if poll_async is None:
+                poll_async = self.module.params.get('poll_async')
             if poll_async:
                 instance = self._poll_job(instance, 'virtualmachine')
         return instance
 
 
+    def deploy_instances(self, specs):
+        params = self.module.params
+        deployed = []
+        results = []
+
+        # one listing to find the instances which already exist
+        args                = {}
+        args['account']     = self.get_account(key='name')
+        args['domainid']    = self.get_domain(key='id')
+        args['projectid']   = self.get_project(key='id')
+        instances = self.cs.listVirtualMachines(**args)
+        existing = {}
+        if instances:
+            for v in instances['virtualmachine']:
+                existing.setdefault(v['name'], v)
+
+        try:
+            # submit all deployments up front
+            for spec in specs:
+                self.module.params = dict(params, **spec)
+                self.instance = existing.get(spec['name'])
+                self.template = None
+                self.iso = None
+                if self.instance:
+                    results.append({'instance': self.instance, 'changed': False})
+                else:
+                    self.instance = self.deploy_instance(poll_async=False)
+                    result = {'instance': self.instance, 'changed': True, 'params': self.module.params}
+                    results.append(result)
+                    deployed.append(result)
+        finally:
+            self.module.params = params
+
+        if not self.module.check_mode and params.get('poll_async'):
+            jobs = self.poll_jobs([result['instance'] for result in deployed], 'virtualmachine')
+            for result, (instance, error) in zip(deployed, jobs):
+                result['instance'] = instance
+                if error:
+                    result['error'] = error
+
+        errors = []
+        instance_results = []
+        for spec, result in zip(specs, results):
+            if 'error' in result:
+                errors.append("%s: %s" % (spec['name'], result['error']))
+            elif result['changed'] and result['instance'] and result['params'].get('tags') is not None:
+                self.module.params = result['params']
+                try:
+                    result['instance'] = self.ensure_tags(resource=result['instance'], resource_type='UserVm')
+                finally:
+                    self.module.params = params
+            instance_results.append(self.get_instance_result(spec['name'], result))
+
+        self.result['instances'] = instance_results
+        if errors:
+            self.module.fail_json(msg="Failed to deploy instances: %s" % '; '.join(errors), **self.result)
+        return self.result
+
+
+    def poll_jobs(self, jobs, key=None):
+        """Poll many async jobs in a single loop, backing off while none of them finishes.
+        Returns a (result, error) tuple for each job."""
+        results = [ (job, None) for job in jobs ]
+        pending = {}
+        for i, job in enumerate(jobs):
+            if job and 'jobid' in job:
+                pending[i] = job['jobid']
+
+        delay = 1
+        while pending:
+            finished = False
+            for i, job_id in list(pending.items()):
+                res = self.cs.queryAsyncJobResult(jobid=job_id)
+                if res['jobstatus'] != 0 and 'jobresult' in res:
+                    if 'errortext' in res['jobresult']:
+                        results[i] = (jobs[i], res['jobresult']['errortext'])
+                    elif key and key in res['jobresult']:
+                        results[i] = (res['jobresult'][key], None)
+                    del pending[i]
+                    finished = True
+            if pending:
+                if finished:
+                    delay = 1
+                else:
+                    delay = min(delay * 1.5, 10)
+                time.sleep(delay)
+        return results
+
+
+    def get_instance_result(self, name, batch_result):
+        result = self.result
+        self.result = {}
+        try:
+            instance_result = self.get_result(batch_result['instance'])
+        finally:
+            self.result = result
+        instance_result.setdefault('name', name)
+        instance_result['changed'] = batch_result['changed']
+        if 'error' in batch_result:
+            instance_result['error'] = batch_result['error']
+        return instance_result
+
+
     def update_instance(self, instance):
         args_service_offering                       = {}
         args_service_offering['id']                 = instance['id']
@@ -781,7 +1041,7 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
 def main():
     module = AnsibleModule(
         argument_spec = dict(
-            name = dict(required=True),
+            name = dict(default=None),
             display_name = dict(default=None),
             group = dict(default=None),
             state = dict(choices=['present', 'deployed', 'started', 'stopped', 'restarted', 'absent', 'destroyed', 'expunged'], default='present'),
@@ -806,6 +1066,10 @@ def main():
             force = dict(choices=BOOLEANS, default=False),
             tags = dict(type='list', aliases=[ 'tag' ], default=None),
             poll_async = dict(choices=BOOLEANS, default=True),
+            lookup_cache = dict(default=None),
+            lookup_cache_ttl = dict(type='int', default=300),
+            lookup_cache_invalidate = dict(choices=BOOLEANS, default=False),
+            instances = dict(type='list', default=None),
             api_key = dict(default=None),
             api_secret = dict(default=None, no_log=True),
             api_url = dict(default=None),
@@ -815,17 +1079,42 @@ def main():
         required_together = (
             ['api_key', 'api_secret', 'api_url'],
         ),
+        required_one_of = (
+            ['name', 'instances'],
+        ),
+        mutually_exclusive = (
+            ['name', 'instances'],
+        ),
         supports_check_mode=True
     )
 
     if not has_lib_cs:
         module.fail_json(msg="python library cs required: pip install cs")
 
+    batch_keys = [ 'name', 'display_name', 'group', 'service_offering', 'template', 'iso', 'networks', 'ip_address',
+                   'ip6_address', 'disk_offering', 'disk_size', 'keyboard', 'hypervisor', 'security_groups',
+                   'affinity_groups', 'user_data', 'ssh_key', 'tags' ]
+    instances = module.params.get('instances')
+    if instances:
+        if module.params.get('state') not in ['present', 'deployed']:
+            module.fail_json(msg="Batch deployment with instances is only supported for state=present.")
+        for spec in instances:
+            if not isinstance(spec, dict) or not spec.get('name'):
+                module.fail_json(msg="Every entry of instances needs a name.")
+            unsupported = [ k for k in spec.keys() if k not in batch_keys ]
+            if unsupported:
+                module.fail_json(msg="Unsupported keys for instance %s: %s" % (spec['name'], ', '.join(unsupported)))
+
     try:
         acs_instance = AnsibleCloudStackInstance(module)
 
         state = module.params.get('state')
 
+        if instances:
+            result = acs_instance.deploy_instances(instances)
+            acs_instance.lookup_cache.save()
+            module.exit_json(**result)
+
         if state in ['absent', 'destroyed']:
             instance = acs_instance.absent_instance()
 
@@ -848,6 +1137,7 @@ def main():
             module.fail_json(msg="Instance named '%s' in error state." % module.params.get('name'))
 
         result = acs_instance.get_result(instance)
+        acs_instance.lookup_cache.save()
 
     except CloudStackException, e:
         module.fail_json(msg='CloudStackException: %s' % str(e))
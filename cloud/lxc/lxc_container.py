@@ -31,7 +31,28 @@ options:
     name:
         description:
           - Name of a container.
-        required: true
+          - Required unless C(containers) is given.
+        required: false
+    containers:
+        description:
+          - List of containers to manage in one run. Every entry is a dict
+            of options of this module and needs a C(name), options not set
+            in an entry are taken from the module options.
+          - Entries sharing a C(name) describe one container, they are used
+            to create several clones of it through C(clone_name). The other
+            options of the first of these entries apply to the container.
+          - The origins of clones are created and stopped first. The clones
+            are then created, snapshot clones concurrently. Finally every
+            container is brought into its requested state. Clones are left
+            stopped unless they have an entry of their own.
+        required: false
+        version_added: 2.0
+    workers:
+        description:
+          - Number of containers of C(containers) managed concurrently.
+        required: false
+        default: 4
+        version_added: 2.0
     backing_store:
         choices:
           - dir
@@ -148,11 +169,47 @@ options:
         choices:
           - gzip
           - bzip2
+          - xz
+          - pigz
+          - pbzip2
           - none
         description:
           - Type of compression to use when creating an archive of a running
-            container.
+            container. C(pigz), C(pbzip2) and C(xz) compress using all of the
+            available CPUs.
         default: gzip
+    archive_mode:
+        choices:
+          - stream
+          - copy
+          - incremental
+        description:
+          - How the archive is built. C(stream) tars the container directly
+            from the frozen container, the LVM snapshot or the mounted
+            overlayfs layers into the compressor. C(copy) rsyncs the
+            container into a temporary directory first and archives the copy.
+          - C(incremental) streams like C(stream) but keeps a manifest of
+            every path, named C(<name>.manifest.json), in C(archive_path).
+            The first run writes a full archive, following runs only write
+            the new and changed files along with a list of deleted files.
+        default: stream
+        version_added: 2.0
+    archive_max_deltas:
+        description:
+          - Number of delta archives written by C(archive_mode=incremental)
+            before the next run writes a new full archive.
+        default: 14
+        version_added: 2.0
+    archive_restore_path:
+        description:
+          - Restore the incremental archives of the container into this
+            directory, replaying the last full archive and every delta after
+            it. The directory has to be empty or missing.
+          - When set, no other action is performed on the container, its
+            C(state) and the other container options are not applied. It
+            cannot be combined with C(archive) or C(clone_name).
+        required: false
+        version_added: 2.0
     state:
         choices:
           - started
@@ -172,6 +229,15 @@ options:
         description:
           - list of 'key=value' options to use when configuring a container.
         required: false
+    state_timeout:
+        description:
+          - Number of seconds the module waits, in total, for the container
+            to reach the requested states. Transitions are retried with an
+            exponential backoff until this budget is spent. The time taken
+            by each transition is returned in "transitions".
+        required: false
+        default: 120
+        version_added: 2.0
 requirements:
   - 'lxc >= 1.0 # OS package'
   - 'python >= 2.6 # OS Package'
@@ -192,7 +258,9 @@ notes:
   - If "archive" is **true** the system will attempt to create a compressed
     tarball of the running container. The "archive" option supports LVM backed
     containers and will create a snapshot of the running container when
-    creating the archive.
+    creating the archive. LVM backed containers are only frozen while the
+    snapshot is taken. The archive size, duration and throughput are
+    returned in the "archive_stats" key.
   - If your distro does not have a package for "python2-lxc", which is a
     requirement for this module, it can be installed from source at
     "https://github.com/lxc/python2-lxc" or installed via pip using the package
@@ -306,6 +374,43 @@ EXAMPLES = """
           echo 'hello world.' | tee /opt/found-started
       fi
 
+# Create three snapshot clones of a template container concurrently and
+# start one of them.
+- name: Create clones of a template container
+  lxc_container:
+    template: ubuntu
+    backing_store: overlayfs
+    workers: 8
+    containers:
+      - name: test-container-template
+        state: stopped
+        clone_name: test-container-web1
+      - name: test-container-template
+        clone_name: test-container-web2
+      - name: test-container-template
+        clone_name: test-container-web3
+      - name: test-container-web1
+        state: started
+
+# Create a nightly incremental archive of a container. A full archive is
+# written on the first run and after every 6 deltas, the archive is
+# compressed using all of the available CPUs.
+- name: Create an incremental archive of a container
+  lxc_container:
+    name: test-container-started
+    archive: true
+    archive_mode: incremental
+    archive_max_deltas: 6
+    archive_path: /opt/archives
+    archive_compression: pigz
+
+# Replay the incremental archives of a container into a directory.
+- name: Restore the incremental archives of a container
+  lxc_container:
+    name: test-container-started
+    archive_path: /opt/archives
+    archive_restore_path: /opt/restore/test-container-started
+
 # Create an archive of an existing container, save the archive to a defined
 # path and then destroy it.
 - name: Archive container
@@ -381,6 +486,11 @@ EXAMPLES = """
 """
 
 
+import hashlib
+import json
+import stat
+import threading
+
 try:
     import lxc
 except ImportError:
@@ -394,19 +504,48 @@ else:
 LXC_COMPRESSION_MAP = {
     'gzip': {
         'extension': 'tar.tgz',
-        'argument': '-czf'
+        'program': 'gzip'
     },
     'bzip2': {
         'extension': 'tar.bz2',
-        'argument': '-cjf'
+        'program': 'bzip2'
+    },
+    'xz': {
+        'extension': 'tar.xz',
+        'program': 'xz',
+        'options': '-T0'
+    },
+    'pigz': {
+        'extension': 'tar.tgz',
+        'program': 'pigz'
+    },
+    'pbzip2': {
+        'extension': 'tar.bz2',
+        'program': 'pbzip2'
     },
     'none': {
         'extension': 'tar',
-        'argument': '-cf'
+        'program': None
     }
 }
 
 
+# LXC_ARCHIVE_DELETED is the archive member listing the paths removed since
+# the previous incremental archive.
+LXC_ARCHIVE_DELETED = '.lxc-archive-deleted'
+
+
+# LXC_BACKOFF_START and LXC_BACKOFF_MAX are the first and the largest delay,
+# in seconds, between attempts to move a container into a new state.
+LXC_BACKOFF_START = 0.1
+LXC_BACKOFF_MAX = 5
+
+
+# LXC_LVM_CACHE_LOCK guards the LVM information shared between the
+# containers managed in a batch.
+LXC_LVM_CACHE_LOCK = threading.RLock()
+
+
 # LXC_COMMAND_MAP is a map of variables that are available to a method based
 # on the state the container is in.
 LXC_COMMAND_MAP = {
@@ -553,20 +692,29 @@ def create_script(command):
 
 
 class LxcContainerManagement(object):
-    def __init__(self, module):
+    def __init__(self, module, lvm_cache=None):
         """Management of LXC containers via Ansible.
 
         :param module: Processed Ansible Module.
         :type module: ``object``
+        :param lvm_cache: LVM information shared between the containers of
+                          a batch.
+        :type lvm_cache: ``dict``
         """
         self.module = module
+        if lvm_cache is None:
+            lvm_cache = dict()
+        self.lvm_cache = lvm_cache
         self.state = self.module.params.get('state', None)
         self.state_change = False
         self.lxc_vg = None
         self.container_name = self.module.params['name']
         self.container = self.get_container_bind()
         self.archive_info = None
+        self.archive_stats = None
         self.clone_info = None
+        self.wait_remaining = float(self.module.params['state_timeout'])
+        self.transitions = list()
 
     def get_container_bind(self):
         return lxc.Container(name=self.container_name)
@@ -729,7 +877,7 @@ class LxcContainerManagement(object):
         if config_change:
             container_state = self._get_state()
             if container_state != 'stopped':
-                self.container.stop()
+                self._container_stop()
 
             with open(container_config_file, 'wb') as f:
                 f.writelines(container_config)
@@ -739,7 +887,7 @@ class LxcContainerManagement(object):
                 self._container_startup()
             elif container_state == 'frozen':
                 self._container_startup()
-                self.container.freeze()
+                self._container_freeze()
 
     def _container_create_clone(self):
         """Clone a new LXC container from an existing container.
@@ -760,8 +908,30 @@ class LxcContainerManagement(object):
         # Ensure that the state of the original container is stopped
         container_state = self._get_state()
         if container_state != 'stopped':
-            self.state_change = True
-            self.container.stop()
+            self._container_stop()
+
+        self._clone()
+
+        # Restore the original state of the origin container if it was
+        # not in a stopped state.
+        if container_state == 'running':
+            self._container_startup()
+        elif container_state == 'frozen':
+            self._container_startup()
+            self._container_freeze()
+
+        return True
+
+    def _clone_snapshot(self):
+        """Return True if a clone is created as a snapshot of its origin."""
+
+        return (
+            self.module.params.get('clone_snapshot') in BOOLEANS_TRUE or
+            self.module.params.get('backing_store') == 'overlayfs'
+        )
+
+    def _clone(self):
+        """Run lxc-clone for a stopped origin container."""
 
         build_command = [
             self.module.get_bin_path('lxc-clone', True),
@@ -784,6 +954,7 @@ class LxcContainerManagement(object):
             build_command.append('--snapshot')
 
         rc, return_data, err = self._run_command(build_command)
+        self._lvm_lv_list_invalidate()
         if rc != 0:
             message = "Failed executing lxc-clone."
             self.failure(
@@ -793,15 +964,6 @@ class LxcContainerManagement(object):
             )
         else:
             self.state_change = True
-            # Restore the original state of the origin container if it was
-            # not in a stopped state.
-            if container_state == 'running':
-                self.container.start()
-            elif container_state == 'frozen':
-                self.container.start()
-                self.container.freeze()
-
-        return True
 
     def _create(self):
         """Create a new LXC container.
@@ -856,6 +1018,7 @@ class LxcContainerManagement(object):
             build_command.append('-- %s' % template_options)
 
         rc, return_data, err = self._run_command(build_command)
+        self._lvm_lv_list_invalidate()
         if rc != 0:
             message = "Failed executing lxc-create."
             self.failure(
@@ -885,10 +1048,7 @@ class LxcContainerManagement(object):
         :rtype: ``bol``
         """
 
-        unfreeze = self.container.unfreeze()
-        if unfreeze:
-            self.state_change = True
-        return unfreeze
+        return self._transition(action='unfreeze', state='running')
 
     def _get_state(self):
         """Return the state of a container.
@@ -918,32 +1078,148 @@ class LxcContainerManagement(object):
             self.container.attach_wait(create_script, container_command)
             self.state_change = True
 
-    def _container_startup(self, timeout=60):
-        """Ensure a container is started.
+    def _backoff_until(self, attempt):
+        """Call ``attempt`` until it succeeds or the wait budget is spent.
 
-        :param timeout: Time before the destroy operation is abandoned.
-        :type timeout: ``int``
+        Attempts are retried with an exponential backoff, starting at
+        ``LXC_BACKOFF_START`` and capped at ``LXC_BACKOFF_MAX`` seconds. All
+        waits of a run share the ``state_timeout`` budget.
+
+        :param attempt: Function called with the deadline of the wait, it
+                        returns True once the wait is over.
+        :type attempt: ``function``
+        :returns: True or False based on if ``attempt`` succeeded.
+        :rtype: ``bol``
         """
 
-        self.container = self.get_container_bind()
-        for _ in xrange(timeout):
-            if self._get_state() != 'running':
-                self.container.start()
+        deadline = time.time() + self.wait_remaining
+        delay = LXC_BACKOFF_START
+        try:
+            while True:
+                if attempt(deadline):
+                    return True
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, LXC_BACKOFF_MAX)
+        finally:
+            self.wait_remaining = max(deadline - time.time(), 0)
+
+    def _wait_for_state(self, state, deadline):
+        """Wait for the container to reach a state.
+
+        This blocks on the lxc monitor through ``wait()`` and returns as soon
+        as the container reaches ``state`` rather than polling for it.
+
+        :param state: Lower case state to wait for.
+        :type state: ``str``
+        :param deadline: Time at which the wait is abandoned.
+        :type deadline: ``float``
+        :returns: True or False based on if the state was reached.
+        :rtype: ``bol``
+        """
+
+        if self._get_state() == state:
+            return True
+
+        remaining = deadline - time.time()
+        if remaining > 0:
+            self.container.wait(state.upper(), max(int(remaining), 1))
+        return self._get_state() == state
+
+    def _transition(self, action, state):
+        """Run a container action and wait for the resulting state.
+
+        The time taken is recorded in ``self.transitions``.
+
+        :param action: Name of the container method to call, ``start``,
+                       ``stop``, ``freeze`` or ``unfreeze``.
+        :type action: ``str``
+        :param state: Lower case state the action leads to.
+        :type state: ``str``
+        :returns: True or False based on if the state was reached.
+        :rtype: ``bol``
+        """
+
+        from_state = self._get_state()
+        if from_state == state:
+            return True
+
+        def attempt(deadline):
+            if self._get_state() == state:
+                return True
+            elif getattr(self.container, action)():
                 self.state_change = True
-                # post startup sleep for 1 second.
-                time.sleep(1)
+                return self._wait_for_state(state, deadline)
             else:
-                return True
-        else:
-            self.failure(
-                lxc_container=self._container_data(),
-                error='Failed to start container'
-                      ' [ %s ]' % self.container_name,
-                rc=1,
-                msg='The container [ %s ] failed to start. Check to lxc is'
-                    ' available and that the container is in a functional'
-                    ' state.' % self.container_name
-            )
+                return False
+
+        start_time = time.time()
+        reached = self._backoff_until(attempt)
+        self.transitions.append({
+            'action': action,
+            'from': from_state,
+            'to': self._get_state(),
+            'reached': reached,
+            'duration': round(time.time() - start_time, 3)
+        })
+        return reached
+
+    def _transition_failure(self, method):
+        """Fail the module after a container state transition failed.
+
+        :param method: name of the failed operation.
+        :type method: ``str``
+        """
+
+        self.failure(
+            lxc_container=self._container_data(),
+            error='Failed to %s container [ %s ]' % (
+                method, self.container_name
+            ),
+            rc=1,
+            msg='The container [ %s ] failed to %s. Check to lxc is'
+                ' available and that the container is in a functional'
+                ' state.' % (self.container_name, method),
+            transitions=self.transitions
+        )
+
+    def _container_startup(self):
+        """Ensure a container is started."""
+
+        self.container = self.get_container_bind()
+        if not self._transition(action='start', state='running'):
+            self._transition_failure(method='start')
+        return True
+
+    def _container_stop(self):
+        """Ensure a container is stopped."""
+
+        if not self._transition(action='stop', state='stopped'):
+            self._transition_failure(method='stop')
+        return True
+
+    def _container_freeze(self):
+        """Ensure a running container is frozen."""
+
+        if not self._transition(action='freeze', state='frozen'):
+            self._transition_failure(method='freeze')
+        return True
+
+    def _ensure_exists(self, method):
+        """Create the container if it does not exist.
+
+        :param method: name of the operation requiring the container.
+        :type method: ``str``
+        """
+
+        if not self._container_exists(container_name=self.container_name):
+            self._create()
+            if not self._container_exists(container_name=self.container_name):
+                self._transition_failure(method=method)
 
     def _check_archive(self):
         """Create a compressed archive of a container.
@@ -952,8 +1228,10 @@ class LxcContainerManagement(object):
         """
 
         if self.module.params.get('archive') in BOOLEANS_TRUE:
+            archive = self._container_create_tar()
             self.archive_info = {
-                'archive': self._container_create_tar()
+                'archive': archive,
+                'archive_stats': self.archive_stats
             }
 
     def _check_clone(self):
@@ -973,222 +1251,198 @@ class LxcContainerManagement(object):
                     'cloned': False
                 }
 
-    def _destroyed(self, timeout=60):
-        """Ensure a container is destroyed.
-
-        :param timeout: Time before the destroy operation is abandoned.
-        :type timeout: ``int``
-        """
+    def _destroyed(self):
+        """Ensure a container is destroyed."""
 
-        for _ in xrange(timeout):
-            if not self._container_exists(container_name=self.container_name):
-                break
+        if not self._container_exists(container_name=self.container_name):
+            return
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
+        # Check if the container is to be cloned
+        self._check_clone()
 
-            if self._get_state() != 'stopped':
-                self.state_change = True
-                self.container.stop()
+        if self._get_state() != 'stopped':
+            self._container_stop()
 
-            if self.container.destroy():
+        def attempt(deadline):
+            if not self._container_exists(container_name=self.container_name):
+                return True
+            elif self.container.destroy():
                 self.state_change = True
-
-            # post destroy attempt sleep for 1 second.
-            time.sleep(1)
-        else:
-            self.failure(
-                lxc_container=self._container_data(),
-                error='Failed to destroy container'
-                      ' [ %s ]' % self.container_name,
-                rc=1,
-                msg='The container [ %s ] failed to be destroyed. Check'
-                    ' that lxc is available and that the container is in a'
-                    ' functional state.' % self.container_name
+                self._lvm_lv_list_invalidate()
+            return not self._container_exists(
+                container_name=self.container_name
             )
 
-    def _frozen(self, count=0):
+        start_time = time.time()
+        destroyed = self._backoff_until(attempt)
+        self.transitions.append({
+            'action': 'destroy',
+            'from': 'stopped',
+            'to': self._get_state(),
+            'reached': destroyed,
+            'duration': round(time.time() - start_time, 3)
+        })
+        if not destroyed:
+            self._transition_failure(method='destroy')
+
+    def _frozen(self):
         """Ensure a container is frozen.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='frozen')
-        if self._container_exists(container_name=self.container_name):
-            self._execute_command()
+        self._ensure_exists(method='frozen')
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            container_state = self._get_state()
-            if container_state == 'frozen':
-                pass
-            elif container_state == 'running':
-                self.container.freeze()
-                self.state_change = True
-            else:
-                self._container_startup()
-                self.container.freeze()
-                self.state_change = True
+        container_state = self._get_state()
+        if container_state not in ['running', 'frozen']:
+            self._container_startup()
+        self._container_freeze()
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._frozen(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
-    def _restarted(self, count=0):
+    def _restarted(self):
         """Ensure a container is restarted.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='restart')
-        if self._container_exists(container_name=self.container_name):
-            self._execute_command()
+        self._ensure_exists(method='restart')
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            if self._get_state() != 'stopped':
-                self.container.stop()
-                self.state_change = True
+        if self._get_state() != 'stopped':
+            self._container_stop()
 
-            # Run container startup
-            self._container_startup()
+        # Run container startup
+        self._container_startup()
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._restarted(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
-    def _stopped(self, count=0):
+    def _stopped(self):
         """Ensure a container is stopped.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='stop')
-        if self._container_exists(container_name=self.container_name):
-            self._execute_command()
+        self._ensure_exists(method='stop')
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            if self._get_state() != 'stopped':
-                self.container.stop()
-                self.state_change = True
+        if self._get_state() != 'stopped':
+            self._container_stop()
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._stopped(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
-    def _started(self, count=0):
+    def _started(self):
         """Ensure a container is started.
 
         If the container does not exist the container will be created.
-
-        :param count: number of times this command has been called by itself.
-        :type count: ``int``
         """
 
-        self.check_count(count=count, method='start')
-        if self._container_exists(container_name=self.container_name):
-            container_state = self._get_state()
-            if container_state == 'running':
-                pass
-            elif container_state == 'frozen':
-                self._unfreeze()
-            elif not self._container_startup():
-                self.failure(
-                    lxc_container=self._container_data(),
-                    error='Failed to start container'
-                          ' [ %s ]' % self.container_name,
-                    rc=1,
-                    msg='The container [ %s ] failed to start. Check to lxc is'
-                        ' available and that the container is in a functional'
-                        ' state.' % self.container_name
-                )
+        self._ensure_exists(method='start')
+        container_state = self._get_state()
+        if container_state == 'frozen':
+            if not self._unfreeze():
+                self._transition_failure(method='unfreeze')
+        else:
+            self._container_startup()
 
-            # Return data
-            self._execute_command()
+        # Return data
+        self._execute_command()
 
-            # Perform any configuration updates
-            self._config()
+        # Perform any configuration updates
+        self._config()
 
-            # Check if the container needs to have an archive created.
-            self._check_archive()
+        # Check if the container needs to have an archive created.
+        self._check_archive()
 
-            # Check if the container is to be cloned
-            self._check_clone()
-        else:
-            self._create()
-            count += 1
-            self._started(count)
+        # Check if the container is to be cloned
+        self._check_clone()
 
     def _get_lxc_vg(self):
-        """Return the name of the Volume Group used in LXC."""
+        """Return the name of the Volume Group used in LXC.
 
-        build_command = [
-            self.module.get_bin_path('lxc-config', True),
-            "lxc.bdev.lvm.vg"
-        ]
-        rc, vg, err = self._run_command(build_command)
-        if rc != 0:
-            self.failure(
-                err=err,
-                rc=rc,
-                msg='Failed to read LVM VG from LXC config',
-                command=' '.join(build_command)
-            )
-        else:
-            return str(vg.strip())
+        The name is read once and kept in ``self.lvm_cache``.
+        """
+
+        with LXC_LVM_CACHE_LOCK:
+            if 'vg' in self.lvm_cache:
+                return self.lvm_cache['vg']
+
+            build_command = [
+                self.module.get_bin_path('lxc-config', True),
+                "lxc.bdev.lvm.vg"
+            ]
+            rc, vg, err = self._run_command(build_command)
+            if rc != 0:
+                self.failure(
+                    err=err,
+                    rc=rc,
+                    msg='Failed to read LVM VG from LXC config',
+                    command=' '.join(build_command)
+                )
+            else:
+                self.lvm_cache['vg'] = str(vg.strip())
+                return self.lvm_cache['vg']
 
     def _lvm_lv_list(self):
-        """Return a list of all lv in a current vg."""
+        """Return a list of all lv in a current vg.
 
-        vg = self._get_lxc_vg()
-        build_command = [
-            self.module.get_bin_path('lvs', True)
-        ]
-        rc, stdout, err = self._run_command(build_command)
-        if rc != 0:
-            self.failure(
-                err=err,
-                rc=rc,
-                msg='Failed to get list of LVs',
-                command=' '.join(build_command)
-            )
+        The list is kept in ``self.lvm_cache`` until an LV is created or
+        removed by this module.
+        """
+
+        with LXC_LVM_CACHE_LOCK:
+            if 'lvs' in self.lvm_cache:
+                return list(self.lvm_cache['lvs'])
+
+            vg = self._get_lxc_vg()
+            build_command = [
+                self.module.get_bin_path('lvs', True)
+            ]
+            rc, stdout, err = self._run_command(build_command)
+            if rc != 0:
+                self.failure(
+                    err=err,
+                    rc=rc,
+                    msg='Failed to get list of LVs',
+                    command=' '.join(build_command)
+                )
+
+            all_lvms = [i.split() for i in stdout.splitlines()][1:]
+            self.lvm_cache['lvs'] = [
+                lv_entry[0] for lv_entry in all_lvms if lv_entry[1] == vg
+            ]
+            return list(self.lvm_cache['lvs'])
+
+    def _lvm_lv_list_invalidate(self):
+        """Drop the cached list of LVs."""
 
-        all_lvms = [i.split() for i in stdout.splitlines()][1:]
-        return [lv_entry[0] for lv_entry in all_lvms if lv_entry[1] == vg]
+        with LXC_LVM_CACHE_LOCK:
+            self.lvm_cache.pop('lvs', None)
 
     def _get_vg_free_pe(self, vg_name):
         """Return the available size of a given VG.
@@ -1286,6 +1540,7 @@ class LxcContainerManagement(object):
             "-L%sg" % snapshot_size_gb
         ]
         rc, stdout, err = self._run_command(build_command)
+        self._lvm_lv_list_invalidate()
         if rc != 0:
             self.failure(
                 err=err,
@@ -1319,11 +1574,13 @@ class LxcContainerManagement(object):
                     % (vg, lv_name, mount_point)
             )
 
-    def _create_tar(self, source_dir):
-        """Create an archive of a given ``source_dir`` to ``output_path``.
+    def _archive_name(self, suffix=None):
+        """Return the path of the archive to create.
 
-        :param source_dir:  Path to the directory to be archived.
-        :type source_dir: ``str``
+        :param suffix: Optional string added after the container name.
+        :type suffix: ``str``
+        :returns: path to the archive.
+        :rtype: ``str``
         """
 
         archive_path = self.module.params.get('archive_path')
@@ -1333,29 +1590,79 @@ class LxcContainerManagement(object):
         archive_compression = self.module.params.get('archive_compression')
         compression_type = LXC_COMPRESSION_MAP[archive_compression]
 
+        name = self.container_name
+        if suffix:
+            name = '%s-%s' % (name, suffix)
+
         # remove trailing / if present.
-        archive_name = '%s.%s' % (
+        return '%s.%s' % (
             os.path.join(
                 archive_path,
-                self.container_name
+                name
             ),
             compression_type['extension']
         )
 
+    def _create_tar(self, sources, archive_name=None, tar_options=None):
+        """Create an archive from one or more source directories.
+
+        The archive is written by a single tar process which feeds the
+        configured compressor directly, no intermediate archive is created.
+
+        :param sources: List of ``(directory, members)`` tuples. Each set of
+                        members is archived relative to its directory.
+        :type sources: ``list``
+        :param archive_name: Path of the archive, defaults to the container
+                             name within ``archive_path``.
+        :type archive_name: ``str``
+        :param tar_options: Extra options passed to tar before the members.
+        :type tar_options: ``list``
+        :returns: path to the archive.
+        :rtype: ``str``
+        """
+
+        if not archive_name:
+            archive_name = self._archive_name()
+
+        archive_compression = self.module.params.get('archive_compression')
+        compression_type = LXC_COMPRESSION_MAP[archive_compression]
+
         build_command = [
             self.module.get_bin_path('tar', True),
-            '--directory=%s' % os.path.realpath(
-                os.path.expanduser(source_dir)
-            ),
-            compression_type['argument'],
-            archive_name,
-            '.'
+            '--totals'
         ]
+        if tar_options:
+            build_command.extend(tar_options)
+
+        compress_program = compression_type['program']
+        if compress_program:
+            compress_program = self.module.get_bin_path(compress_program, True)
+            if compression_type.get('options'):
+                compress_program = '%s %s' % (
+                    compress_program, compression_type['options']
+                )
+            build_command.append(
+                '--use-compress-program=%s' % pipes.quote(compress_program)
+            )
+
+        build_command.extend([
+            '--create',
+            '--file=%s' % archive_name
+        ])
+        for directory, members in sources:
+            build_command.append(
+                '--directory=%s' % os.path.realpath(
+                    os.path.expanduser(directory)
+                )
+            )
+            build_command.extend([pipes.quote(i) for i in members])
 
+        start_time = time.time()
         rc, stdout, err = self._run_command(
             build_command=build_command,
             unsafe_shell=True
         )
+        duration = time.time() - start_time
         if rc != 0:
             self.failure(
                 err=err,
@@ -1364,36 +1671,420 @@ class LxcContainerManagement(object):
                 command=' '.join(build_command)
             )
 
+        self.archive_stats = self._archive_stats(
+            archive_name=archive_name,
+            tar_output=err,
+            duration=duration
+        )
         return archive_name
 
-    def _lvm_lv_remove(self, lv_name):
-        """Remove an LV.
+    @staticmethod
+    def _archive_stats(archive_name, tar_output, duration):
+        """Return size and throughput information for an archive.
+
+        :param archive_name: Path to the archive.
+        :type archive_name: ``str``
+        :param tar_output: stderr of the tar command run with ``--totals``.
+        :type tar_output: ``str``
+        :param duration: Seconds spent creating the archive.
+        :type duration: ``float``
+        :returns: archive statistics
+        :rtype: ``dict``
+        """
 
-        :param lv_name: The name of the logical volume
-        :type lv_name: ``str``
+        source_bytes = 0
+        totals = re.search(r'Total bytes written: (\d+)', tar_output or '')
+        if totals:
+            source_bytes = int(totals.group(1))
+
+        archive_bytes = os.path.getsize(archive_name)
+        stats = {
+            'source_bytes': source_bytes,
+            'archive_bytes': archive_bytes,
+            'duration': round(duration, 3),
+            'throughput': 0
+        }
+        if duration > 0:
+            # Throughput is measured on the uncompressed data read.
+            stats['throughput'] = int(source_bytes / duration)
+        return stats
+
+    def _manifest_path(self):
+        """Return the path of the incremental archive manifest."""
+
+        return os.path.join(
+            self.module.params.get('archive_path'),
+            '%s.manifest.json' % self.container_name
+        )
+
+    def _load_manifest(self):
+        """Return the incremental archive manifest of the container.
+
+        An empty manifest is returned if none has been written yet.
+
+        :returns: manifest with the archive ``chain`` and indexed ``files``.
+        :rtype: ``dict``
         """
 
-        vg = self._get_lxc_vg()
-        build_command = [
-            self.module.get_bin_path('lvremove', True),
-            "-f",
-            "%s/%s" % (vg, lv_name),
-        ]
-        rc, stdout, err = self._run_command(build_command)
-        if rc != 0:
+        manifest_path = self._manifest_path()
+        if not os.path.isfile(manifest_path):
+            return {'chain': [], 'files': {}}
+
+        try:
+            with open(manifest_path, 'rb') as f:
+                manifest = json.load(f)
+        except ValueError, e:
             self.failure(
-                err=err,
-                rc=rc,
-                msg='Failed to remove LVM LV %s/%s' % (vg, lv_name),
-                command=' '.join(build_command)
+                error='Invalid archive manifest',
+                rc=1,
+                msg='Failed to read archive manifest [ %s ]: %s'
+                    % (manifest_path, str(e))
             )
 
-    def _rsync_data(self, container_path, temp_dir):
-        """Sync the container directory to the temp directory.
+        # json returns unicode strings, paths found on disk are byte strings.
+        # Paths are stored decoded as latin-1, which maps every byte to one
+        # character, manifests without an encoding were written as utf-8.
+        encoding = manifest.pop('encoding', 'utf-8')
+        manifest['chain'] = [i.encode(encoding) for i in manifest['chain']]
+        manifest['files'] = dict(
+            (k.encode(encoding), v) for k, v in manifest['files'].items()
+        )
+        return manifest
 
-        :param container_path: path to the container container
-        :type container_path: ``str``
-        :param temp_dir: path to the temporary local working directory
+    def _save_manifest(self, manifest):
+        """Atomically write the incremental archive manifest.
+
+        :param manifest: manifest to save.
+        :type manifest: ``dict``
+        """
+
+        manifest_path = self._manifest_path()
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(manifest_path),
+            prefix='.%s.manifest' % self.container_name
+        )
+        # Paths are byte strings that need not be valid utf-8, json only
+        # takes unicode, latin-1 decodes any byte string reversibly.
+        data = {
+            'encoding': 'latin-1',
+            'chain': [i.decode('latin-1') for i in manifest['chain']],
+            'files': dict(
+                (k.decode('latin-1'), v) for k, v in manifest['files'].items()
+            )
+        }
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                json.dump(data, f)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self.module.atomic_move(tmp_path, manifest_path)
+
+    @staticmethod
+    def _file_digest(path, block_size=1048576):
+        """Return the sha1 hex digest of a file's content.
+
+        :param path: path of the file.
+        :type path: ``str``
+        :param block_size: Number of bytes read at a time.
+        :type block_size: ``int``
+        """
+
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            block = f.read(block_size)
+            while block:
+                digest.update(block)
+                block = f.read(block_size)
+        return digest.hexdigest()
+
+    def _manifest_entry(self, path, previous=None):
+        """Return the manifest entry of a path.
+
+        Entries are ``[size, mtime, inode, mode, uid, gid, digest]``. The
+        content of a file is only hashed when its size, mtime, inode, mode
+        or owner differ from the ``previous`` entry.
+
+        :param path: path to describe.
+        :type path: ``str``
+        :param previous: entry of the path in the last manifest.
+        :type previous: ``list``
+        :returns: manifest entry
+        :rtype: ``list``
+        """
+
+        st = os.lstat(path)
+        entry = [
+            st.st_size,
+            st.st_mtime,
+            st.st_ino,
+            st.st_mode,
+            st.st_uid,
+            st.st_gid,
+            None
+        ]
+        if previous and previous[:6] == entry[:6]:
+            entry[6] = previous[6]
+        elif stat.S_ISREG(st.st_mode):
+            entry[6] = self._file_digest(path)
+        elif stat.S_ISLNK(st.st_mode):
+            entry[6] = hashlib.sha1(os.readlink(path)).hexdigest()
+        return entry
+
+    def _scan_sources(self, sources, previous_files):
+        """Return the manifest entries of every path within ``sources``.
+
+        :param sources: List of ``(directory, members)`` tuples.
+        :type sources: ``list``
+        :param previous_files: file entries of the last manifest.
+        :type previous_files: ``dict``
+        :returns: dict of ``{directory: {member path: entry}}``.
+        :rtype: ``dict``
+        """
+
+        scanned = dict()
+        for directory, members in sources:
+            entries = scanned.setdefault(directory, dict())
+            for member in members:
+                top = os.path.join(directory, member)
+                entries[member] = self._manifest_entry(
+                    top, previous_files.get(member)
+                )
+                if not os.path.isdir(top) or os.path.islink(top):
+                    continue
+
+                for root, dirs, files in os.walk(top):
+                    for name in dirs + files:
+                        path = os.path.join(root, name)
+                        key = os.path.relpath(path, directory)
+                        entries[key] = self._manifest_entry(
+                            path, previous_files.get(key)
+                        )
+        return scanned
+
+    @staticmethod
+    def _entry_changed(entry, previous):
+        """Return True if a manifest entry has to be archived again.
+
+        Regular files and symlinks are compared on content and ownership,
+        everything else on the full stat information.
+        """
+
+        if previous is None:
+            return True
+        elif entry[6] is None:
+            return entry[:6] != previous[:6]
+        else:
+            return entry[3:] != previous[3:]
+
+    def _create_incremental_tar(self, sources):
+        """Create a full or delta archive of ``sources``.
+
+        The first archive and every archive following ``archive_max_deltas``
+        deltas is a full archive. Every other archive only contains the paths
+        that are new or changed since the last archive. Paths removed since
+        the last archive are listed, NUL separated, in the
+        ``.lxc-archive-deleted`` member of each archive.
+
+        :param sources: List of ``(directory, members)`` tuples.
+        :type sources: ``list``
+        :returns: path to the archive or None if nothing changed.
+        :rtype: ``str``
+        """
+
+        manifest = self._load_manifest()
+        max_deltas = int(self.module.params.get('archive_max_deltas'))
+        full = not manifest['chain'] or len(manifest['chain']) > max_deltas
+        previous_files = dict()
+        if not full:
+            previous_files = manifest['files']
+
+        # Digests of unchanged files are reused even for a full archive.
+        scanned = self._scan_sources(sources, manifest['files'])
+
+        files = dict()
+        changed = dict()
+        for directory, entries in scanned.items():
+            files.update(entries)
+            changed[directory] = sorted(
+                k for k, v in entries.items()
+                if self._entry_changed(v, previous_files.get(k))
+            )
+        deleted = sorted(i for i in previous_files if i not in files)
+
+        if not deleted and not [i for i in changed.values() if i]:
+            self.archive_stats = {
+                'archive_type': 'delta',
+                'changed_files': 0,
+                'deleted_files': 0,
+                'chain_length': len(manifest['chain'])
+            }
+            return None
+
+        list_dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(list_dir, LXC_ARCHIVE_DELETED), 'wb') as f:
+                f.write('\0'.join(deleted))
+
+            archive_sources = [(list_dir, [LXC_ARCHIVE_DELETED])]
+            for index, (directory, members) in enumerate(changed.items()):
+                if not members:
+                    continue
+                list_file = os.path.join(list_dir, 'members.%d' % index)
+                with open(list_file, 'wb') as f:
+                    f.write('\0'.join(members))
+                archive_sources.append(
+                    (directory, ['--files-from=%s' % list_file])
+                )
+
+            archive_type = full and 'full' or 'delta'
+            # The position in the chain keeps the names of archives made
+            # within the same second apart, an archive that is already on
+            # disk is never overwritten.
+            sequence = not full and len(manifest['chain']) or 0
+            stamp = time.strftime('%Y%m%d%H%M%S')
+            archive_name = self._archive_name(
+                suffix='%s.%03d.%s' % (stamp, sequence, archive_type)
+            )
+            retry = 0
+            while os.path.lexists(archive_name):
+                retry += 1
+                archive_name = self._archive_name(
+                    suffix='%s.%03d-%d.%s' % (
+                        stamp, sequence, retry, archive_type
+                    )
+                )
+            archive_name = self._create_tar(
+                sources=archive_sources,
+                archive_name=archive_name,
+                tar_options=['--null', '--no-recursion']
+            )
+        finally:
+            shutil.rmtree(list_dir)
+
+        if full:
+            manifest['chain'] = [archive_name]
+        else:
+            manifest['chain'].append(archive_name)
+        manifest['files'] = files
+        self._save_manifest(manifest)
+
+        self.archive_stats.update({
+            'archive_type': archive_type,
+            'changed_files': sum([len(i) for i in changed.values()]),
+            'deleted_files': len(deleted),
+            'chain_length': len(manifest['chain'])
+        })
+        return archive_name
+
+    def _archive_restore(self):
+        """Restore the archive chain of a container.
+
+        Every archive of the chain recorded in the manifest is replayed in
+        order into ``archive_restore_path``. The paths deleted in an archive
+        are removed before the archive is extracted. The chain starts with a
+        full archive, so ``archive_restore_path`` has to be empty for the
+        result to be the archived tree.
+
+        :returns: list of the archives replayed.
+        :rtype: ``list``
+        """
+
+        restore_path = self.module.params.get('archive_restore_path')
+        manifest = self._load_manifest()
+        if not manifest['chain']:
+            self.failure(
+                error='No archives found',
+                rc=1,
+                msg='No incremental archives are recorded for [ %s ] in'
+                    ' [ %s ].' % (self.container_name, self._manifest_path())
+            )
+
+        if not os.path.isdir(restore_path):
+            os.makedirs(restore_path)
+        elif os.listdir(restore_path):
+            self.failure(
+                error='Restore path not empty',
+                rc=1,
+                msg='The archives of [ %s ] can only be restored into an'
+                    ' empty directory, [ %s ] is not empty.'
+                    % (self.container_name, restore_path)
+            )
+
+        tar_bin = self.module.get_bin_path('tar', True)
+        for archive_name in manifest['chain']:
+            build_command = [
+                tar_bin,
+                '--extract',
+                '--to-stdout',
+                '--file=%s' % archive_name,
+                LXC_ARCHIVE_DELETED
+            ]
+            rc, deleted, err = self._run_command(build_command)
+            if rc != 0:
+                self.failure(
+                    err=err,
+                    rc=rc,
+                    msg='failed to read deleted files from [ %s ]'
+                        % archive_name,
+                    command=' '.join(build_command)
+                )
+
+            for path in [i for i in deleted.split('\0') if i]:
+                path = os.path.join(restore_path, path)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                elif os.path.lexists(path):
+                    os.remove(path)
+
+            build_command = [
+                tar_bin,
+                '--extract',
+                '--numeric-owner',
+                '--file=%s' % archive_name,
+                '--directory=%s' % restore_path,
+                '--exclude=%s' % LXC_ARCHIVE_DELETED
+            ]
+            rc, stdout, err = self._run_command(build_command)
+            if rc != 0:
+                self.failure(
+                    err=err,
+                    rc=rc,
+                    msg='failed to extract archive [ %s ]' % archive_name,
+                    command=' '.join(build_command)
+                )
+
+        return manifest['chain']
+
+    def _lvm_lv_remove(self, lv_name):
+        """Remove an LV.
+
+        :param lv_name: The name of the logical volume
+        :type lv_name: ``str``
+        """
+
+        vg = self._get_lxc_vg()
+        build_command = [
+            self.module.get_bin_path('lvremove', True),
+            "-f",
+            "%s/%s" % (vg, lv_name),
+        ]
+        rc, stdout, err = self._run_command(build_command)
+        self._lvm_lv_list_invalidate()
+        if rc != 0:
+            self.failure(
+                err=err,
+                rc=rc,
+                msg='Failed to remove LVM LV %s/%s' % (vg, lv_name),
+                command=' '.join(build_command)
+            )
+
+    def _rsync_data(self, container_path, temp_dir):
+        """Sync the container directory to the temp directory.
+
+        :param container_path: path to the container container
+        :type container_path: ``str``
+        :param temp_dir: path to the temporary local working directory
         :type temp_dir: ``str``
         """
         # This loop is created to support overlayfs archives. This should
@@ -1475,6 +2166,184 @@ class LxcContainerManagement(object):
     def _container_create_tar(self):
         """Create a tar archive from an LXC container.
 
+        The archive is built using the method set by ``archive_mode``.
+
+        :returns: path to the archive.
+        :rtype: ``str``
+        """
+
+        archive_mode = self.module.params.get('archive_mode')
+        if archive_mode == 'copy':
+            return self._container_copy_tar()
+        elif archive_mode == 'incremental':
+            return self._container_archive_sources(
+                create_archive=self._create_incremental_tar
+            )
+        else:
+            return self._container_archive_sources(
+                create_archive=self._create_tar
+            )
+
+    def _restore_state(self, container_state):
+        """Return a container to the state it was in before archiving.
+
+        :param container_state: State of the container prior to archiving.
+        :type container_state: ``str``
+        """
+
+        if container_state == 'running':
+            if self._get_state() == 'frozen':
+                self.container.unfreeze()
+            else:
+                self.container.start()
+
+    def _container_archive_sources(self, create_archive):
+        """Create a tar archive by streaming an LXC container into tar.
+
+        The process is as follows:
+            * Stop or Freeze the container
+            * If LVM backed:
+                * Create LVM snapshot of LV backing the container
+                * Restore the state of the container
+                * Mount the snapshot to tmpdir/rootfs
+            * If overlayfs backed:
+                * Mount the squashed layers to tmpdir/rootfs
+            * Tar the container config and rootfs in place
+            * Restore the state of the container
+            * Clean up
+
+        Nothing is copied into the temporary directory, it only holds the
+        mount point used for LVM and overlayfs backed containers.
+
+        :param create_archive: Method called with the ``sources`` to archive
+                               once the container data is accessible.
+        :type create_archive: ``function``
+        :returns: path to the archive.
+        :rtype: ``str``
+        """
+
+        # LXC container rootfs
+        lxc_rootfs = self.container.get_config_item('lxc.rootfs')
+        if lxc_rootfs.startswith('dir:'):
+            lxc_rootfs = lxc_rootfs.split(':', 1)[1]
+
+        # Test if the containers rootfs is a block device
+        block_backed = lxc_rootfs.startswith(os.path.join(os.sep, 'dev'))
+
+        # Test if the container is using overlayfs
+        overlayfs_backed = lxc_rootfs.startswith('overlayfs')
+
+        # Everything but the rootfs is archived from the container directory.
+        container_dir = os.path.dirname(self.container.config_file_name)
+        container_members = [
+            i for i in os.listdir(container_dir) if i != 'rootfs'
+        ]
+
+        # Create a temp dir to hold the mount point
+        temp_dir = tempfile.mkdtemp()
+        mount_point = os.path.join(temp_dir, 'rootfs')
+
+        # Set the snapshot name if needed
+        snapshot_name = '%s_lxc_snapshot' % self.container_name
+
+        container_state = self._get_state()
+        state_restored = False
+        mounted = False
+        snapshot_created = False
+        freeze_start = time.time()
+        freeze_duration = 0
+        try:
+            # Ensure the original container is stopped or frozen
+            if container_state not in ['stopped', 'frozen']:
+                if container_state == 'running':
+                    self.container.freeze()
+                else:
+                    self.container.stop()
+
+            if block_backed:
+                if snapshot_name in self._lvm_lv_list():
+                    self.failure(
+                        err='snapshot [ %s ] already exists' % snapshot_name,
+                        rc=1,
+                        msg='The snapshot [ %s ] already exists. Please clean'
+                            ' up old snapshot of containers before continuing.'
+                            % snapshot_name
+                    )
+
+                # Take snapshot
+                size, measurement = self._get_lv_size(
+                    lv_name=self.container_name
+                )
+                self._lvm_snapshot_create(
+                    source_lv=self.container_name,
+                    snapshot_name=snapshot_name,
+                    snapshot_size_gb=size
+                )
+                snapshot_created = True
+
+                # The snapshot is consistent, the container can carry on
+                # while the archive is written.
+                self._restore_state(container_state)
+                freeze_duration = time.time() - freeze_start
+                state_restored = True
+
+                # Mount snapshot
+                os.makedirs(mount_point)
+                self._lvm_lv_mount(
+                    lv_name=snapshot_name,
+                    mount_point=mount_point
+                )
+                mounted = True
+                rootfs_source = (temp_dir, ['rootfs'])
+            elif overlayfs_backed:
+                lowerdir, upperdir = lxc_rootfs.split(':')[1:]
+                os.makedirs(mount_point)
+                self._overlayfs_mount(
+                    lowerdir=lowerdir,
+                    upperdir=upperdir,
+                    mount_point=mount_point
+                )
+                mounted = True
+                rootfs_source = (temp_dir, ['rootfs'])
+            else:
+                rootfs_source = (
+                    os.path.dirname(lxc_rootfs),
+                    [os.path.basename(lxc_rootfs)]
+                )
+
+            archive_name = create_archive(
+                sources=[(container_dir, container_members), rootfs_source]
+            )
+
+            # Set the state as changed and set a new fact
+            if archive_name:
+                self.state_change = True
+            return archive_name
+        finally:
+            if mounted:
+                # unmount snapshot
+                self._unmount(mount_point)
+
+            if snapshot_created:
+                # Remove snapshot
+                self._lvm_lv_remove(snapshot_name)
+
+            # Restore original state of container
+            if not state_restored:
+                self._restore_state(container_state)
+                freeze_duration = time.time() - freeze_start
+
+            if self.archive_stats:
+                self.archive_stats['freeze_duration'] = round(
+                    freeze_duration, 3
+                )
+
+            # Remove tmpdir
+            shutil.rmtree(temp_dir)
+
+    def _container_copy_tar(self):
+        """Create a tar archive from a staged copy of an LXC container.
+
         The process is as follows:
             * Stop or Freeze the container
             * Create temporary dir
@@ -1557,7 +2426,7 @@ class LxcContainerManagement(object):
 
             # Set the state as changed and set a new fact
             self.state_change = True
-            return self._create_tar(source_dir=work_dir)
+            return self._create_tar(sources=[(work_dir, ['.'])])
         finally:
             if block_backed or overlayfs_backed:
                 # unmount snapshot
@@ -1568,25 +2437,11 @@ class LxcContainerManagement(object):
                 self._lvm_lv_remove(snapshot_name)
 
             # Restore original state of container
-            if container_state == 'running':
-                if self._get_state() == 'frozen':
-                    self.container.unfreeze()
-                else:
-                    self.container.start()
+            self._restore_state(container_state)
 
             # Remove tmpdir
             shutil.rmtree(temp_dir)
 
-    def check_count(self, count, method):
-        if count > 1:
-            self.failure(
-                error='Failed to %s container' % method,
-                rc=1,
-                msg='The container [ %s ] failed to %s. Check to lxc is'
-                    ' available and that the container is in a functional'
-                    ' state.' % (self.container_name, method)
-            )
-
     def failure(self, **kwargs):
         """Return a Failure when running an Ansible command.
 
@@ -1600,19 +2455,315 @@ class LxcContainerManagement(object):
     def run(self):
         """Run the main method."""
 
+        if self.module.params.get('archive_restore_path'):
+            self.module.exit_json(
+                changed=True,
+                lxc_container={
+                    'archive_restored': self._archive_restore()
+                }
+            )
+
+        self.module.exit_json(
+            changed=self.state_change,
+            lxc_container=self.manage()
+        )
+
+    def manage(self):
+        """Bring the container into the requested state.
+
+        :returns: container data
+        :rtype: ``dict``
+        """
+
         action = getattr(self, LXC_ANSIBLE_STATES[self.state])
         action()
 
         outcome = self._container_data()
+        outcome['transitions'] = self.transitions
         if self.archive_info:
             outcome.update(self.archive_info)
 
         if self.clone_info:
             outcome.update(self.clone_info)
 
+        return outcome
+
+
+class LxcContainerFailure(Exception):
+    """Raised in place of exiting when a container of a batch fails."""
+
+    def __init__(self, result):
+        Exception.__init__(self, result.get('msg'))
+        self.result = result
+
+
+class LxcBatchModule(object):
+    def __init__(self, module, params):
+        """Per container view of the Ansible module used in batch mode.
+
+        Failures raise ``LxcContainerFailure`` so that a failing container
+        does not end the run for the rest of the batch.
+
+        :param module: Processed Ansible Module.
+        :type module: ``object``
+        :param params: Parameters of the container.
+        :type params: ``dict``
+        """
+        self.module = module
+        self.params = params
+
+    def __getattr__(self, name):
+        return getattr(self.module, name)
+
+    def fail_json(self, **kwargs):
+        raise LxcContainerFailure(kwargs)
+
+    def get_bin_path(self, arg, required=False, opt_dirs=[]):
+        """Look a binary up without exiting the module when it is missing."""
+
+        bin_path = self.module.get_bin_path(arg, False, opt_dirs)
+        if required and bin_path is None:
+            self.fail_json(
+                msg='Failed to find required executable %s' % arg
+            )
+        return bin_path
+
+    def atomic_move(self, src, dest):
+        """Rename src over dest without exiting the module on failure.
+
+        Callers create src next to dest, so a rename is atomic.
+        """
+
+        try:
+            os.rename(src, dest)
+        except (IOError, OSError), e:
+            self.fail_json(
+                msg='Could not replace file: %s to %s: %s' % (src, dest, e)
+            )
+
+
+class LxcContainerBatch(object):
+    def __init__(self, module):
+        """Management of a batch of LXC containers via Ansible.
+
+        Entries of ``containers`` sharing a name describe one container.
+        The run is done in three steps:
+            * Create the origins of the clones and stop them
+            * Clone the origins, snapshot clones run concurrently
+            * Bring every container into its requested state
+
+        Every step runs its independent operations on a pool of at most
+        ``workers`` threads. The LVM volume group and LV list are resolved
+        once for the whole batch.
+
+        :param module: Processed Ansible Module.
+        :type module: ``object``
+        """
+        self.module = module
+        self.workers = max(int(module.params.get('workers')), 1)
+        self.lvm_cache = dict()
+
+    def _manager(self, spec, **overrides):
+        """Return the container manager of a container spec.
+
+        :param spec: options of the container, missing options are taken
+                     from the module parameters.
+        :type spec: ``dict``
+        :returns: container manager
+        :rtype: ``object``
+        """
+
+        params = self.module.params.copy()
+        params['containers'] = None
+        params['lv_name'] = None
+        params.update(spec)
+        params.update(overrides)
+        if not params.get('lv_name'):
+            params['lv_name'] = params['name']
+
+        return LxcContainerManagement(
+            module=LxcBatchModule(module=self.module, params=params),
+            lvm_cache=self.lvm_cache
+        )
+
+    def _map(self, func, items):
+        """Run ``func`` for every item on the worker pool.
+
+        :returns: list of ``(succeeded, result)`` tuples in item order.
+        :rtype: ``list``
+        """
+
+        results = [None] * len(items)
+        pending = list(enumerate(items))
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    index, item = pending.pop(0)
+                try:
+                    results[index] = (True, func(item))
+                except LxcContainerFailure, e:
+                    results[index] = (False, e.result)
+                except Exception, e:
+                    results[index] = (False, {'msg': str(e)})
+                except SystemExit:
+                    # exit_json or fail_json of the real module were reached
+                    results[index] = (
+                        False, {'msg': 'container operation exited the module'}
+                    )
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(min(self.workers, len(items)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def plan(self):
+        """Return the containers of the batch with the clones to create.
+
+        :returns: list of ``(spec, clone specs)`` tuples, one per container.
+        :rtype: ``list``
+        """
+
+        plan = list()
+        index = dict()
+        for spec in self.module.params.get('containers'):
+            name = spec['name']
+            if name not in index:
+                index[name] = len(plan)
+                plan.append((dict(spec, clone_name=None), list()))
+
+            clone_name = spec.get('clone_name')
+            if clone_name and not LxcContainerManagement._container_exists(
+                    container_name=clone_name):
+                plan[index[name]][1].append(spec)
+        return plan
+
+    def _prepare_origin(self, entry):
+        """Ensure the origin of clones exists and is stopped."""
+
+        spec, clones = entry
+        if clones:
+            manager = self._manager(spec)
+            manager._ensure_exists(method='create')
+            if manager._get_state() != 'stopped':
+                manager._container_stop()
+            return manager.state_change
+        return False
+
+    def _clone(self, specs):
+        """Create the given clones one after the other."""
+
+        for spec in specs:
+            self._manager(spec)._clone()
+        return True
+
+    def _apply_state(self, entry):
+        """Bring a container into its requested state."""
+
+        spec = entry[0]
+        manager = self._manager(spec)
+        outcome = manager.manage()
+        return manager.state_change, outcome
+
+    def run(self):
+        """Run the batch and exit the module with per-container results."""
+
+        plan = self.plan()
+        failed = dict()
+        changed = dict()
+        outcomes = dict()
+
+        # Step 1, the origins of the clones.
+        for (spec, clones), (ok, result) in zip(
+                plan, self._map(self._prepare_origin, plan)):
+            if ok:
+                changed[spec['name']] = result
+            else:
+                failed[spec['name']] = result
+
+        # Step 2, the clones. Snapshot clones are cheap and can run
+        # concurrently, full copies of an origin run one at a time.
+        clone_tasks = list()
+        for spec, clones in plan:
+            if spec['name'] in failed:
+                continue
+            copies = list()
+            for clone_spec in clones:
+                if self._manager(clone_spec)._clone_snapshot():
+                    clone_tasks.append([clone_spec])
+                else:
+                    copies.append(clone_spec)
+            if copies:
+                clone_tasks.append(copies)
+
+        cloned = dict()
+        for specs, (ok, result) in zip(
+                clone_tasks, self._map(self._clone, clone_tasks)):
+            for clone_spec in specs:
+                cloned[clone_spec['clone_name']] = (ok, result)
+                if not ok:
+                    # Do not create a failed clone from its template.
+                    failed[clone_spec['clone_name']] = result
+
+        # Step 3, the requested state of every container.
+        pending = [i for i in plan if i[0]['name'] not in failed]
+        for (spec, clones), (ok, result) in zip(
+                pending, self._map(self._apply_state, pending)):
+            if ok:
+                changed[spec['name']] = changed.get(spec['name']) or result[0]
+                outcomes[spec['name']] = result[1]
+            else:
+                failed[spec['name']] = result
+
+        results = list()
+        errors = list()
+        for spec in self.module.params.get('containers'):
+            name = spec['name']
+            result = {'name': name}
+            if name in failed:
+                result.update(failed[name])
+                result['failed'] = True
+            else:
+                result['changed'] = changed.get(name, False)
+                result['lxc_container'] = outcomes.get(name)
+
+            clone_name = spec.get('clone_name')
+            if clone_name:
+                result['clone_name'] = clone_name
+                if clone_name in cloned:
+                    ok, clone_result = cloned[clone_name]
+                    result['cloned'] = ok
+                    if ok:
+                        result['changed'] = True
+                    else:
+                        result['failed'] = True
+                        result['msg'] = clone_result.get('msg')
+                else:
+                    result['cloned'] = False
+
+            if result.get('failed'):
+                errors.append('%s: %s' % (name, result.get('msg')))
+            results.append(result)
+
+        batch_changed = bool([i for i in results if i.get('changed')])
+        if errors:
+            self.module.fail_json(
+                msg='Failed to manage containers: %s' % '; '.join(errors),
+                changed=batch_changed,
+                containers=results
+            )
+
         self.module.exit_json(
-            changed=self.state_change,
-            lxc_container=outcome
+            changed=batch_changed,
+            containers=results
         )
 
 
@@ -1622,8 +2773,14 @@ def main():
     module = AnsibleModule(
         argument_spec=dict(
             name=dict(
-                type='str',
-                required=True
+                type='str'
+            ),
+            containers=dict(
+                type='list'
+            ),
+            workers=dict(
+                type='int',
+                default=4
             ),
             template=dict(
                 type='str',
@@ -1705,8 +2862,25 @@ def main():
             archive_compression=dict(
                 choices=LXC_COMPRESSION_MAP.keys(),
                 default='gzip'
+            ),
+            state_timeout=dict(
+                type='int',
+                default=120
+            ),
+            archive_mode=dict(
+                choices=['stream', 'copy', 'incremental'],
+                default='stream'
+            ),
+            archive_max_deltas=dict(
+                type='int',
+                default=14
+            ),
+            archive_restore_path=dict(
+                type='str'
             )
         ),
+        required_one_of=[['name', 'containers']],
+        mutually_exclusive=[['name', 'containers']],
         supports_check_mode=False,
     )
 
@@ -1715,6 +2889,36 @@ def main():
             msg='The `lxc` module is not importable. Check the requirements.'
         )
 
+    if module.params.get('archive_restore_path'):
+        if module.boolean(module.params.get('archive')):
+            module.fail_json(
+                msg='archive_restore_path cannot be combined with archive.'
+            )
+        if module.params.get('clone_name'):
+            module.fail_json(
+                msg='archive_restore_path cannot be combined with clone_name.'
+            )
+
+    containers = module.params.get('containers')
+    if containers:
+        batch_keys = [
+            i for i in module.argument_spec.keys()
+            if i not in ['containers', 'workers', 'archive_restore_path']
+        ]
+        for spec in containers:
+            if not isinstance(spec, dict) or not spec.get('name'):
+                module.fail_json(
+                    msg='Every entry of containers needs a name.'
+                )
+            unsupported = [i for i in spec.keys() if i not in batch_keys]
+            if unsupported:
+                module.fail_json(
+                    msg='Unsupported keys for container %s: %s'
+                        % (spec['name'], ', '.join(unsupported))
+                )
+
+        LxcContainerBatch(module=module).run()
+
     lv_name = module.params.get('lv_name')
     if not lv_name:
         module.params['lv_name'] = module.params.get('name')
@@ -40,7 +40,8 @@ options:
     name:
         description:
             - source exchange to create binding on
-        required: true
+            - Required unless C(bindings) is given
+        required: false
         aliases: [ "src", "source" ]
     login_user:
         description:
@@ -71,12 +72,14 @@ options:
     destination:
         description:
             - destination exchange or queue for the binding
-        required: true
+            - Required unless C(bindings) is given
+        required: false
         aliases: [ "dst", "dest" ]
     destination_type:
         description:
             - Either queue or exchange
-        required: true
+            - Required unless C(bindings) is given
+        required: false
         choices: [ "queue", "exchange" ]
         aliases: [ "type", "dest_type" ]
     routing_key:
@@ -90,6 +93,20 @@ options:
             - extra arguments for exchange. If defined this argument is a key/value dictionary
         required: false
         default: {}
+    bindings:
+        description:
+            - List of bindings to declare in one run. Every entry is a dict of
+              the options of this module, options missing from an entry are
+              taken from the module options.
+            - The existing bindings are read with a single export of
+              /api/definitions. Missing bindings are created with a single
+              import to /api/definitions, bindings with state absent are
+              deleted over one keep-alive connection.
+            - The numbers of created, deleted and unchanged bindings are
+              returned.
+        required: false
+        default: null
+        version_added: "2.0"
 '''
 
 EXAMPLES = '''
@@ -98,30 +115,182 @@ EXAMPLES = '''
 
 # Bind directExchange to topicExchange with routing key *.info
 - rabbitmq_binding: name=topicExchange destination=topicExchange type=exchange routing_key="*.info"
+
+# Declare several bindings at once
+- rabbitmq_binding:
+    bindings:
+      - name: orders
+        destination: orders.created
+        destination_type: queue
+        routing_key: order.created
+      - name: orders
+        destination: audit
+        destination_type: exchange
+        routing_key: "#"
 '''
 
 import requests
 import urllib
 import json
 
+BINDING_KEYS = [ 'name', 'state', 'vhost', 'destination', 'destination_type', 'routing_key', 'arguments' ]
+
+class RabbitMqApi(object):
+    """Client of the RabbitMQ HTTP management API.
+
+    All requests share one keep-alive session and writes are skipped in
+    check mode.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.base_url = 'http://%s:%s/api' % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def request(self, method, parts, data=None, run_in_check_mode=False):
+        if self.module.check_mode and not run_in_check_mode:
+            return None
+        if data is not None:
+            data = json.dumps(data)
+        try:
+            r = self.session.request(method, self._url(*parts), data=data)
+        except requests.exceptions.RequestException, e:
+            self.module.fail_json(msg="Error talking to the management API: %s" % str(e))
+        if r.status_code not in [200, 201, 204]:
+            self.module.fail_json(msg="Invalid response from the management API",
+                                  url=self._url(*parts), status=r.status_code, details=r.text)
+        if r.status_code == 200 and r.text:
+            return r.json()
+        return None
+
+def bulk_value(module, option, key, value):
+    # Convert an entry value like AnsibleModule converts the parameter key
+    spec = module.argument_spec[key]
+    wanted = spec.get('type', 'str')
+    if value is None:
+        return None
+    try:
+        if wanted == 'int':
+            value = int(value)
+        elif wanted == 'bool':
+            value = module.boolean(value)
+        elif wanted == 'dict':
+            if not isinstance(value, dict):
+                raise ValueError()
+        elif not isinstance(value, basestring):
+            value = str(value)
+    except (TypeError, ValueError):
+        module.fail_json(msg = "%s of an entry of %s must be of type %s, got %r" % (key, option, wanted, value))
+    if spec.get('choices') and value not in spec['choices']:
+        module.fail_json(msg = "%s of an entry of %s must be one of: %s, got: %s" % (key, option, ', '.join(spec['choices']), value))
+    return value
+
+def bulk_specs(module, option, keys):
+    # Merge every entry of option over the module parameters, aliases and
+    # value types are handled the same way as for the single object options
+    aliases = {}
+    for k in keys:
+        for alias in module.argument_spec[k].get('aliases', []):
+            aliases[alias] = k
+    specs = []
+    for entry in module.params[option]:
+        if not isinstance(entry, dict):
+            module.fail_json(msg = "Every entry of %s must be a dict" % option)
+        unsupported = [ k for k in entry.keys() if k not in keys and k not in aliases ]
+        if unsupported:
+            module.fail_json(msg = "Unsupported keys in %s: %s" % (option, ', '.join(unsupported)))
+        spec = dict((k, module.params.get(k)) for k in keys)
+        for k, v in entry.items():
+            k = aliases.get(k, k)
+            spec[k] = bulk_value(module, option, k, v)
+        specs.append(spec)
+    return specs
+
+def binding_key(binding):
+    return (binding['vhost'], binding['source'], binding['destination'], binding['destination_type'],
+            binding['routing_key'], json.dumps(binding['arguments'] or {}, sort_keys=True))
+
+def bulk_bindings(module):
+    api = RabbitMqApi(module)
+    definitions = api.request('GET', ['definitions'], run_in_check_mode=True)
+    existing = set(binding_key(b) for b in definitions.get('bindings', []))
+
+    create = []
+    delete = []
+    unchanged = 0
+    for spec in bulk_specs(module, 'bindings', BINDING_KEYS):
+        if not spec['name'] or not spec['destination'] or spec['destination_type'] not in ['queue', 'exchange']:
+            module.fail_json(msg = "Every entry of bindings needs a name, destination and destination_type")
+        binding = {
+            "source": spec['name'],
+            "vhost": spec['vhost'],
+            "destination": spec['destination'],
+            "destination_type": spec['destination_type'],
+            "routing_key": spec['routing_key'],
+            "arguments": spec['arguments'] or {}
+        }
+        key = binding_key(binding)
+
+        if spec['state'] == 'absent':
+            if key in existing:
+                delete.append(binding)
+                existing.discard(key)
+        elif key not in existing:
+            create.append(binding)
+            existing.add(key)
+        else:
+            unchanged += 1
+
+    if not module.check_mode:
+        if create:
+            api.request('POST', ['definitions'], { "bindings": create })
+        for binding in delete:
+            # Bindings are deleted by their properties key
+            parts = ['bindings', binding['vhost'], 'e', binding['source'], binding['destination_type'][0], binding['destination']]
+            for current in api.request('GET', parts, run_in_check_mode=True):
+                if current['routing_key'] == binding['routing_key'] and (current['arguments'] or {}) == binding['arguments']:
+                    api.request('DELETE', parts + [current['properties_key']])
+
+    module.exit_json(
+        changed = len(create) > 0 or len(delete) > 0,
+        created = len(create),
+        deleted = len(delete),
+        unchanged = unchanged
+    )
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             state = dict(default='present', choices=['present', 'absent'], type='str'),
-            name = dict(required=True, aliases=[ "src", "source" ], type='str'),
+            name = dict(required=False, aliases=[ "src", "source" ], type='str'),
             login_user = dict(default='guest', type='str'),
             login_password = dict(default='guest', type='str', no_log=True),
             login_host = dict(default='localhost', type='str'),
             login_port = dict(default='15672', type='str'),
             vhost = dict(default='/', type='str'),
-            destination = dict(required=True, aliases=[ "dst", "dest"], type='str'),
-            destination_type = dict(required=True, aliases=[ "type", "dest_type"], choices=[ "queue", "exchange" ],type='str'),
+            destination = dict(required=False, aliases=[ "dst", "dest"], type='str'),
+            destination_type = dict(required=False, aliases=[ "type", "dest_type"], choices=[ "queue", "exchange" ],type='str'),
             routing_key = dict(default='#', type='str'),
-            arguments = dict(default=dict(), type='dict')
+            arguments = dict(default=dict(), type='dict'),
+            bindings = dict(default=None, type='list')
         ),
+        required_one_of = [['name', 'bindings']],
+        mutually_exclusive = [['name', 'bindings']],
         supports_check_mode = True
     )
 
+    if module.params['bindings']:
+        bulk_bindings(module)
+
+    if not module.params['destination'] or not module.params['destination_type']:
+        module.fail_json(msg = "destination and destination_type are required unless bindings is given")
+
     if module.params['destination_type'] == "queue":
         dest_type="q"
     else:
@@ -33,7 +33,8 @@ options:
     name:
         description:
             - Name of the exchange to create
-        required: true
+            - Required unless C(exchanges) is given
+        required: false
     state:
         description:
             - Whether the exchange should be present or absent
@@ -96,6 +97,20 @@ options:
             - extra arguments for exchange. If defined this argument is a key/value dictionary
         required: false
         default: {}
+    exchanges:
+        description:
+            - List of exchanges to declare in one run. Every entry is a dict of
+              the options of this module, options missing from an entry are
+              taken from the module options.
+            - The existing exchanges are read with a single export of
+              /api/definitions. Missing exchanges are created with a single
+              import to /api/definitions, exchanges with state absent are
+              deleted over one keep-alive connection.
+            - The numbers of created, deleted and unchanged exchanges are
+              returned.
+        required: false
+        default: null
+        version_added: "2.0"
 '''
 
 EXAMPLES = '''
@@ -104,17 +119,158 @@ EXAMPLES = '''
 
 # Create topic exchange on vhost
 - rabbitmq_exchange: name=topicExchange type=topic vhost=myVhost
+
+# Declare several exchanges at once
+- rabbitmq_exchange:
+    vhost: myVhost
+    exchanges:
+      - name: orders
+        type: topic
+      - name: audit
+        type: fanout
 '''
 
 import requests
 import urllib
 import json
 
+EXCHANGE_KEYS = [ 'name', 'state', 'vhost', 'durable', 'auto_delete', 'internal', 'exchange_type', 'arguments' ]
+
+class RabbitMqApi(object):
+    """Client of the RabbitMQ HTTP management API.
+
+    All requests share one keep-alive session and writes are skipped in
+    check mode.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.base_url = 'http://%s:%s/api' % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def request(self, method, parts, data=None, run_in_check_mode=False):
+        if self.module.check_mode and not run_in_check_mode:
+            return None
+        if data is not None:
+            data = json.dumps(data)
+        try:
+            r = self.session.request(method, self._url(*parts), data=data)
+        except requests.exceptions.RequestException, e:
+            self.module.fail_json(msg="Error talking to the management API: %s" % str(e))
+        if r.status_code not in [200, 201, 204]:
+            self.module.fail_json(msg="Invalid response from the management API",
+                                  url=self._url(*parts), status=r.status_code, details=r.text)
+        if r.status_code == 200 and r.text:
+            return r.json()
+        return None
+
+def bulk_value(module, option, key, value):
+    # Convert an entry value like AnsibleModule converts the parameter key
+    spec = module.argument_spec[key]
+    wanted = spec.get('type', 'str')
+    if value is None:
+        return None
+    try:
+        if wanted == 'int':
+            value = int(value)
+        elif wanted == 'bool':
+            value = module.boolean(value)
+        elif wanted == 'dict':
+            if not isinstance(value, dict):
+                raise ValueError()
+        elif not isinstance(value, basestring):
+            value = str(value)
+    except (TypeError, ValueError):
+        module.fail_json(msg = "%s of an entry of %s must be of type %s, got %r" % (key, option, wanted, value))
+    if spec.get('choices') and value not in spec['choices']:
+        module.fail_json(msg = "%s of an entry of %s must be one of: %s, got: %s" % (key, option, ', '.join(spec['choices']), value))
+    return value
+
+def bulk_specs(module, option, keys):
+    # Merge every entry of option over the module parameters, aliases and
+    # value types are handled the same way as for the single object options
+    aliases = {}
+    for k in keys:
+        for alias in module.argument_spec[k].get('aliases', []):
+            aliases[alias] = k
+    specs = []
+    for entry in module.params[option]:
+        if not isinstance(entry, dict):
+            module.fail_json(msg = "Every entry of %s must be a dict" % option)
+        unsupported = [ k for k in entry.keys() if k not in keys and k not in aliases ]
+        if unsupported:
+            module.fail_json(msg = "Unsupported keys in %s: %s" % (option, ', '.join(unsupported)))
+        spec = dict((k, module.params.get(k)) for k in keys)
+        for k, v in entry.items():
+            k = aliases.get(k, k)
+            spec[k] = bulk_value(module, option, k, v)
+        specs.append(spec)
+    return specs
+
+def bulk_exchanges(module):
+    api = RabbitMqApi(module)
+    definitions = api.request('GET', ['definitions'], run_in_check_mode=True)
+    existing = dict(((e['vhost'], e['name']), e) for e in definitions.get('exchanges', []))
+
+    create = []
+    delete = []
+    conflicts = []
+    unchanged = 0
+    for spec in bulk_specs(module, 'exchanges', EXCHANGE_KEYS):
+        exchange = {
+            "name": spec['name'],
+            "vhost": spec['vhost'],
+            "type": spec['exchange_type'],
+            "durable": module.boolean(spec['durable']),
+            "auto_delete": module.boolean(spec['auto_delete']),
+            "internal": module.boolean(spec['internal']),
+            "arguments": spec['arguments'] or {}
+        }
+        key = (exchange['vhost'], exchange['name'])
+        current = existing.get(key)
+
+        if spec['state'] == 'absent':
+            if current is not None:
+                delete.append(exchange)
+                del existing[key]
+        elif current is None:
+            create.append(exchange)
+            existing[key] = exchange
+        elif [ current[k] for k in ['durable', 'auto_delete', 'internal', 'type'] ] != [ exchange[k] for k in ['durable', 'auto_delete', 'internal', 'type'] ]:
+            conflicts.append(exchange['name'])
+        else:
+            unchanged += 1
+
+    if conflicts:
+        module.fail_json(
+            msg = "RabbitMQ RESTAPI doesn't support attribute changes for existing exchanges",
+            exchanges = conflicts
+        )
+
+    if not module.check_mode:
+        if create:
+            api.request('POST', ['definitions'], { "exchanges": create })
+        for exchange in delete:
+            api.request('DELETE', ['exchanges', exchange['vhost'], exchange['name']])
+
+    module.exit_json(
+        changed = len(create) > 0 or len(delete) > 0,
+        created = len(create),
+        deleted = len(delete),
+        unchanged = unchanged
+    )
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             state = dict(default='present', choices=['present', 'absent'], type='str'),
-            name = dict(required=True, type='str'),
+            name = dict(required=False, type='str'),
             login_user = dict(default='guest', type='str'),
             login_password = dict(default='guest', type='str', no_log=True),
             login_host = dict(default='localhost', type='str'),
@@ -124,11 +280,17 @@ def main():
             auto_delete = dict(default=False, choices=BOOLEANS, type='bool'),
             internal = dict(default=False, choices=BOOLEANS, type='bool'),
             exchange_type = dict(default='direct', aliases=['type'], type='str'),
-            arguments = dict(default=dict(), type='dict')
+            arguments = dict(default=dict(), type='dict'),
+            exchanges = dict(default=None, type='list')
         ),
+        required_one_of = [['name', 'exchanges']],
+        mutually_exclusive = [['name', 'exchanges']],
         supports_check_mode = True
     )
 
+    if module.params['exchanges']:
+        bulk_exchanges(module)
+
     url = "http://%s:%s/api/exchanges/%s/%s" % (
         module.params['login_host'],
         module.params['login_port'],
@@ -78,11 +78,14 @@ class RabbitMqPlugins(object):
     def get_all(self):
         return self._exec(['list', '-E', '-m'], True)
 
-    def enable(self, name):
-        self._exec(['enable', name])
+    def enable(self, names):
+        # a single rabbitmq-plugins run handles all of the plugins
+        if names:
+            self._exec(['enable'] + names)
 
-    def disable(self, name):
-        self._exec(['disable', name])
+    def disable(self, names):
+        if names:
+            self._exec(['disable'] + names)
 
 def main():
     arg_spec = dict(
@@ -109,19 +112,19 @@ def main():
         if not new_only:
             for plugin in enabled_plugins:
                 if plugin not in names:
-                    rabbitmq_plugins.disable(plugin)
                     disabled.append(plugin)
 
         for name in names:
             if name not in enabled_plugins:
-                rabbitmq_plugins.enable(name)
                 enabled.append(name)
     else:
         for plugin in enabled_plugins:
             if plugin in names:
-                rabbitmq_plugins.disable(plugin)
                 disabled.append(plugin)
 
+    rabbitmq_plugins.disable(disabled)
+    rabbitmq_plugins.enable(enabled)
+
     changed = len(enabled) > 0 or len(disabled) > 0
     module.exit_json(changed=changed, enabled=enabled, disabled=disabled)
 
@@ -63,6 +63,43 @@ options:
       - The state of the policy.
     default: present
     choices: [present, absent]
+  backend:
+    description:
+      - How RabbitMQ is managed. C(rabbitmqctl) runs rabbitmqctl for every
+        operation. C(api) uses the HTTP management API over a single
+        keep-alive connection, reads all policies of the vhost with one
+        request and writes the policy with an import to /api/definitions.
+        C(auto) uses the management API when it answers and falls back to
+        rabbitmqctl otherwise.
+    required: false
+    default: rabbitmqctl
+    choices: [rabbitmqctl, api, auto]
+    version_added: "2.0"
+  login_user:
+    description:
+      - RabbitMQ user for the management API.
+    required: false
+    default: guest
+    version_added: "2.0"
+  login_password:
+    description:
+      - RabbitMQ password for the management API.
+    required: false
+    default: guest
+    version_added: "2.0"
+  login_host:
+    description:
+      - RabbitMQ host for the management API.
+    required: false
+    default: localhost
+    version_added: "2.0"
+  login_port:
+    description:
+      - RabbitMQ management API port.
+    required: false
+    default: 15672
+    version_added: "2.0"
+requirements: [ "python requests, for the api backend" ]
 '''
 
 EXAMPLES = '''
@@ -74,17 +111,104 @@ EXAMPLES = '''
 
 - name: ensure the default vhost contains the HA policy
   rabbitmq_policy: name=HA pattern='.*' tags="ha-mode=all"
+
+- name: ensure the default vhost contains the HA policy, using the management API
+  rabbitmq_policy: name=HA pattern='.*' backend=api login_user=admin login_password=secret
+  args:
+    tags:
+      "ha-mode": all
 '''
+
+import urllib
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+class RabbitMqApi(object):
+    """Client of the RabbitMQ HTTP management API.
+
+    All requests share one keep-alive session and writes are skipped in
+    check mode. Collections are read with one request each and cached,
+    callers keep them up to date with the writes they make. Created and
+    updated objects are queued with define() and imported by flush() with
+    a single POST to /api/definitions.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.base_url = 'http://%s:%s/api' % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self._collections = {}
+        self._definitions = {}
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def available(self):
+        try:
+            r = self.session.get(self._url('overview'), timeout=10)
+        except requests.exceptions.RequestException:
+            return False
+        return r.status_code == 200
+
+    def request(self, method, parts, data=None, run_in_check_mode=False):
+        if self.module.check_mode and not run_in_check_mode:
+            return None
+        if data is not None:
+            data = json.dumps(data)
+        try:
+            r = self.session.request(method, self._url(*parts), data=data)
+        except requests.exceptions.RequestException, e:
+            self.module.fail_json(msg="Error talking to the management API: %s" % str(e))
+        if r.status_code not in [200, 201, 204]:
+            self.module.fail_json(msg="Invalid response from the management API",
+                                  url=self._url(*parts), status=r.status_code, details=r.text)
+        if r.status_code == 200 and r.text:
+            return r.json()
+        return None
+
+    def collection(self, parts, key):
+        """Return the items at parts, read once and indexed by key(item)."""
+        name = '/'.join(parts)
+        if name not in self._collections:
+            items = self.request('GET', parts, run_in_check_mode=True) or []
+            self._collections[name] = dict((key(item), item) for item in items)
+        return self._collections[name]
+
+    def define(self, kind, item):
+        """Queue item for the kind (users, vhosts, ...) of the next import."""
+        self._definitions.setdefault(kind, []).append(item)
+
+    def flush(self):
+        if self._definitions:
+            self.request('POST', ['definitions'], self._definitions)
+            self._definitions = {}
+
+
 class RabbitMqPolicy(object):
-    def __init__(self, module, name):
+    def __init__(self, module, name, api=None):
         self._module = module
+        self._api = api
         self._name = name
         self._vhost = module.params['vhost']
         self._pattern = module.params['pattern']
         self._tags = module.params['tags']
         self._priority = module.params['priority']
         self._node = module.params['node']
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self._module.check_mode or (self._module.check_mode and run_in_check_mode):
@@ -96,6 +220,9 @@ class RabbitMqPolicy(object):
         return list()
 
     def list(self):
+        if self._api is not None:
+            return self._name in self._api.collection(['policies', self._vhost], lambda policy: policy['name'])
+
         policies = self._exec(['list_policies'], True)
 
         for policy in policies:
@@ -105,7 +232,12 @@ class RabbitMqPolicy(object):
         return False
 
     def set(self):
-        import json
+        if self._api is not None:
+            self._api.define('policies', {'vhost': self._vhost, 'name': self._name, 'pattern': self._pattern,
+                                          'apply-to': 'all', 'definition': self._tags,
+                                          'priority': int(self._priority)})
+            return
+
         args = ['set_policy']
         args.append(self._name)
         args.append(self._pattern)
@@ -115,9 +247,29 @@ class RabbitMqPolicy(object):
         return self._exec(args)
 
     def clear(self):
+        if self._api is not None:
+            self._api.flush()
+            return self._api.request('DELETE', ['policies', self._vhost, self._name])
         return self._exec(['clear_policy', self._name])
 
 
+def get_api(module):
+    backend = module.params['backend']
+    if backend == 'rabbitmqctl':
+        return None
+
+    if not HAS_REQUESTS:
+        if backend == 'api':
+            module.fail_json(msg="python requests is required for the api backend")
+        return None
+
+    api = RabbitMqApi(module)
+    if not api.available():
+        if backend == 'api':
+            module.fail_json(msg="The RabbitMQ management API is not available at %s" % api.base_url)
+        return None
+    return api
+
 def main():
     arg_spec = dict(
         name=dict(required=True),
@@ -127,6 +279,11 @@ def main():
         priority=dict(default='0'),
         node=dict(default='rabbit'),
         state=dict(default='present', choices=['present', 'absent']),
+        backend=dict(default='rabbitmqctl', choices=['rabbitmqctl', 'api', 'auto']),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
     )
 
     module = AnsibleModule(
@@ -136,7 +293,8 @@ def main():
 
     name = module.params['name']
     state = module.params['state']
-    rabbitmq_policy = RabbitMqPolicy(module, name)
+    api = get_api(module)
+    rabbitmq_policy = RabbitMqPolicy(module, name, api)
 
     changed = False
     if rabbitmq_policy.list():
@@ -149,6 +307,8 @@ def main():
         rabbitmq_policy.set()
         changed = True
 
+    if api is not None:
+        api.flush()
     module.exit_json(changed=changed, name=name, state=state)
 
 # import module snippets
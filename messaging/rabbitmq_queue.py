@@ -33,7 +33,8 @@ options:
     name:
         description:
             - Name of the queue to create
-        required: true
+            - Required unless C(queues) is given
+        required: false
     state:
         description:
             - Whether the queue should be present or absent
@@ -110,6 +111,20 @@ options:
             - extra arguments for queue. If defined this argument is a key/value dictionary
         required: false
         default: {}
+    queues:
+        description:
+            - List of queues to declare in one run. Every entry is a dict of
+              the options of this module, options missing from an entry are
+              taken from the module options.
+            - The existing queues are read with a single export of
+              /api/definitions. Missing queues are created with a single
+              import to /api/definitions, queues with state absent are
+              deleted over one keep-alive connection.
+            - The numbers of created, deleted and unchanged queues are
+              returned.
+        required: false
+        default: null
+        version_added: "2.0"
 '''
 
 EXAMPLES = '''
@@ -118,17 +133,170 @@ EXAMPLES = '''
 
 # Create a queue on remote host
 - rabbitmq_queue: name=myRemoteQueue login_user=user login_password=secret login_host=remote.example.org
+
+# Declare several queues at once
+- rabbitmq_queue:
+    queues:
+      - name: orders
+      - name: orders.retry
+        message_ttl: 30000
+        dead_letter_exchange: orders
+      - name: legacy
+        state: absent
 '''
 
 import requests
 import urllib
 import json
 
+QUEUE_KEYS = [ 'name', 'state', 'vhost', 'durable', 'auto_delete', 'message_ttl', 'auto_expires', 'max_length',
+               'dead_letter_exchange', 'dead_letter_routing_key', 'arguments' ]
+
+QUEUE_ARGUMENTS = {
+    'message_ttl': 'x-message-ttl',
+    'auto_expires': 'x-expires',
+    'max_length': 'x-max-length',
+    'dead_letter_exchange': 'x-dead-letter-exchange',
+    'dead_letter_routing_key': 'x-dead-letter-routing-key'
+}
+
+class RabbitMqApi(object):
+    """Client of the RabbitMQ HTTP management API.
+
+    All requests share one keep-alive session and writes are skipped in
+    check mode.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.base_url = 'http://%s:%s/api' % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def request(self, method, parts, data=None, run_in_check_mode=False):
+        if self.module.check_mode and not run_in_check_mode:
+            return None
+        if data is not None:
+            data = json.dumps(data)
+        try:
+            r = self.session.request(method, self._url(*parts), data=data)
+        except requests.exceptions.RequestException, e:
+            self.module.fail_json(msg="Error talking to the management API: %s" % str(e))
+        if r.status_code not in [200, 201, 204]:
+            self.module.fail_json(msg="Invalid response from the management API",
+                                  url=self._url(*parts), status=r.status_code, details=r.text)
+        if r.status_code == 200 and r.text:
+            return r.json()
+        return None
+
+def bulk_value(module, option, key, value):
+    # Convert an entry value like AnsibleModule converts the parameter key
+    spec = module.argument_spec[key]
+    wanted = spec.get('type', 'str')
+    if value is None:
+        return None
+    try:
+        if wanted == 'int':
+            value = int(value)
+        elif wanted == 'bool':
+            value = module.boolean(value)
+        elif wanted == 'dict':
+            if not isinstance(value, dict):
+                raise ValueError()
+        elif not isinstance(value, basestring):
+            value = str(value)
+    except (TypeError, ValueError):
+        module.fail_json(msg = "%s of an entry of %s must be of type %s, got %r" % (key, option, wanted, value))
+    if spec.get('choices') and value not in spec['choices']:
+        module.fail_json(msg = "%s of an entry of %s must be one of: %s, got: %s" % (key, option, ', '.join(spec['choices']), value))
+    return value
+
+def bulk_specs(module, option, keys):
+    # Merge every entry of option over the module parameters, aliases and
+    # value types are handled the same way as for the single object options
+    aliases = {}
+    for k in keys:
+        for alias in module.argument_spec[k].get('aliases', []):
+            aliases[alias] = k
+    specs = []
+    for entry in module.params[option]:
+        if not isinstance(entry, dict):
+            module.fail_json(msg = "Every entry of %s must be a dict" % option)
+        unsupported = [ k for k in entry.keys() if k not in keys and k not in aliases ]
+        if unsupported:
+            module.fail_json(msg = "Unsupported keys in %s: %s" % (option, ', '.join(unsupported)))
+        spec = dict((k, module.params.get(k)) for k in keys)
+        for k, v in entry.items():
+            k = aliases.get(k, k)
+            spec[k] = bulk_value(module, option, k, v)
+        specs.append(spec)
+    return specs
+
+def bulk_queues(module):
+    api = RabbitMqApi(module)
+    definitions = api.request('GET', ['definitions'], run_in_check_mode=True)
+    existing = dict(((q['vhost'], q['name']), q) for q in definitions.get('queues', []))
+
+    create = []
+    delete = []
+    conflicts = []
+    unchanged = 0
+    for spec in bulk_specs(module, 'queues', QUEUE_KEYS):
+        arguments = dict(spec['arguments'] or {})
+        for k, v in QUEUE_ARGUMENTS.items():
+            if spec[k]:
+                arguments[v] = spec[k]
+        queue = {
+            "name": spec['name'],
+            "vhost": spec['vhost'],
+            "durable": module.boolean(spec['durable']),
+            "auto_delete": module.boolean(spec['auto_delete']),
+            "arguments": arguments
+        }
+        key = (queue['vhost'], queue['name'])
+        current = existing.get(key)
+
+        if spec['state'] == 'absent':
+            if current is not None:
+                delete.append(queue)
+                del existing[key]
+        elif current is None:
+            create.append(queue)
+            existing[key] = queue
+        elif (current['durable'], current['auto_delete'], current['arguments']) != (queue['durable'], queue['auto_delete'], queue['arguments']):
+            conflicts.append(queue['name'])
+        else:
+            unchanged += 1
+
+    if conflicts:
+        module.fail_json(
+            msg = "RabbitMQ RESTAPI doesn't support attribute changes for existing queues",
+            queues = conflicts
+        )
+
+    if not module.check_mode:
+        if create:
+            api.request('POST', ['definitions'], { "queues": create })
+        for queue in delete:
+            api.request('DELETE', ['queues', queue['vhost'], queue['name']])
+
+    module.exit_json(
+        changed = len(create) > 0 or len(delete) > 0,
+        created = len(create),
+        deleted = len(delete),
+        unchanged = unchanged
+    )
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             state = dict(default='present', choices=['present', 'absent'], type='str'),
-            name = dict(required=True, type='str'),
+            name = dict(required=False, type='str'),
             login_user = dict(default='guest', type='str'),
             login_password = dict(default='guest', type='str', no_log=True),
             login_host = dict(default='localhost', type='str'),
@@ -141,11 +309,17 @@ def main():
             max_length = dict(default=None, type='int'),
             dead_letter_exchange = dict(default=None, type='str'),
             dead_letter_routing_key = dict(default=None, type='str'),
-            arguments = dict(default=dict(), type='dict')
+            arguments = dict(default=dict(), type='dict'),
+            queues = dict(default=None, type='list')
         ),
+        required_one_of = [['name', 'queues']],
+        mutually_exclusive = [['name', 'queues']],
         supports_check_mode = True
     )
 
+    if module.params['queues']:
+        bulk_queues(module)
+
     url = "http://%s:%s/api/queues/%s/%s" % (
         module.params['login_host'],
         module.params['login_port'],
@@ -30,7 +30,8 @@ options:
   user:
     description:
       - Name of user to add
-    required: true
+      - Required unless C(users) is given.
+    required: false
     default: null
     aliases: [username, name]
   password:
@@ -42,7 +43,7 @@ options:
     default: null
   tags:
     description:
-      - User tags specified as comma delimited
+      - User tags specified as comma delimited, or since 2.0 as a list
     required: false
     default: null
   vhost:
@@ -89,6 +90,53 @@ options:
     required: false
     default: present
     choices: [present, absent]
+  users:
+    description:
+      - List of users to manage in one run. Every entry is a dict with a
+        C(user) and any of C(password), C(tags), C(vhost), C(configure_priv),
+        C(write_priv), C(read_priv), C(force) and C(state). Options missing
+        from an entry are taken from the module options.
+    required: false
+    default: null
+    version_added: "2.0"
+  backend:
+    description:
+      - How RabbitMQ is managed. C(rabbitmqctl) runs rabbitmqctl for every
+        operation. C(api) uses the HTTP management API over a single
+        keep-alive connection, reads all users and permissions with one
+        request each and writes all of the created and updated users and
+        permissions with a single import to /api/definitions. C(auto)
+        uses the management API when it answers and falls back to
+        rabbitmqctl otherwise.
+    required: false
+    default: rabbitmqctl
+    choices: [rabbitmqctl, api, auto]
+    version_added: "2.0"
+  login_user:
+    description:
+      - RabbitMQ user for the management API.
+    required: false
+    default: guest
+    version_added: "2.0"
+  login_password:
+    description:
+      - RabbitMQ password for the management API.
+    required: false
+    default: guest
+    version_added: "2.0"
+  login_host:
+    description:
+      - RabbitMQ host for the management API.
+    required: false
+    default: localhost
+    version_added: "2.0"
+  login_port:
+    description:
+      - RabbitMQ management API port.
+    required: false
+    default: 15672
+    version_added: "2.0"
+requirements: [ "python requests, for the api backend" ]
 '''
 
 EXAMPLES = '''
@@ -100,16 +148,115 @@ EXAMPLES = '''
                  read_priv=.*
                  write_priv=.*
                  state=present
+
+# Add several users through the management API
+- rabbitmq_user: backend=api
+                 login_user=admin
+                 login_password=secret
+                 vhost=/
+                 configure_priv=.*
+                 read_priv=.*
+                 write_priv=.*
+  args:
+    users:
+      - user: app1
+        password: changeme
+      - user: app2
+        password: changeme
+        tags: monitoring
+      - user: olduser
+        state: absent
 '''
 
+import urllib
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+class RabbitMqApi(object):
+    """Client of the RabbitMQ HTTP management API.
+
+    All requests share one keep-alive session and writes are skipped in
+    check mode. Collections are read with one request each and cached,
+    callers keep them up to date with the writes they make. Created and
+    updated objects are queued with define() and imported by flush() with
+    a single POST to /api/definitions.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.base_url = 'http://%s:%s/api' % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self._collections = {}
+        self._definitions = {}
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def available(self):
+        try:
+            r = self.session.get(self._url('overview'), timeout=10)
+        except requests.exceptions.RequestException:
+            return False
+        return r.status_code == 200
+
+    def request(self, method, parts, data=None, run_in_check_mode=False):
+        if self.module.check_mode and not run_in_check_mode:
+            return None
+        if data is not None:
+            data = json.dumps(data)
+        try:
+            r = self.session.request(method, self._url(*parts), data=data)
+        except requests.exceptions.RequestException, e:
+            self.module.fail_json(msg="Error talking to the management API: %s" % str(e))
+        if r.status_code not in [200, 201, 204]:
+            self.module.fail_json(msg="Invalid response from the management API",
+                                  url=self._url(*parts), status=r.status_code, details=r.text)
+        if r.status_code == 200 and r.text:
+            return r.json()
+        return None
+
+    def collection(self, parts, key):
+        """Return the items at parts, read once and indexed by key(item)."""
+        name = '/'.join(parts)
+        if name not in self._collections:
+            items = self.request('GET', parts, run_in_check_mode=True) or []
+            self._collections[name] = dict((key(item), item) for item in items)
+        return self._collections[name]
+
+    def define(self, kind, item):
+        """Queue item for the kind (users, vhosts, ...) of the next import."""
+        self._definitions.setdefault(kind, []).append(item)
+
+    def flush(self):
+        if self._definitions:
+            self.request('POST', ['definitions'], self._definitions)
+            self._definitions = {}
+
+
 class RabbitMqUser(object):
-    def __init__(self, module, username, password, tags, vhost, configure_priv, write_priv, read_priv, node):
+    def __init__(self, module, username, password, tags, vhost, configure_priv, write_priv, read_priv, node, api=None):
         self.module = module
+        self.api = api
         self.username = username
         self.password = password
         self.node = node
         if tags is None:
             self.tags = list()
+        elif isinstance(tags, list):
+            self.tags = [str(tag) for tag in tags]
         else:
             self.tags = tags.split(',')
 
@@ -123,7 +270,9 @@ class RabbitMqUser(object):
 
         self._tags = None
         self._permissions = None
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        self._user = None
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self.module.check_mode or (self.module.check_mode and run_in_check_mode):
@@ -133,6 +282,9 @@ class RabbitMqUser(object):
         return list()
 
     def get(self):
+        if self.api is not None:
+            return self._api_get()
+
         users = self._exec(['list_users'], True)
 
         for user_tag in users:
@@ -151,6 +303,25 @@ class RabbitMqUser(object):
                 return True
         return False
 
+    def _api_get(self):
+        user = api_users(self.api).get(self.username)
+        if user is None:
+            return False
+
+        self._user = user
+        tags = user.get('tags') or []
+        if not isinstance(tags, list):
+            tags = tags.split(',')
+        self._tags = [tag for tag in tags if tag]
+
+        perm = api_permissions(self.api).get((self.username, self.permissions['vhost']))
+        if perm is None:
+            self._permissions = dict()
+        else:
+            self._permissions = dict(vhost=perm['vhost'], configure_priv=perm['configure'],
+                                     write_priv=perm['write'], read_priv=perm['read'])
+        return True
+
     def _get_permissions(self):
         perms_out = self._exec(['list_user_permissions', self.username], True)
 
@@ -162,19 +333,56 @@ class RabbitMqUser(object):
         return dict()
 
     def add(self):
-        if self.password is not None:
+        if self.api is not None:
+            # tags are set along with the user
+            data = dict(tags=','.join(self.tags))
+            if self.password is not None:
+                data['password'] = self.password
+            else:
+                data['password_hash'] = ''
+            self._put_user(data)
+            self._tags = list(self.tags)
+        elif self.password is not None:
             self._exec(['add_user', self.username, self.password])
         else:
             self._exec(['add_user', self.username, ''])
             self._exec(['clear_password', self.username])
 
     def delete(self):
-        self._exec(['delete_user', self.username])
+        if self.api is not None:
+            # queued writes for the user have to be imported before it goes
+            self.api.flush()
+            self.api.request('DELETE', ['users', self.username])
+            api_users(self.api).pop(self.username, None)
+            permissions = api_permissions(self.api)
+            for key in [key for key in permissions if key[0] == self.username]:
+                del permissions[key]
+        else:
+            self._exec(['delete_user', self.username])
 
     def set_tags(self):
-        self._exec(['set_user_tags', self.username] + self.tags)
+        if self.api is not None:
+            if self._tags is not None and not self.has_tags_modifications():
+                return
+            # the API replaces the whole user, keep its password
+            data = dict(tags=','.join(self.tags), password_hash=self._user.get('password_hash', ''))
+            if self._user.get('hashing_algorithm'):
+                data['hashing_algorithm'] = self._user['hashing_algorithm']
+            self._put_user(data)
+        else:
+            self._exec(['set_user_tags', self.username] + self.tags)
 
     def set_permissions(self):
+        if self.api is not None:
+            vhost = self.permissions['vhost']
+            data = dict(user=self.username, vhost=vhost,
+                        configure=self.permissions['configure_priv'],
+                        write=self.permissions['write_priv'],
+                        read=self.permissions['read_priv'])
+            self.api.define('permissions', data)
+            api_permissions(self.api)[(self.username, vhost)] = data
+            return
+
         cmd = ['set_permissions']
         cmd.append('-p')
         cmd.append(self.permissions['vhost'])
@@ -184,42 +392,29 @@ class RabbitMqUser(object):
         cmd.append(self.permissions['read_priv'])
         self._exec(cmd)
 
+    def _put_user(self, data):
+        data = dict(data, name=self.username)
+        self.api.define('users', data)
+        api_users(self.api)[self.username] = data
+
     def has_tags_modifications(self):
         return set(self.tags) != set(self._tags)
 
     def has_permissions_modifications(self):
         return self._permissions != self.permissions
 
-def main():
-    arg_spec = dict(
-        user=dict(required=True, aliases=['username', 'name']),
-        password=dict(default=None),
-        tags=dict(default=None),
-        vhost=dict(default='/'),
-        configure_priv=dict(default='^$'),
-        write_priv=dict(default='^$'),
-        read_priv=dict(default='^$'),
-        force=dict(default='no', type='bool'),
-        state=dict(default='present', choices=['present', 'absent']),
-        node=dict(default='rabbit')
-    )
-    module = AnsibleModule(
-        argument_spec=arg_spec,
-        supports_check_mode=True
-    )
+def api_users(api):
+    return api.collection(['users'], lambda user: user['name'])
 
-    username = module.params['user']
-    password = module.params['password']
-    tags = module.params['tags']
-    vhost = module.params['vhost']
-    configure_priv = module.params['configure_priv']
-    write_priv = module.params['write_priv']
-    read_priv = module.params['read_priv']
-    force = module.params['force']
-    state = module.params['state']
-    node = module.params['node']
+def api_permissions(api):
+    return api.collection(['permissions'], lambda perm: (perm['user'], perm['vhost']))
 
-    rabbitmq_user = RabbitMqUser(module, username, password, tags, vhost, configure_priv, write_priv, read_priv, node)
+def ensure_user(module, params, api):
+    rabbitmq_user = RabbitMqUser(module, params['user'], params['password'], params['tags'], params['vhost'],
+                                 params['configure_priv'], params['write_priv'], params['read_priv'],
+                                 module.params['node'], api)
+    force = module.boolean(params['force'])
+    state = params['state']
 
     changed = False
     if rabbitmq_user.get():
@@ -246,7 +441,82 @@ def main():
         rabbitmq_user.set_permissions()
         changed = True
 
-    module.exit_json(changed=changed, user=username, state=state)
+    return changed
+
+def get_api(module):
+    backend = module.params['backend']
+    if backend == 'rabbitmqctl':
+        return None
+
+    if not HAS_REQUESTS:
+        if backend == 'api':
+            module.fail_json(msg="python requests is required for the api backend")
+        return None
+
+    api = RabbitMqApi(module)
+    if not api.available():
+        if backend == 'api':
+            module.fail_json(msg="The RabbitMQ management API is not available at %s" % api.base_url)
+        return None
+    return api
+
+def main():
+    arg_spec = dict(
+        user=dict(default=None, aliases=['username', 'name']),
+        password=dict(default=None),
+        tags=dict(default=None),
+        vhost=dict(default='/'),
+        configure_priv=dict(default='^$'),
+        write_priv=dict(default='^$'),
+        read_priv=dict(default='^$'),
+        force=dict(default='no', type='bool'),
+        state=dict(default='present', choices=['present', 'absent']),
+        node=dict(default='rabbit'),
+        users=dict(default=None, type='list'),
+        backend=dict(default='rabbitmqctl', choices=['rabbitmqctl', 'api', 'auto']),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
+    )
+    module = AnsibleModule(
+        argument_spec=arg_spec,
+        required_one_of=[['user', 'users']],
+        mutually_exclusive=[['user', 'users']],
+        supports_check_mode=True
+    )
+
+    user_keys = ['user', 'password', 'tags', 'vhost', 'configure_priv', 'write_priv', 'read_priv', 'force', 'state']
+    users = module.params['users']
+    if users:
+        for spec in users:
+            if not isinstance(spec, dict) or not spec.get('user'):
+                module.fail_json(msg="Every entry of users needs a user.")
+            unsupported = [ k for k in spec.keys() if k not in user_keys ]
+            if unsupported:
+                module.fail_json(msg="Unsupported keys for user %s: %s" % (spec['user'], ', '.join(unsupported)))
+            if spec.get('state', module.params['state']) not in arg_spec['state']['choices']:
+                module.fail_json(msg="state of user %s must be one of: %s" % (spec['user'], ', '.join(arg_spec['state']['choices'])))
+
+    api = get_api(module)
+
+    if not users:
+        changed = ensure_user(module, module.params, api)
+        if api is not None:
+            api.flush()
+        module.exit_json(changed=changed, user=module.params['user'], state=module.params['state'],
+                         backend=api is not None and 'api' or 'rabbitmqctl')
+
+    results = []
+    for spec in users:
+        params = dict((k, module.params[k]) for k in user_keys)
+        params.update(spec)
+        results.append(dict(user=params['user'], state=params['state'], changed=ensure_user(module, params, api)))
+    if api is not None:
+        api.flush()
+
+    changed = len([result for result in results if result['changed']]) > 0
+    module.exit_json(changed=changed, users=results, backend=api is not None and 'api' or 'rabbitmqctl')
 
 # import module snippets
 from ansible.module_utils.basic import *
@@ -51,22 +51,142 @@ options:
       - The state of vhost
     default: present
     choices: [present, absent]
+  backend:
+    description:
+      - How RabbitMQ is managed. C(rabbitmqctl) runs rabbitmqctl for every
+        operation. C(api) uses the HTTP management API over a single
+        keep-alive connection, reads all vhosts with one request and writes
+        the vhost with an import to /api/definitions. C(auto) uses the
+        management API when it answers and falls back to rabbitmqctl
+        otherwise.
+    required: false
+    default: rabbitmqctl
+    choices: [rabbitmqctl, api, auto]
+    version_added: "2.0"
+  login_user:
+    description:
+      - RabbitMQ user for the management API.
+    required: false
+    default: guest
+    version_added: "2.0"
+  login_password:
+    description:
+      - RabbitMQ password for the management API.
+    required: false
+    default: guest
+    version_added: "2.0"
+  login_host:
+    description:
+      - RabbitMQ host for the management API.
+    required: false
+    default: localhost
+    version_added: "2.0"
+  login_port:
+    description:
+      - RabbitMQ management API port.
+    required: false
+    default: 15672
+    version_added: "2.0"
+requirements: [ "python requests, for the api backend" ]
 '''
 
 EXAMPLES = '''
 # Ensure that the vhost /test exists.
 - rabbitmq_vhost: name=/test state=present
+
+# Ensure that the vhost /test exists, using the management API when available
+- rabbitmq_vhost: name=/test state=present backend=auto login_user=admin login_password=secret
 '''
 
+import urllib
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+try:
+    import requests
+    HAS_REQUESTS = True
+except ImportError:
+    HAS_REQUESTS = False
+
+
+class RabbitMqApi(object):
+    """Client of the RabbitMQ HTTP management API.
+
+    All requests share one keep-alive session and writes are skipped in
+    check mode. Collections are read with one request each and cached,
+    callers keep them up to date with the writes they make. Created and
+    updated objects are queued with define() and imported by flush() with
+    a single POST to /api/definitions.
+    """
+
+    def __init__(self, module):
+        self.module = module
+        self.base_url = 'http://%s:%s/api' % (module.params['login_host'], module.params['login_port'])
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({'content-type': 'application/json'})
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self._collections = {}
+        self._definitions = {}
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def available(self):
+        try:
+            r = self.session.get(self._url('overview'), timeout=10)
+        except requests.exceptions.RequestException:
+            return False
+        return r.status_code == 200
+
+    def request(self, method, parts, data=None, run_in_check_mode=False):
+        if self.module.check_mode and not run_in_check_mode:
+            return None
+        if data is not None:
+            data = json.dumps(data)
+        try:
+            r = self.session.request(method, self._url(*parts), data=data)
+        except requests.exceptions.RequestException, e:
+            self.module.fail_json(msg="Error talking to the management API: %s" % str(e))
+        if r.status_code not in [200, 201, 204]:
+            self.module.fail_json(msg="Invalid response from the management API",
+                                  url=self._url(*parts), status=r.status_code, details=r.text)
+        if r.status_code == 200 and r.text:
+            return r.json()
+        return None
+
+    def collection(self, parts, key):
+        """Return the items at parts, read once and indexed by key(item)."""
+        name = '/'.join(parts)
+        if name not in self._collections:
+            items = self.request('GET', parts, run_in_check_mode=True) or []
+            self._collections[name] = dict((key(item), item) for item in items)
+        return self._collections[name]
+
+    def define(self, kind, item):
+        """Queue item for the kind (users, vhosts, ...) of the next import."""
+        self._definitions.setdefault(kind, []).append(item)
+
+    def flush(self):
+        if self._definitions:
+            self.request('POST', ['definitions'], self._definitions)
+            self._definitions = {}
+
+
 class RabbitMqVhost(object):
-    def __init__(self, module, name, tracing, node):
+    def __init__(self, module, name, tracing, node, api=None):
         self.module = module
         self.name = name
         self.tracing = tracing
         self.node = node
+        self.api = api
 
         self._tracing = False
-        self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
+        if api is None:
+            self._rabbitmqctl = module.get_bin_path('rabbitmqctl', True)
 
     def _exec(self, args, run_in_check_mode=False):
         if not self.module.check_mode or (self.module.check_mode and run_in_check_mode):
@@ -75,7 +195,22 @@ class RabbitMqVhost(object):
             return out.splitlines()
         return list()
 
+    def _api_vhosts(self):
+        return self.api.collection(['vhosts'], lambda vhost: vhost['name'])
+
+    def _put_vhost(self, data):
+        vhost = self._api_vhosts().setdefault(self.name, dict(name=self.name, tracing=False))
+        vhost.update(data)
+        self.api.define('vhosts', dict(name=self.name, tracing=vhost['tracing']))
+
     def get(self):
+        if self.api is not None:
+            vhost = self._api_vhosts().get(self.name)
+            if vhost is None:
+                return False
+            self._tracing = bool(vhost.get('tracing'))
+            return True
+
         vhosts = self._exec(['list_vhosts', 'name', 'tracing'], True)
 
         for vhost in vhosts:
@@ -86,9 +221,17 @@ class RabbitMqVhost(object):
         return False
 
     def add(self):
+        if self.api is not None:
+            # tracing is set along with the vhost
+            self._tracing = bool(self.tracing)
+            return self._put_vhost(dict(tracing=self._tracing))
         return self._exec(['add_vhost', self.name])
 
     def delete(self):
+        if self.api is not None:
+            self._api_vhosts().pop(self.name, None)
+            self.api.flush()
+            return self.api.request('DELETE', ['vhosts', self.name])
         return self._exec(['delete_vhost', self.name])
 
     def set_tracing(self):
@@ -101,18 +244,44 @@ class RabbitMqVhost(object):
         return False
 
     def _enable_tracing(self):
+        if self.api is not None:
+            return self._put_vhost(dict(tracing=True))
         return self._exec(['trace_on', '-p', self.name])
 
     def _disable_tracing(self):
+        if self.api is not None:
+            return self._put_vhost(dict(tracing=False))
         return self._exec(['trace_off', '-p', self.name])
 
 
+def get_api(module):
+    backend = module.params['backend']
+    if backend == 'rabbitmqctl':
+        return None
+
+    if not HAS_REQUESTS:
+        if backend == 'api':
+            module.fail_json(msg="python requests is required for the api backend")
+        return None
+
+    api = RabbitMqApi(module)
+    if not api.available():
+        if backend == 'api':
+            module.fail_json(msg="The RabbitMQ management API is not available at %s" % api.base_url)
+        return None
+    return api
+
 def main():
     arg_spec = dict(
         name=dict(required=True, aliases=['vhost']),
         tracing=dict(default='off', aliases=['trace'], type='bool'),
         state=dict(default='present', choices=['present', 'absent']),
         node=dict(default='rabbit'),
+        backend=dict(default='rabbitmqctl', choices=['rabbitmqctl', 'api', 'auto']),
+        login_user=dict(default='guest'),
+        login_password=dict(default='guest', no_log=True),
+        login_host=dict(default='localhost'),
+        login_port=dict(default='15672'),
     )
 
     module = AnsibleModule(
@@ -125,7 +294,8 @@ def main():
     state = module.params['state']
     node = module.params['node']
 
-    rabbitmq_vhost = RabbitMqVhost(module, name, tracing, node)
+    api = get_api(module)
+    rabbitmq_vhost = RabbitMqVhost(module, name, tracing, node, api)
 
     changed = False
     if rabbitmq_vhost.get():
@@ -140,6 +310,8 @@ def main():
         rabbitmq_vhost.set_tracing()
         changed = True
 
+    if api is not None:
+        api.flush()
     module.exit_json(changed=changed, name=name, state=state)
 
 # import module snippets
@@ -39,6 +39,8 @@ options:
   host:
     description:
       - Host to operate on in Nagios.
+      - Since 2.0 several hosts may be given, separated by commas or as a list. The commands
+        for all of them are sent together.
     required: false
     default: null
   cmdfile:
@@ -47,6 +49,13 @@ options:
         Only required if auto-detection fails.
     required: false
     default: auto-detected
+  livestatus:
+    version_added: "2.0"
+    description:
+      - Path to the unix socket of the MK Livestatus broker module. When given, the commands
+        are sent through it instead of the I(command file).
+    required: false
+    default: null
   author:
     description:
      - Author to leave downtime comments as.
@@ -107,6 +116,13 @@ EXAMPLES = '''
 # schedule downtime for a few services
 - nagios: action=downtime services=frob,foobar,qeuz host={{ inventory_hostname }}
 
+# schedule downtime for the same services on a whole group of hosts, with a single write
+- nagios: action=downtime minutes=120 services=httpd,nfs host={{ groups['web'] | join(',') }}
+  run_once: true
+
+# disable alerts through livestatus instead of the command file
+- nagios: action=disable_alerts service=host host={{ inventory_hostname }} livestatus=/var/lib/nagios3/rw/live
+
 # set 30 minutes downtime for all services in servicegroup foo
 - nagios: action=servicegroup_service_downtime minutes=30 servicegroup=foo host={{ inventory_hostname }}
 
@@ -141,7 +157,13 @@ EXAMPLES = '''
 import ConfigParser
 import types
 import time
+import os
 import os.path
+import select
+import socket
+
+# writes of at most this size to a pipe are never interleaved with other writers
+PIPE_BUF = getattr(select, 'PIPE_BUF', 4096)
 
 ######################################################################
 
@@ -202,10 +224,11 @@ def main():
             action=dict(required=True, default=None, choices=ACTION_CHOICES),
             author=dict(default='Ansible'),
             comment=dict(default='Scheduling downtime'),
-            host=dict(required=False, default=None),
+            host=dict(required=False, default=None, type='list'),
             servicegroup=dict(required=False, default=None),
             minutes=dict(default=30),
             cmdfile=dict(default=which_cmdfile()),
+            livestatus=dict(required=False, default=None),
             services=dict(default=None, aliases=['service']),
             command=dict(required=False, default=None),
             )
@@ -269,8 +292,8 @@ def main():
         if not command:
             module.fail_json(msg='no command passed for command action')
     ##################################################################
-    if not cmdfile:
-        module.fail_json('unable to locate nagios.cfg')
+    if not cmdfile and not module.params['livestatus']:
+        module.fail_json(msg='unable to locate nagios.cfg')
 
     ##################################################################
     ansible_nagios = Nagios(module, **module.params)
@@ -302,10 +325,12 @@ class Nagios(object):
         self.action = kwargs['action']
         self.author = kwargs['author']
         self.comment = kwargs['comment']
-        self.host = kwargs['host']
+        self.hosts = kwargs['host'] or [None]
+        self.host = self.hosts[0]
         self.servicegroup = kwargs['servicegroup']
         self.minutes = int(kwargs['minutes'])
         self.cmdfile = kwargs['cmdfile']
+        self.livestatus = kwargs['livestatus']
         self.command = kwargs['command']
 
         if (kwargs['services'] is None) or (kwargs['services'] == 'host') or (kwargs['services'] == 'all'):
@@ -314,6 +339,7 @@ class Nagios(object):
             self.services = kwargs['services'].split(',')
 
         self.command_results = []
+        self.pending_commands = []
 
     def _now(self):
         """
@@ -324,18 +350,65 @@ class Nagios(object):
 
     def _write_command(self, cmd):
         """
-        Write the given command to the Nagios command file
+        Queue the given command for the Nagios command file, all of the
+        queued commands are written by _flush_commands
         """
 
+        self.pending_commands.append(cmd)
+        self.command_results.append(cmd.strip())
+        return True
+
+    def _flush_commands(self):
+        """
+        Write the queued commands to the Nagios command file with a single
+        open, in chunks of whole lines no larger than the pipe buffer, or
+        send them to livestatus over a single connection
+        """
+
+        if not self.pending_commands:
+            return
+
+        if self.livestatus:
+            return self._send_livestatus()
+
+        chunks = []
+        chunk = ''
+        for cmd in self.pending_commands:
+            if chunk and len(chunk) + len(cmd) > PIPE_BUF:
+                chunks.append(chunk)
+                chunk = ''
+            chunk += cmd
+        chunks.append(chunk)
+
         try:
-            fp = open(self.cmdfile, 'w')
-            fp.write(cmd)
-            fp.flush()
-            fp.close()
-            self.command_results.append(cmd.strip())
-        except IOError:
+            fd = os.open(self.cmdfile, os.O_WRONLY | os.O_APPEND)
+            try:
+                for chunk in chunks:
+                    while chunk:
+                        chunk = chunk[os.write(fd, chunk):]
+            finally:
+                os.close(fd)
+        except (IOError, OSError):
             self.module.fail_json(msg='unable to write to nagios command file',
                                   cmdfile=self.cmdfile)
+        self.pending_commands = []
+
+    def _send_livestatus(self):
+        """
+        Send the queued commands to the livestatus socket, livestatus takes
+        several commands per connection separated by an empty line
+        """
+
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(self.livestatus)
+            client.sendall('\n'.join(['COMMAND %s\n' % cmd.strip() for cmd in self.pending_commands]))
+            client.shutdown(socket.SHUT_WR)
+            client.close()
+        except socket.error, e:
+            self.module.fail_json(msg='unable to send commands to livestatus: %s' % str(e),
+                                  livestatus=self.livestatus)
+        self.pending_commands = []
 
     def _fmt_dt_str(self, cmd, host, duration, author=None,
                     comment=None, start=None,
@@ -885,6 +958,24 @@ class Nagios(object):
         Figure out what you want to do from ansible, and then do the
         needful (at the earliest).
         """
+        # commands for every host are queued and written out at once,
+        # actions which do not apply to a host are only queued once
+        for host in self.hosts:
+            self.host = host
+            self.act_host()
+            if self.action in ['silence_nagios', 'unsilence_nagios', 'command',
+                               'servicegroup_host_downtime', 'servicegroup_service_downtime']:
+                break
+
+        self._flush_commands()
+
+        self.module.exit_json(nagios_commands=self.command_results,
+                              changed=True)
+
+    def act_host(self):
+        """
+        Queue the commands of the action for self.host.
+        """
         # host or service downtime?
         if self.action == 'downtime':
             if self.services == 'host':
@@ -937,9 +1028,6 @@ class Nagios(object):
             self.module.fail_json(msg="unknown action specified: '%s'" % \
                                       self.action)
 
-        self.module.exit_json(nagios_commands=self.command_results,
-                              changed=True)
-
 ######################################################################
 # import module snippets
 from ansible.module_utils.basic import *
@@ -51,7 +51,8 @@ options:
         description:
             - Name of the host in Zabbix.
             - host_name is the unique identifier used and cannot be updated using this module.
-        required: true
+            - Required unless I(hosts) is given.
+        required: false
     host_groups:
         description:
             - List of host groups the host is part of.
@@ -91,6 +92,15 @@ options:
             - 'https://www.zabbix.com/documentation/2.0/manual/appendix/api/hostinterface/definitions#host_interface'
         required: false
         default: []
+    hosts:
+        description:
+            - List of host definitions to reconcile in one batch, instead of the single host given by I(host_name).
+            - 'Each entry accepts the keys: host_name (required), host_groups, link_templates, status, state, interfaces and proxy.
+              Keys that are omitted fall back to the module option of the same name.'
+            - All referenced host groups, templates, proxies and existing hosts are fetched with one API call each, and the
+              changes are applied with one grouped host.create, host.update and host.delete call.
+        required: false
+        default: None
 '''
 
 EXAMPLES = '''
@@ -123,6 +133,37 @@ EXAMPLES = '''
         dns: ""
         port: 12345
     proxy: a.zabbix.proxy
+
+- name: Create or update many hosts at once
+  local_action:
+    module: zabbix_host
+    server_url: http://monitor.example.com
+    login_user: username
+    login_password: password
+    host_groups:
+      - Example group1
+    link_templates:
+      - Example template1
+    hosts:
+      - host_name: ExampleHost1
+        interfaces:
+          - type: 1
+            main: 1
+            useip: 1
+            ip: 10.xx.xx.1
+            dns: ""
+            port: 10050
+      - host_name: ExampleHost2
+        proxy: a.zabbix.proxy
+        interfaces:
+          - type: 1
+            main: 1
+            useip: 1
+            ip: 10.xx.xx.2
+            dns: ""
+            port: 10050
+      - host_name: RetiredHost
+        state: absent
 '''
 
 import logging
@@ -198,35 +239,47 @@ class Host(object):
                 self._module.exit_json(changed=True)
             parameters = {'hostid': host_id, 'groups': group_ids, 'status': status, 'proxy_hostid': proxy_id}
             self._zapi.host.update(parameters)
-            interface_list_copy = exist_interface_list
-            if interfaces:
-                for interface in interfaces:
-                    flag = False
-                    interface_str = interface
-                    for exist_interface in exist_interface_list:
-                        interface_type = interface['type']
-                        exist_interface_type = int(exist_interface['type'])
-                        if interface_type == exist_interface_type:
-                            # update
-                            interface_str['interfaceid'] = exist_interface['interfaceid']
-                            self._zapi.hostinterface.update(interface_str)
-                            flag = True
-                            interface_list_copy.remove(exist_interface)
-                            break
-                    if not flag:
-                        # add
-                        interface_str['hostid'] = host_id
-                        self._zapi.hostinterface.create(interface_str)
-                        # remove
-                remove_interface_ids = []
-                for remove_interface in interface_list_copy:
-                    interface_id = remove_interface['interfaceid']
-                    remove_interface_ids.append(interface_id)
-                if len(remove_interface_ids) > 0:
-                    self._zapi.hostinterface.delete(remove_interface_ids)
+            update_interfaces, create_interfaces, remove_interface_ids = self.diff_interfaces(host_id, interfaces,
+                                                                                              exist_interface_list)
+            for interface_str in update_interfaces:
+                self._zapi.hostinterface.update(interface_str)
+            for interface_str in create_interfaces:
+                self._zapi.hostinterface.create(interface_str)
+            if len(remove_interface_ids) > 0:
+                self._zapi.hostinterface.delete(remove_interface_ids)
         except Exception, e:
             self._module.fail_json(msg="Failed to update host %s: %s" % (host_name, e))
 
+    # match the interfaces against the existing ones by type, returns the interfaces
+    # to update and to create and the ids of the interfaces to remove
+    def diff_interfaces(self, host_id, interfaces, exist_interface_list):
+        update_interfaces = []
+        create_interfaces = []
+        remove_interface_ids = []
+        interface_list_copy = list(exist_interface_list)
+        if interfaces:
+            for interface in interfaces:
+                flag = False
+                interface_str = dict(interface)
+                for exist_interface in interface_list_copy:
+                    interface_type = int(interface['type'])
+                    exist_interface_type = int(exist_interface['type'])
+                    if interface_type == exist_interface_type:
+                        # update
+                        interface_str['interfaceid'] = exist_interface['interfaceid']
+                        update_interfaces.append(interface_str)
+                        flag = True
+                        interface_list_copy.remove(exist_interface)
+                        break
+                if not flag:
+                    # add
+                    interface_str['hostid'] = host_id
+                    create_interfaces.append(interface_str)
+            # remove
+            for remove_interface in interface_list_copy:
+                remove_interface_ids.append(remove_interface['interfaceid'])
+        return update_interfaces, create_interfaces, remove_interface_ids
+
     def delete_host(self, host_id, host_name):
         try:
             if self._module.check_mode:
@@ -357,21 +410,180 @@ class Host(object):
             self._module.fail_json(msg="Failed to link template to host: %s" % e)
 
 
+class HostBatch(Host):
+    """Reconcile a list of host definitions with a handful of bulk API calls."""
+
+    def __init__(self, module, zbx):
+        Host.__init__(self, module, zbx)
+        self.group_ids = {}
+        self.template_ids = {}
+        self.proxy_ids = {}
+        self.exist_hosts = {}
+
+    # fetch everything the host definitions refer to, one API call per object type
+    def prefetch(self, host_defs):
+        group_names = set()
+        template_names = set()
+        proxy_names = set()
+        for host_def in host_defs:
+            group_names.update(host_def['host_groups'] or [])
+            template_names.update(host_def['link_templates'] or [])
+            if host_def['proxy']:
+                proxy_names.add(host_def['proxy'])
+
+        if group_names:
+            for group in self._zapi.hostgroup.get({'output': ['groupid', 'name'], 'filter': {'name': list(group_names)}}):
+                self.group_ids[group['name']] = group['groupid']
+        if template_names:
+            for template in self._zapi.template.get({'output': ['templateid', 'host'],
+                                                     'filter': {'host': list(template_names)}}):
+                self.template_ids[template['host']] = template['templateid']
+        if proxy_names:
+            for proxy in self._zapi.proxy.get({'output': ['proxyid', 'host'], 'filter': {'host': list(proxy_names)}}):
+                self.proxy_ids[proxy['host']] = proxy['proxyid']
+
+        host_names = [host_def['host_name'] for host_def in host_defs]
+        for exist_host in self._zapi.host.get({'output': 'extend', 'filter': {'host': host_names},
+                                               'selectGroups': ['groupid', 'name'],
+                                               'selectParentTemplates': ['templateid'],
+                                               'selectInterfaces': 'extend'}):
+            self.exist_hosts[exist_host['host']] = exist_host
+
+        for kind, names, found in (('Hostgroup', group_names, self.group_ids),
+                                   ('Template', template_names, self.template_ids),
+                                   ('Proxy', proxy_names, self.proxy_ids)):
+            missing = sorted(names.difference(found))
+            if missing:
+                self._module.fail_json(msg="%s not found: %s" % (kind, ", ".join(missing)))
+
+    # work out what has to change for every host definition
+    def plan(self, host_defs):
+        to_create = []
+        to_update = []
+        to_delete = []
+        results = []
+        for host_def in host_defs:
+            host_name = host_def['host_name']
+            exist_host = self.exist_hosts.get(host_name)
+            result = {'host_name': host_name, 'changed': False}
+            results.append(result)
+
+            if host_def['state'] == 'absent':
+                if exist_host:
+                    to_delete.append({'hostid': exist_host['hostid']})
+                    result.update(changed=True, action='deleted')
+                continue
+
+            host_groups = host_def['host_groups'] or []
+            if not host_groups:
+                self._module.fail_json(msg="Specify at least one group for host '%s'." % host_name)
+            group_ids = [{'groupid': self.group_ids[name]} for name in host_groups]
+            template_ids = [self.template_ids[name] for name in host_def['link_templates'] or []]
+            status = 1 if host_def['status'] == "disabled" else 0
+            proxy_id = self.proxy_ids.get(host_def['proxy'], "0")
+            interfaces = host_def['interfaces'] or []
+
+            if not exist_host:
+                if not interfaces:
+                    self._module.fail_json(msg="Specify at least one interface for creating host '%s'." % host_name)
+                parameters = {'host': host_name, 'interfaces': interfaces, 'groups': group_ids, 'status': status,
+                              'templates': [{'templateid': template_id} for template_id in template_ids]}
+                if host_def['proxy']:
+                    parameters['proxy_hostid'] = proxy_id
+                to_create.append(parameters)
+                result.update(changed=True, action='created')
+                continue
+
+            exist_template_ids = set([template['templateid'] for template in exist_host['parentTemplates']])
+            exist_group_names = set([group['name'] for group in exist_host['groups']])
+            if (set(host_groups) == exist_group_names and int(status) == int(exist_host['status']) and
+                    set(template_ids) == exist_template_ids and exist_host['proxy_hostid'] == proxy_id and
+                    not self.check_interface_properties(exist_host['interfaces'], interfaces)):
+                continue
+
+            to_update.append((host_name, exist_host, {
+                'hostid': exist_host['hostid'], 'groups': group_ids, 'status': status, 'proxy_hostid': proxy_id,
+                'templates': [{'templateid': template_id} for template_id in template_ids],
+                'templates_clear': [{'templateid': template_id}
+                                    for template_id in exist_template_ids.difference(template_ids)]},
+                interfaces))
+            result.update(changed=True, action='updated')
+        return to_create, to_update, to_delete, results
+
+    # apply the plan with one grouped call per kind of change
+    def apply(self, to_create, to_update, to_delete):
+        update_interfaces = []
+        create_interfaces = []
+        remove_interface_ids = []
+        for host_name, exist_host, parameters, interfaces in to_update:
+            updates, creates, removes = self.diff_interfaces(exist_host['hostid'], interfaces, exist_host['interfaces'])
+            update_interfaces.extend(updates)
+            create_interfaces.extend(creates)
+            remove_interface_ids.extend(removes)
+
+        try:
+            if to_delete:
+                self._zapi.host.delete(to_delete)
+            if to_create:
+                self._zapi.host.create(to_create)
+            if to_update:
+                self._zapi.host.update([parameters for host_name, exist_host, parameters, interfaces in to_update])
+            # same order as update_host, a main interface is only removed
+            # once its replacement exists
+            if update_interfaces:
+                self._zapi.hostinterface.update(update_interfaces)
+            if create_interfaces:
+                self._zapi.hostinterface.create(create_interfaces)
+            if remove_interface_ids:
+                self._zapi.hostinterface.delete(remove_interface_ids)
+        except Exception, e:
+            self._module.fail_json(msg="Failed to apply host changes: %s" % e)
+
+
+def reconcile_hosts(module, zbx, host_defs):
+    keys = ['host_groups', 'link_templates', 'status', 'state', 'interfaces', 'proxy']
+    normalized = []
+    for host_def in host_defs:
+        if not isinstance(host_def, dict) or not host_def.get('host_name'):
+            module.fail_json(msg="Every entry of hosts needs a host_name.")
+        entry = {'host_name': host_def['host_name']}
+        for key in keys:
+            entry[key] = host_def.get(key, module.params[key])
+        if entry['status'] not in ['enabled', 'disabled']:
+            module.fail_json(msg="Invalid status '%s' for host '%s'." % (entry['status'], entry['host_name']))
+        if entry['state'] not in ['present', 'absent']:
+            module.fail_json(msg="Invalid state '%s' for host '%s'." % (entry['state'], entry['host_name']))
+        normalized.append(entry)
+
+    batch = HostBatch(module, zbx)
+    batch.prefetch(normalized)
+    to_create, to_update, to_delete, results = batch.plan(normalized)
+    changed = bool(to_create or to_update or to_delete)
+    if changed and not module.check_mode:
+        batch.apply(to_create, to_update, to_delete)
+    module.exit_json(changed=changed, results=results,
+                     result="%d host(s) created, %d updated, %d deleted" % (len(to_create), len(to_update),
+                                                                           len(to_delete)))
+
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
             server_url=dict(required=True, aliases=['url']),
             login_user=dict(required=True),
             login_password=dict(required=True, no_log=True),
-            host_name=dict(required=True),
+            host_name=dict(required=False),
             host_groups=dict(required=False),
             link_templates=dict(required=False),
             status=dict(default="enabled", choices=['enabled', 'disabled']),
             state=dict(default="present", choices=['present', 'absent']),
             timeout=dict(type='int', default=10),
             interfaces=dict(required=False),
-            proxy=dict(required=False)
+            proxy=dict(required=False),
+            hosts=dict(type='list', required=False)
         ),
+        required_one_of=[['host_name', 'hosts']],
+        mutually_exclusive=[['host_name', 'hosts']],
         supports_check_mode=True
     )
 
@@ -401,6 +613,9 @@ def main():
     except Exception, e:
         module.fail_json(msg="Failed to connect to Zabbix server: %s" % e)
 
+    if module.params['hosts']:
+        reconcile_hosts(module, zbx, module.params['hosts'])
+
     host = Host(module, zbx)
 
     template_ids = []
@@ -62,6 +62,7 @@ options:
         required: true
 notes:
     - Too many concurrent updates to the same screen may cause Zabbix to return errors, see examples for a workaround if needed.
+    - The graphs of all hosts are looked up with a single API call, and screen items are created, updated and deleted in batches. Only the cells of the grid that differ from the desired layout are changed. The module returns the number of API calls made (C(api_calls)).
 '''
 
 EXAMPLES = '''
@@ -130,7 +131,6 @@ EXAMPLES = '''
 try:
     from zabbix_api import ZabbixAPI, ZabbixAPISubClass
     from zabbix_api import ZabbixAPIException
-    from zabbix_api import Already_Exists
     HAS_ZABBIX_API = True
 except ImportError:
     HAS_ZABBIX_API = False
@@ -145,6 +145,12 @@ class ZabbixAPIExtends(ZabbixAPI):
     def __init__(self, server, timeout, **kwargs):
         ZabbixAPI.__init__(self, server, timeout=timeout)
         self.screenitem = ZabbixAPISubClass(self, dict({"prefix": "screenitem"}, **kwargs))
+        self.request_count = 0
+
+    # count the JSON-RPC requests, to report how many calls batching saved
+    def do_request(self, json_obj):
+        self.request_count += 1
+        return ZabbixAPI.do_request(self, json_obj)
 
 
 class Screen(object):
@@ -176,14 +182,13 @@ class Screen(object):
             return host_ids
 
     # get screen
-    def get_screen_id(self, screen_name):
+    def get_screen(self, screen_name):
         if screen_name == "":
             self._module.fail_json(msg="screen_name is required")
         try:
-            screen_id_list = self._zapi.screen.get({'output': 'extend', 'search': {"name": screen_name}})
-            if len(screen_id_list) >= 1:
-                screen_id = screen_id_list[0]['screenid']
-                return screen_id
+            screen_list = self._zapi.screen.get({'output': 'extend', 'search': {"name": screen_name}})
+            if len(screen_list) >= 1:
+                return screen_list[0]
             return None
         except Exception as e:
             self._module.fail_json(msg="Failed to get screen %s from Zabbix: %s" % (screen_name, e))
@@ -198,15 +203,6 @@ class Screen(object):
         except Exception as e:
             self._module.fail_json(msg="Failed to create screen %s: %s" % (screen_name, e))
 
-    # update screen
-    def update_screen(self, screen_id, screen_name, h_size, v_size):
-        try:
-            if self._module.check_mode:
-                self._module.exit_json(changed=True)
-            self._zapi.screen.update({'screenid': screen_id, 'hsize': h_size, 'vsize': v_size})
-        except Exception as e:
-            self._module.fail_json(msg="Failed to update screen %s: %s" % (screen_name, e))
-
     # delete screen
     def delete_screen(self, screen_id, screen_name):
         try:
@@ -216,32 +212,29 @@ class Screen(object):
         except Exception as e:
             self._module.fail_json(msg="Failed to delete screen %s: %s" % (screen_name, e))
 
-    # get graph ids
-    def get_graph_ids(self, hosts, graph_name_list):
-        graph_id_lists = []
+    # get the vertical screen size, the largest number of graphs of a host
+    def get_graph_vsize(self, hosts, host_graphs):
         vsize = 1
         for host in hosts:
-            graph_id_list = self.get_graphs_by_host_id(graph_name_list, host)
-            size = len(graph_id_list)
-            if size > 0:
-                graph_id_lists.extend(graph_id_list)
-                if vsize < size:
-                    vsize = size
-        return graph_id_lists, vsize
-
-    #  getGraphs
-    def get_graphs_by_host_id(self, graph_name_list, host_id):
-        graph_ids = []
+            size = len(host_graphs[host])
+            if vsize < size:
+                vsize = size
+        return vsize
+
+    # get the graphs of all hosts with a single graph.get, keyed by host id
+    def get_graphs_by_host_ids(self, graph_name_list, host_ids):
+        graphs_list = self._zapi.graph.get({'output': ['graphid', 'name'], 'hostids': host_ids, 'selectHosts': ['hostid']})
+        graphs_list = sorted(graphs_list, key=lambda graph: int(graph['graphid']))
+        host_graphs = dict((host_id, []) for host_id in host_ids)
+        # same ordering and substring matching as a graph.get 'search' per host and graph name
         for graph_name in graph_name_list:
-            graphs_list = self._zapi.graph.get({'output': 'extend', 'search': {'name': graph_name}, 'hostids': host_id})
-            graph_id_list = []
-            if len(graphs_list) > 0:
-                for graph in graphs_list:
-                    graph_id = graph['graphid']
-                    graph_id_list.append(graph_id)
-            if len(graph_id_list) > 0:
-                graph_ids.extend(graph_id_list)
-        return graph_ids
+            for graph in graphs_list:
+                if graph_name.lower() not in graph['name'].lower():
+                    continue
+                for host in graph['hosts']:
+                    if host['hostid'] in host_graphs:
+                        host_graphs[host['hostid']].append(graph['graphid'])
+        return host_graphs
 
     # get screen items
     def get_screen_items(self, screen_id):
@@ -276,8 +269,8 @@ class Screen(object):
             v_size = (v_size - 1) / h_size + 1
         return h_size, v_size
 
-    # create screen_items
-    def create_screen_items(self, screen_id, hosts, graph_name_list, width, height, h_size):
+    # compute the screen items for the desired grid layout
+    def get_screen_layout(self, hosts, host_graphs, width, height, h_size):
         if len(hosts) < 4:
             if width is None or width < 0:
                 width = 500
@@ -287,29 +280,60 @@ class Screen(object):
         if height is None or height < 0:
             height = 100
 
+        cells = []
+        # when there're only one host, only one row is not good.
+        if len(hosts) == 1:
+            for i, graph_id in enumerate(host_graphs[hosts[0]]):
+                cells.append((i % h_size, i / h_size, graph_id))
+        else:
+            for i, host in enumerate(hosts):
+                for j, graph_id in enumerate(host_graphs[host]):
+                    cells.append((i, j, graph_id))
+
+        layout = []
+        for x, y, graph_id in cells:
+            layout.append({'resourcetype': 0, 'resourceid': graph_id,
+                           'width': width, 'height': height,
+                           'x': x, 'y': y, 'colspan': 1, 'rowspan': 1,
+                           'elements': 0, 'valign': 0, 'halign': 0,
+                           'style': 0, 'dynamic': 0, 'sort_triggers': 0})
+        return layout
+
+    # diff the desired layout against the current screen items
+    def diff_screen_items(self, screen_item_list, layout):
+        current = dict(((int(item['x']), int(item['y'])), item) for item in screen_item_list)
+        to_create = []
+        to_update = []
+        for item in layout:
+            existing = current.pop((item['x'], item['y']), None)
+            if existing is None:
+                to_create.append(item)
+            elif [k for k in item if str(existing.get(k)) != str(item[k])]:
+                to_update.append(dict(item, screenitemid=existing['screenitemid']))
+        to_delete = [item['screenitemid'] for item in current.values()]
+        return to_create, to_update, to_delete
+
+    # apply the differences with one batched call per operation
+    def sync_screen_items(self, screen, screen_item_list, layout, h_size, v_size):
+        to_create, to_update, to_delete = self.diff_screen_items(screen_item_list, layout)
+        resize = str(screen.get('hsize')) != str(h_size) or str(screen.get('vsize')) != str(v_size)
+        if not (to_create or to_update or to_delete or resize):
+            return False
+        if self._module.check_mode:
+            self._module.exit_json(changed=True)
         try:
-            # when there're only one host, only one row is not good.
-            if len(hosts) == 1:
-                graph_id_list = self.get_graphs_by_host_id(graph_name_list, hosts[0])
-                for i, graph_id in enumerate(graph_id_list):
-                    if graph_id is not None:
-                        self._zapi.screenitem.create({'screenid': screen_id, 'resourcetype': 0, 'resourceid': graph_id,
-                                                      'width': width, 'height': height,
-                                                      'x': i % h_size, 'y': i / h_size, 'colspan': 1, 'rowspan': 1,
-                                                      'elements': 0, 'valign': 0, 'halign': 0,
-                                                      'style': 0, 'dynamic': 0, 'sort_triggers': 0})
-            else:
-                for i, host in enumerate(hosts):
-                    graph_id_list = self.get_graphs_by_host_id(graph_name_list, host)
-                    for j, graph_id in enumerate(graph_id_list):
-                        if graph_id is not None:
-                            self._zapi.screenitem.create({'screenid': screen_id, 'resourcetype': 0, 'resourceid': graph_id,
-                                                          'width': width, 'height': height,
-                                                          'x': i, 'y': j, 'colspan': 1, 'rowspan': 1,
-                                                          'elements': 0, 'valign': 0, 'halign': 0,
-                                                          'style': 0, 'dynamic': 0, 'sort_triggers': 0})
-        except Already_Exists:
-            pass
+            # free cells and shrink the screen before placing new items
+            if to_delete:
+                self._zapi.screenitem.delete(to_delete)
+            if resize:
+                self._zapi.screen.update({'screenid': screen['screenid'], 'hsize': h_size, 'vsize': v_size})
+            if to_update:
+                self._zapi.screenitem.update(to_update)
+            if to_create:
+                self._zapi.screenitem.create(to_create)
+        except Exception as e:
+            self._module.fail_json(msg="Failed to update items of screen %s: %s" % (screen['name'], e))
+        return True
 
 
 def main():
@@ -346,9 +370,12 @@ def main():
     changed_screens = []
     deleted_screens = []
 
+    api_calls_before = zbx.request_count
+
     for zabbix_screen in screens:
         screen_name = zabbix_screen['screen_name']
-        screen_id = screen.get_screen_id(screen_name)
+        existing_screen = screen.get_screen(screen_name)
+        screen_id = existing_screen and existing_screen['screenid']
         state = "absent" if "state" in zabbix_screen and zabbix_screen['state'] == "absent" else "present"
 
         if state == "absent":
@@ -374,44 +401,34 @@ def main():
             host_group_id = screen.get_host_group_id(host_group)
             hosts = screen.get_host_ids_by_group_id(host_group_id)
 
-            screen_item_id_list = []
-            resource_id_list = []
-
-            graph_ids, v_size = screen.get_graph_ids(hosts, graph_names)
+            host_graphs = screen.get_graphs_by_host_ids(graph_names, hosts)
+            v_size = screen.get_graph_vsize(hosts, host_graphs)
             h_size, v_size = screen.get_hsize_vsize(hosts, v_size)
+            layout = screen.get_screen_layout(hosts, host_graphs, graph_width, graph_height, h_size)
 
             if not screen_id:
                 # create screen
                 screen_id = screen.create_screen(screen_name, h_size, v_size)
-                screen.create_screen_items(screen_id, hosts, graph_names, graph_width, graph_height, h_size)
+                existing_screen = {'screenid': screen_id, 'name': screen_name, 'hsize': h_size, 'vsize': v_size}
+                screen.sync_screen_items(existing_screen, [], layout, h_size, v_size)
                 created_screens.append(screen_name)
             else:
                 screen_item_list = screen.get_screen_items(screen_id)
+                if screen.sync_screen_items(existing_screen, screen_item_list, layout, h_size, v_size):
+                    changed_screens.append(screen_name)
 
-                for screen_item in screen_item_list:
-                    screen_item_id = screen_item['screenitemid']
-                    resource_id = screen_item['resourceid']
-                    screen_item_id_list.append(screen_item_id)
-                    resource_id_list.append(resource_id)
-
-                # when the screen items changed, then update
-                if graph_ids != resource_id_list:
-                    deleted = screen.delete_screen_items(screen_id, screen_item_id_list)
-                    if deleted:
-                        screen.update_screen(screen_id, screen_name, h_size, v_size)
-                        screen.create_screen_items(screen_id, hosts, graph_names, graph_width, graph_height, h_size)
-                        changed_screens.append(screen_name)
+    stats = dict(api_calls=zbx.request_count - api_calls_before)
 
     if created_screens and changed_screens:
-        module.exit_json(changed=True, result="Successfully created screen(s): %s, and updated screen(s): %s" % (",".join(created_screens), ",".join(changed_screens)))
+        module.exit_json(changed=True, result="Successfully created screen(s): %s, and updated screen(s): %s" % (",".join(created_screens), ",".join(changed_screens)), **stats)
     elif created_screens:
-        module.exit_json(changed=True, result="Successfully created screen(s): %s" % ",".join(created_screens))
+        module.exit_json(changed=True, result="Successfully created screen(s): %s" % ",".join(created_screens), **stats)
     elif changed_screens:
-        module.exit_json(changed=True, result="Successfully updated screen(s): %s" % ",".join(changed_screens))
+        module.exit_json(changed=True, result="Successfully updated screen(s): %s" % ",".join(changed_screens), **stats)
     elif deleted_screens:
-        module.exit_json(changed=True, result="Successfully deleted screen(s): %s" % ",".join(deleted_screens))
+        module.exit_json(changed=True, result="Successfully deleted screen(s): %s" % ",".join(deleted_screens), **stats)
     else:
-        module.exit_json(changed=False)
+        module.exit_json(changed=False, **stats)
 
 from ansible.module_utils.basic import *
 
@@ -86,10 +86,59 @@ options:
         description:
             - Shell-style glob matching string used to filter fact keys. Not
               applicable for software and system_info fact categories.
+              When the filter starts with a folder path, such as
+              C(/Common/app1/web*), only that folder is listed on the device.
         required: false
         default: null
         choices: []
         aliases: []
+    workers:
+        description:
+            - Number of concurrent iControl sessions used to collect facts.
+              With a value greater than 1, the requested fact categories and
+              the per-field queries of each category are spread over a pool
+              of BIG-IP sessions. Every additional worker opens its own
+              session. The default of 1 collects everything sequentially.
+        required: false
+        default: 1
+        choices: []
+        aliases: []
+        version_added: 2.0
+    cache_dir:
+        description:
+            - Directory used to cache collected facts between runs. Cached fact
+              categories are reused as long as the device configuration has not
+              changed since they were stored, as reported by the
+              C(Configsync.LocalConfigTime) database variable, and they are not
+              older than I(cache_ttl). Runtime status values such as
+              C(object_status) may therefore be up to I(cache_ttl) seconds old.
+              The software and system_info categories are never cached.
+              Facts are cached separately per server and user.
+              Caching is disabled when not set.
+        required: false
+        default: null
+        choices: []
+        aliases: []
+        version_added: 2.0
+    cache_ttl:
+        description:
+            - Maximum age in seconds of a cached fact category.
+        required: false
+        default: 3600
+        choices: []
+        aliases: []
+        version_added: 2.0
+    page_size:
+        description:
+            - Maximum number of objects covered by a single iControl query.
+              Large object lists are queried in pages of this size, which
+              bounds the size of each SOAP response. By default every object
+              of a category is queried at once.
+        required: false
+        default: null
+        choices: []
+        aliases: []
+        version_added: 2.0
 '''
 
 EXAMPLES = '''
@@ -109,6 +158,37 @@ EXAMPLES = '''
       password=mysecret
       include=interface,vlan
 
+  - name: Collect BIG-IP facts using four concurrent sessions
+    local_action: >
+      bigip_facts
+      server=lb.mydomain.com
+      user=admin
+      password=mysecret
+      include=virtual_server,pool,node
+      workers=4
+
+  - name: Collect BIG-IP facts, reusing categories cached by earlier runs
+    local_action: >
+      bigip_facts
+      server=lb.mydomain.com
+      user=admin
+      password=mysecret
+      include=virtual_server,pool,node
+      cache_dir=/var/cache/bigip_facts
+
+'''
+
+RETURN = '''
+timing:
+    description: Wall clock time in seconds spent collecting each fact category
+    returned: success
+    type: dict
+    sample: {"pool": 1.52, "virtual_server": 12.04}
+cached:
+    description: Fact categories served from I(cache_dir) instead of the device
+    returned: success
+    type: list
+    sample: ["pool", "node"]
 '''
 
 try:
@@ -119,9 +199,17 @@ except ImportError:
 else:
     bigsuds_found = True
 
+import copy
 import fnmatch
+import json
+import os
+import tempfile
+import threading
+import time
 import traceback
 import re
+import sys
+import Queue
 
 # ===========================================
 # bigip_facts module specific support methods.
@@ -165,6 +253,158 @@ class F5(object):
     def get_active_folder(self):
         return self.api.System.Session.get_active_folder()
 
+    def get_config_change_marker(self):
+        variables = self.api.Management.DBVariable.query(['Configsync.LocalConfigTime'])
+        return variables[0]['value']
+
+
+class FactCache(object):
+    """On-disk fact cache.
+
+    Stores the output of the generate_* functions per device, user and
+    fact category, together with the device configuration change marker seen
+    when they were collected.
+
+    Attributes:
+        path: Cache file of the device and user.
+        marker: Current configuration change marker of the device.
+        regex: Fact filter the facts were collected with.
+        ttl: Maximum age in seconds of a cache entry.
+        sections: Cached fact categories, keyed by name.
+    """
+
+    VOLATILE = ('software', 'system_info')
+
+    def __init__(self, cache_dir, server, user, marker, regex, ttl):
+        # facts depend on the partitions the user can see
+        name = "%s@%s.json" % (user, server)
+        self.path = os.path.join(cache_dir, name.replace(os.sep, '_'))
+        self.marker = marker
+        self.regex = regex
+        self.ttl = ttl
+        self.sections = {}
+        self.dirty = False
+        try:
+            f = open(self.path)
+            try:
+                data = json.load(f)
+            finally:
+                f.close()
+        except (IOError, ValueError):
+            data = {}
+        if data.get('marker') == marker:
+            self.sections = data.get('sections', {})
+
+    def get(self, name):
+        if name in self.VOLATILE:
+            return None
+        entry = self.sections.get(name)
+        if entry is None or entry['filter'] != self.regex:
+            return None
+        if time.time() - entry['time'] > self.ttl:
+            return None
+        return entry['facts']
+
+    def set(self, name, facts):
+        if name in self.VOLATILE:
+            return
+        self.sections[name] = dict(filter=self.regex, time=time.time(), facts=facts)
+        self.dirty = True
+
+    def save(self, module):
+        if not self.dirty:
+            return
+        cache_dir = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.bigip_facts')
+        f = os.fdopen(fd, 'w')
+        try:
+            json.dump(dict(marker=self.marker, sections=self.sections), f)
+        finally:
+            f.close()
+        module.atomic_move(tmp_path, self.path)
+
+
+class _Task(object):
+    """Unit of work queued on a CollectionEngine."""
+
+    def __init__(self, func, item):
+        self.func = func
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def run(self, f5):
+        try:
+            self.result = self.func(f5, self.item)
+        except Exception:
+            self.error = sys.exc_info()
+        self.done.set()
+
+
+class CollectionEngine(object):
+    """Concurrent fact collection engine.
+
+    Spreads fact collection work over a bounded pool of iControl sessions.
+    Each worker thread owns one F5 session. The thread calling map() never
+    sits idle while waiting for its results; it runs queued tasks on its own
+    session instead, so map() may safely be nested (a fact category fanning
+    out its per-field queries from inside a worker).
+
+    Attributes:
+        f5: F5 instance used by the calling thread.
+        sessions: F5 instances owned by the worker threads.
+    """
+
+    def __init__(self, f5, sessions):
+        self.f5 = f5
+        self.sessions = sessions
+        self.tasks = Queue.Queue()
+        self.local = threading.local()
+        self.threads = []
+        for session in sessions:
+            thread = threading.Thread(target=self._worker, args=(session,))
+            thread.setDaemon(True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _worker(self, f5):
+        self.local.f5 = f5
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            task.run(f5)
+
+    def map(self, func, items):
+        """Run func(f5, item) for every item and return the results in order."""
+        f5 = getattr(self.local, 'f5', self.f5)
+        batch = [_Task(func, item) for item in items]
+        for task in batch:
+            self.tasks.put(task)
+        for task in batch:
+            while not task.done.isSet():
+                try:
+                    other = self.tasks.get_nowait()
+                except Queue.Empty:
+                    task.done.wait(0.05)
+                    continue
+                if other is None:
+                    # shutdown marker belongs to a worker; hand it back
+                    self.tasks.put(other)
+                    task.done.wait(0.05)
+                    continue
+                other.run(f5)
+            if task.error:
+                raise task.error[0], task.error[1], task.error[2]
+        return [task.result for task in batch]
+
+    def shutdown(self):
+        for thread in self.threads:
+            self.tasks.put(None)
+        for thread in self.threads:
+            thread.join()
+
 
 class Interfaces(object):
     """Interfaces class.
@@ -950,7 +1190,7 @@ class Rules(object):
         self.rules = api.LocalLB.Rule.get_list()
         if regex:
             re_filter = re.compile(regex)
-            self.traffic_groups = filter(re_filter.search, self.rules)
+            self.rules = filter(re_filter.search, self.rules)
 
     def get_list(self):
         return self.rules
@@ -1364,37 +1604,75 @@ class SystemInfo(object):
         return self.api.System.SystemInfo.get_uptime()
 
 
-def generate_dict(api_obj, fields):
-    result_dict = {}
-    lists = []
-    supported_fields = []
-    if api_obj.get_list():
-        for field in fields:
-            try:
-                api_response = getattr(api_obj, "get_" + field)()
-            except (MethodNotFound, WebFault):
-                pass
-            else:
+_UNSUPPORTED = object()
+
+def get_field(api_obj, field, f5=None):
+    """Query a single field, using the session of f5 when given."""
+    if f5 is not None and f5.get_api() is not api_obj.api:
+        api_obj = copy.copy(api_obj)
+        api_obj.api = f5.get_api()
+    try:
+        return getattr(api_obj, "get_" + field)()
+    except (MethodNotFound, WebFault):
+        return _UNSUPPORTED
+
+def get_fields(api_obj, fields, engine=None):
+    if engine is None:
+        return [get_field(api_obj, field) for field in fields]
+    return engine.map(lambda f5, field: get_field(api_obj, field, f5), fields)
+
+def with_list(api_obj, names):
+    """Return a copy of api_obj whose queries only cover names."""
+    current = api_obj.get_list()
+    page_obj = copy.copy(api_obj)
+    for attr, value in vars(api_obj).items():
+        if value is current:
+            setattr(page_obj, attr, names)
+    return page_obj
+
+def iter_pages(api_obj, page_size=None):
+    names = api_obj.get_list()
+    if not page_size or len(names) <= page_size:
+        yield api_obj
+        return
+    for i in range(0, len(names), page_size):
+        yield with_list(api_obj, names[i:i + page_size])
+
+def iter_dict(api_obj, fields, engine=None, page_size=None):
+    """Lazily yield (name, facts) pairs, querying page_size objects at a time.
+
+    Only one page of iControl responses is held in memory at any time.
+    Fields found to be unsupported on the first page are not queried again.
+    """
+    if not api_obj.get_list():
+        return
+    for page_obj in iter_pages(api_obj, page_size):
+        lists = []
+        supported_fields = []
+        for field, api_response in zip(fields, get_fields(page_obj, fields, engine)):
+            if api_response is not _UNSUPPORTED:
                 lists.append(api_response)
                 supported_fields.append(field)
-        for i, j in enumerate(api_obj.get_list()):
+        fields = supported_fields
+        for i, j in enumerate(page_obj.get_list()):
             temp = {}
             temp.update([(item[0], item[1][i]) for item in zip(supported_fields, lists)])
-            result_dict[j] = temp
+            yield j, temp
+
+def generate_dict(api_obj, fields, engine=None, page_size=None):
+    result_dict = {}
+    for name, temp in iter_dict(api_obj, fields, engine, page_size):
+        result_dict[name] = temp
     return result_dict
 
-def generate_simple_dict(api_obj, fields):
+def generate_simple_dict(api_obj, fields, engine=None):
     result_dict = {}
-    for field in fields:
-        try:
-            api_response = getattr(api_obj, "get_" + field)()
-        except (MethodNotFound, WebFault):
-            pass
-        else:
+    for field, api_response in zip(fields, get_fields(api_obj, fields, engine)):
+        if api_response is not _UNSUPPORTED:
             result_dict[field] = api_response
     return result_dict
 
-def generate_interface_dict(f5, regex):
+def generate_interface_dict(f5, regex, engine=None, page_size=None):
     interfaces = Interfaces(f5.get_api(), regex)
     fields = ['active_media', 'actual_flow_control', 'bundle_state',
               'description', 'dual_media_state', 'enabled_state', 'if_index',
@@ -1406,26 +1684,26 @@ def generate_interface_dict(f5, regex):
               'sfp_media_state', 'stp_active_edge_port_state',
               'stp_enabled_state', 'stp_link_type',
               'stp_protocol_detection_reset_state']
-    return generate_dict(interfaces, fields)
+    return generate_dict(interfaces, fields, engine, page_size)
 
-def generate_self_ip_dict(f5, regex):
+def generate_self_ip_dict(f5, regex, engine=None, page_size=None):
     self_ips = SelfIPs(f5.get_api(), regex)
     fields = ['address', 'allow_access_list', 'description',
               'enforced_firewall_policy', 'floating_state', 'fw_rule',
               'netmask', 'staged_firewall_policy', 'traffic_group',
               'vlan', 'is_traffic_group_inherited']
-    return generate_dict(self_ips, fields)
+    return generate_dict(self_ips, fields, engine, page_size)
 
-def generate_trunk_dict(f5, regex):
+def generate_trunk_dict(f5, regex, engine=None, page_size=None):
     trunks = Trunks(f5.get_api(), regex)
     fields = ['active_lacp_state', 'configured_member_count', 'description',
               'distribution_hash_option', 'interface', 'lacp_enabled_state',
               'lacp_timeout_option', 'link_selection_policy', 'media_speed',
               'media_status', 'operational_member_count', 'stp_enabled_state',
               'stp_protocol_detection_reset_state']
-    return generate_dict(trunks, fields)
+    return generate_dict(trunks, fields, engine, page_size)
 
-def generate_vlan_dict(f5, regex):
+def generate_vlan_dict(f5, regex, engine=None, page_size=None):
     vlans = Vlans(f5.get_api(), regex)
     fields = ['auto_lasthop', 'cmp_hash_algorithm', 'description',
               'dynamic_forwarding', 'failsafe_action', 'failsafe_state',
@@ -1434,9 +1712,9 @@ def generate_vlan_dict(f5, regex):
               'sflow_poll_interval', 'sflow_poll_interval_global',
               'sflow_sampling_rate', 'sflow_sampling_rate_global',
               'source_check_state', 'true_mac_address', 'vlan_id']
-    return generate_dict(vlans, fields)
+    return generate_dict(vlans, fields, engine, page_size)
 
-def generate_vs_dict(f5, regex):
+def generate_vs_dict(f5, regex, engine=None, page_size=None):
     virtual_servers = VirtualServers(f5.get_api(), regex)
     fields = ['actual_hardware_acceleration', 'authentication_profile',
               'auto_lasthop', 'bw_controller_policy', 'clone_pool',
@@ -1454,9 +1732,9 @@ def generate_vs_dict(f5, regex):
               'source_address_translation_type', 'source_port_behavior',
               'staged_firewall_policy', 'translate_address_state',
               'translate_port_state', 'type', 'vlan', 'wildmask']
-    return generate_dict(virtual_servers, fields)
+    return generate_dict(virtual_servers, fields, engine, page_size)
 
-def generate_pool_dict(f5, regex):
+def generate_pool_dict(f5, regex, engine=None, page_size=None):
     pools = Pools(f5.get_api(), regex)
     fields = ['action_on_service_down', 'active_member_count',
               'aggregate_dynamic_ratio', 'allow_nat_state',
@@ -1470,9 +1748,9 @@ def generate_pool_dict(f5, regex):
               'queue_on_connection_limit_state', 'queue_time_limit',
               'reselect_tries', 'server_ip_tos', 'server_link_qos',
               'simple_timeout', 'slow_ramp_time']
-    return generate_dict(pools, fields)
+    return generate_dict(pools, fields, engine, page_size)
 
-def generate_device_dict(f5, regex):
+def generate_device_dict(f5, regex, engine=None, page_size=None):
     devices = Devices(f5.get_api(), regex)
     fields = ['active_modules', 'base_mac_address', 'blade_addresses',
               'build', 'chassis_id', 'chassis_type', 'comment',
@@ -1482,49 +1760,49 @@ def generate_device_dict(f5, regex):
               'optional_modules', 'platform_id', 'primary_mirror_address',
               'product', 'secondary_mirror_address', 'software_version',
               'timelimited_modules', 'timezone', 'unicast_addresses']
-    return generate_dict(devices, fields)
+    return generate_dict(devices, fields, engine, page_size)
 
-def generate_device_group_dict(f5, regex):
+def generate_device_group_dict(f5, regex, engine=None, page_size=None):
     device_groups = DeviceGroups(f5.get_api(), regex)
     fields = ['all_preferred_active', 'autosync_enabled_state','description',
               'device', 'full_load_on_sync_state',
               'incremental_config_sync_size_maximum',
               'network_failover_enabled_state', 'sync_status', 'type']
-    return generate_dict(device_groups, fields)
+    return generate_dict(device_groups, fields, engine, page_size)
 
-def generate_traffic_group_dict(f5, regex):
+def generate_traffic_group_dict(f5, regex, engine=None, page_size=None):
     traffic_groups = TrafficGroups(f5.get_api(), regex)
     fields = ['auto_failback_enabled_state', 'auto_failback_time',
               'default_device', 'description', 'ha_load_factor',
               'ha_order', 'is_floating', 'mac_masquerade_address',
               'unit_id']
-    return generate_dict(traffic_groups, fields)
+    return generate_dict(traffic_groups, fields, engine, page_size)
 
-def generate_rule_dict(f5, regex):
+def generate_rule_dict(f5, regex, engine=None, page_size=None):
     rules = Rules(f5.get_api(), regex)
     fields = ['definition', 'description', 'ignore_vertification',
               'verification_status']
-    return generate_dict(rules, fields)
+    return generate_dict(rules, fields, engine, page_size)
 
-def generate_node_dict(f5, regex):
+def generate_node_dict(f5, regex, engine=None, page_size=None):
     nodes = Nodes(f5.get_api(), regex)
     fields = ['address', 'connection_limit', 'description', 'dynamic_ratio',
               'monitor_instance', 'monitor_rule', 'monitor_status',
               'object_status', 'rate_limit', 'ratio', 'session_status']
-    return generate_dict(nodes, fields)
+    return generate_dict(nodes, fields, engine, page_size)
 
-def generate_virtual_address_dict(f5, regex):
+def generate_virtual_address_dict(f5, regex, engine=None, page_size=None):
     virtual_addresses = VirtualAddresses(f5.get_api(), regex)
     fields = ['address', 'arp_state', 'auto_delete_state', 'connection_limit',
               'description', 'enabled_state', 'icmp_echo_state',
               'is_floating_state', 'netmask', 'object_status',
               'route_advertisement_state', 'traffic_group']
-    return generate_dict(virtual_addresses, fields)
+    return generate_dict(virtual_addresses, fields, engine, page_size)
 
-def generate_address_class_dict(f5, regex):
+def generate_address_class_dict(f5, regex, engine=None, page_size=None):
     address_classes = AddressClasses(f5.get_api(), regex)
     fields = ['address_class', 'description']
-    return generate_dict(address_classes, fields)
+    return generate_dict(address_classes, fields, engine, page_size)
 
 def generate_certificate_dict(f5, regex):
     certificates = Certificates(f5.get_api(), regex)
@@ -1534,7 +1812,7 @@ def generate_key_dict(f5, regex):
     keys = Keys(f5.get_api(), regex)
     return dict(zip(keys.get_list(), keys.get_key_list()))
 
-def generate_client_ssl_profile_dict(f5, regex):
+def generate_client_ssl_profile_dict(f5, regex, engine=None, page_size=None):
     profiles = ProfileClientSSL(f5.get_api(), regex)
     fields = ['alert_timeout', 'allow_nonssl_state', 'authenticate_depth',
               'authenticate_once_state', 'ca_file', 'cache_size',
@@ -1555,9 +1833,9 @@ def generate_client_ssl_profile_dict(f5, regex):
               'server_name', 'session_ticket_state', 'sni_default_state',
               'sni_require_state', 'ssl_option', 'strict_resume_state',
               'unclean_shutdown_state', 'is_base_profile', 'is_system_profile']
-    return generate_dict(profiles, fields)
+    return generate_dict(profiles, fields, engine, page_size)
 
-def generate_system_info_dict(f5):
+def generate_system_info_dict(f5, engine=None):
     system_info = SystemInfo(f5.get_api())
     fields = ['base_mac_address',
               'blade_temperature', 'chassis_slot_information',
@@ -1567,13 +1845,42 @@ def generate_system_info_dict(f5):
               'product_information', 'pva_version', 'system_id',
               'system_information', 'time',
               'time_zone', 'uptime']
-    return generate_simple_dict(system_info, fields)
+    return generate_simple_dict(system_info, fields, engine)
 
 def generate_software_list(f5):
     software = Software(f5.get_api())
     software_list = software.get_all_software_status()
     return software_list
 
+def folder_from_filter(fact_filter):
+    """Return the deepest folder a fact filter is confined to.
+
+    Objects are named by their full path, so a filter such as
+    /Common/app1/web* can only match objects below /Common/app1. Listing
+    that folder recursively lets the device do the coarse filtering.
+    Returns "/" when the filter does not start with a literal folder path.
+    """
+    if not fact_filter or not fact_filter.startswith("/"):
+        return "/"
+    literal = re.split(r'[*?\[]', fact_filter, 1)[0]
+    folder = literal[:literal.rfind("/")]
+    return folder or "/"
+
+def start_worker_sessions(server, user, password, count, folder="/"):
+    """Open count additional iControl sessions for a CollectionEngine.
+
+    Worker sessions always use their own session id so that changing their
+    active folder and recursive query state does not leak into the session
+    whose state gets restored once collection is finished.
+    """
+    sessions = []
+    for i in range(count):
+        f5 = F5(server, user, password, session=True)
+        f5.set_active_folder(folder)
+        f5.enable_recursive_query_state()
+        sessions.append(f5)
+    return sessions
+
 def disable_ssl_cert_validation():
     # You probably only want to do this for testing and never in production.
     # From https://www.python.org/dev/peps/pep-0476/#id29
@@ -1591,6 +1898,10 @@ def main():
             session = dict(type='bool', default=False),
             include = dict(type='list', required=True),
             filter = dict(type='str', required=False),
+            workers = dict(type='int', default=1),
+            cache_dir = dict(type='str', required=False),
+            cache_ttl = dict(type='int', default=3600),
+            page_size = dict(type='int', required=False),
         )
     )
 
@@ -1603,10 +1914,15 @@ def main():
     validate_certs = module.params['validate_certs']
     session = module.params['session']
     fact_filter = module.params['filter']
+    workers = module.params['workers']
+    cache_dir = module.params['cache_dir']
+    cache_ttl = module.params['cache_ttl']
+    page_size = module.params['page_size']
     if fact_filter:
         regex = fnmatch.translate(fact_filter)
     else:
         regex = None
+    folder = folder_from_filter(fact_filter)
     include = map(lambda x: x.lower(), module.params['include'])
     valid_includes = ('address_class', 'certificate', 'client_ssl_profile',
                       'device', 'device_group', 'interface', 'key', 'node',
@@ -1620,63 +1936,105 @@ def main():
     if not validate_certs:
         disable_ssl_cert_validation()
 
+    if workers < 1:
+        module.fail_json(msg="workers must be a positive integer")
+
+    if page_size is not None and page_size < 1:
+        module.fail_json(msg="page_size must be a positive integer")
+
+    if cache_dir:
+        cache_dir = os.path.expanduser(cache_dir)
+        if not os.path.isdir(cache_dir):
+            module.fail_json(msg="cache_dir %s is not a directory" % cache_dir)
+
     try:
         facts = {}
+        timing = {}
+        cached = []
 
         if len(include) > 0:
             f5 = F5(server, user, password, session)
             saved_active_folder = f5.get_active_folder()
             saved_recursive_query_state = f5.get_recursive_query_state()
-            if saved_active_folder != "/":
-                f5.set_active_folder("/")
+            if saved_active_folder != folder:
+                try:
+                    f5.set_active_folder(folder)
+                except WebFault:
+                    # not a folder after all, list everything instead
+                    folder = "/"
+                    f5.set_active_folder(folder)
             if saved_recursive_query_state != "STATE_ENABLED":
                 f5.enable_recursive_query_state()
 
-            if 'interface' in include:
-                facts['interface'] = generate_interface_dict(f5, regex)
-            if 'self_ip' in include:
-                facts['self_ip'] = generate_self_ip_dict(f5, regex)
-            if 'trunk' in include:
-                facts['trunk'] = generate_trunk_dict(f5, regex)
-            if 'vlan' in include:
-                facts['vlan'] = generate_vlan_dict(f5, regex)
-            if 'virtual_server' in include:
-                facts['virtual_server'] = generate_vs_dict(f5, regex)
-            if 'pool' in include:
-                facts['pool'] = generate_pool_dict(f5, regex)
-            if 'device' in include:
-                facts['device'] = generate_device_dict(f5, regex)
-            if 'device_group' in include:
-                facts['device_group'] = generate_device_group_dict(f5, regex)
-            if 'traffic_group' in include:
-                facts['traffic_group'] = generate_traffic_group_dict(f5, regex)
-            if 'rule' in include:
-                facts['rule'] = generate_rule_dict(f5, regex)
-            if 'node' in include:
-                facts['node'] = generate_node_dict(f5, regex)
-            if 'virtual_address' in include:
-                facts['virtual_address'] = generate_virtual_address_dict(f5, regex)
-            if 'address_class' in include:
-                facts['address_class'] = generate_address_class_dict(f5, regex)
-            if 'software' in include:
-                facts['software'] = generate_software_list(f5)
-            if 'certificate' in include:
-                facts['certificate'] = generate_certificate_dict(f5, regex)
-            if 'key' in include:
-                facts['key'] = generate_key_dict(f5, regex)
-            if 'client_ssl_profile' in include:
-                facts['client_ssl_profile'] = generate_client_ssl_profile_dict(f5, regex)
-            if 'system_info' in include:
-                facts['system_info'] = generate_system_info_dict(f5)
+            cache = None
+            if cache_dir:
+                cache = FactCache(cache_dir, server, user, f5.get_config_change_marker(), regex, cache_ttl)
+
+            engine = None
+            if workers > 1:
+                engine = CollectionEngine(f5, start_worker_sessions(server, user, password, workers - 1, folder))
+
+            collectors = {
+                'interface': lambda f5: generate_interface_dict(f5, regex, engine, page_size),
+                'self_ip': lambda f5: generate_self_ip_dict(f5, regex, engine, page_size),
+                'trunk': lambda f5: generate_trunk_dict(f5, regex, engine, page_size),
+                'vlan': lambda f5: generate_vlan_dict(f5, regex, engine, page_size),
+                'virtual_server': lambda f5: generate_vs_dict(f5, regex, engine, page_size),
+                'pool': lambda f5: generate_pool_dict(f5, regex, engine, page_size),
+                'device': lambda f5: generate_device_dict(f5, regex, engine, page_size),
+                'device_group': lambda f5: generate_device_group_dict(f5, regex, engine, page_size),
+                'traffic_group': lambda f5: generate_traffic_group_dict(f5, regex, engine, page_size),
+                'rule': lambda f5: generate_rule_dict(f5, regex, engine, page_size),
+                'node': lambda f5: generate_node_dict(f5, regex, engine, page_size),
+                'virtual_address': lambda f5: generate_virtual_address_dict(f5, regex, engine, page_size),
+                'address_class': lambda f5: generate_address_class_dict(f5, regex, engine, page_size),
+                'software': lambda f5: generate_software_list(f5),
+                'certificate': lambda f5: generate_certificate_dict(f5, regex),
+                'key': lambda f5: generate_key_dict(f5, regex),
+                'client_ssl_profile': lambda f5: generate_client_ssl_profile_dict(f5, regex, engine, page_size),
+                'system_info': lambda f5: generate_system_info_dict(f5, engine),
+            }
+            sections = [name for name in valid_includes if name in include]
+            if cache is not None:
+                for name in sections:
+                    section_facts = cache.get(name)
+                    if section_facts is not None:
+                        facts[name] = section_facts
+                        timing[name] = 0.0
+                        cached.append(name)
+                sections = [name for name in sections if name not in cached]
+
+            def collect(f5, name):
+                start = time.time()
+                section_facts = collectors[name](f5)
+                return section_facts, round(time.time() - start, 3)
+
+            try:
+                if engine is None:
+                    results = [collect(f5, name) for name in sections]
+                else:
+                    results = engine.map(collect, sections)
+            finally:
+                if engine is not None:
+                    engine.shutdown()
+
+            for name, (section_facts, elapsed) in zip(sections, results):
+                facts[name] = section_facts
+                timing[name] = elapsed
+                if cache is not None:
+                    cache.set(name, section_facts)
+
+            if cache is not None:
+                cache.save(module)
 
             # restore saved state
-            if saved_active_folder and saved_active_folder != "/":
+            if saved_active_folder and saved_active_folder != folder:
                 f5.set_active_folder(saved_active_folder)
             if saved_recursive_query_state and \
                saved_recursive_query_state != "STATE_ENABLED":
                 f5.set_recursive_query_state(saved_recursive_query_state)
 
-        result = {'ansible_facts': facts}
+        result = {'ansible_facts': facts, 'timing': timing, 'cached': cached}
 
     except Exception, e:
         module.fail_json(msg="received exception: %s\ntraceback: %s" % (e, traceback.format_exc()))
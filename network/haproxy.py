@@ -45,8 +45,18 @@ options:
   host:
     description:
       - Host (backend) to operate in Haproxy.
-    required: true
+      - Required unless I(hosts) is given.
+    required: false
+    default: null
+  hosts:
+    description:
+      - List of servers to operate on at once, each either a host name or a dict with a I(host)
+        and optionally I(backend), I(state), I(weight) and I(shutdown_sessions), which default
+        to the module's options. All of the commands are sent over a single socket session and,
+        with I(wait), all of the servers are waited for at the same time.
+    required: false
     default: null
+    version_added: "2.0"
   socket:
     description:
       - Haproxy socket file name with path.
@@ -118,6 +128,19 @@ examples:
 # enable server in 'www' backend pool with change server(s) weight
 - haproxy: state=enabled host={{ inventory_hostname }} socket=/var/run/haproxy.sock weight=10 backend=www
 
+# drain all of the web servers of a datacenter in one go and wait until all are in maintenance
+- haproxy:
+    state: disabled
+    hosts: "{{ groups['dc1_web'] }}"
+    wait: yes
+
+# set different weights in different backend pools
+- haproxy:
+    state: enabled
+    hosts:
+      - { host: web1, backend: www, weight: 10 }
+      - { host: web1, backend: static, weight: 50 }
+
 author: "Ravi Bhure (@ravibhure)"
 '''
 
@@ -131,11 +154,58 @@ RECV_SIZE = 1024
 ACTION_CHOICES = ['enabled', 'disabled']
 WAIT_RETRIES=25
 WAIT_INTERVAL=5
+# commands sent before reading their responses, keeps both socket buffers from filling up
+PIPELINE_SIZE = 50
+# haproxy ends every response with this in interactive (prompt) mode
+PROMPT = '\n> '
 
 ######################################################################
 class TimeoutException(Exception):
   pass
 
+class HAProxySession(object):
+    """
+    A single connection to HAProxy's UNIX socket, switched to interactive
+    mode with the 'prompt' command so it stays open for many commands.
+    """
+
+    def __init__(self, path, timeout=200):
+        self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.client.settimeout(timeout)
+        self.client.connect(path)
+        self.buffer = ''
+        self.client.sendall('prompt\n')
+        self.read_response()
+
+    def read_response(self):
+        while PROMPT not in self.buffer:
+            buf = self.client.recv(RECV_SIZE)
+            if not buf:
+                raise IOError("haproxy closed the socket")
+            self.buffer += buf
+        response, self.buffer = self.buffer.split(PROMPT, 1)
+        return response
+
+    def execute(self, cmds):
+        """
+        Sends the commands, one per line and a batch at a time, and returns
+        their responses.
+        """
+        responses = []
+        for i in range(0, len(cmds), PIPELINE_SIZE):
+            batch = cmds[i:i + PIPELINE_SIZE]
+            self.client.sendall(''.join(['%s\n' % cmd for cmd in batch]))
+            for cmd in batch:
+                responses.append(self.read_response())
+        return responses
+
+    def close(self):
+        try:
+            self.client.sendall('quit\n')
+        except socket.error:
+            pass
+        self.client.close()
+
 class HAProxy(object):
     """
     Used for communicating with HAProxy through its local UNIX socket interface.
@@ -153,6 +223,7 @@ class HAProxy(object):
 
         self.state = self.module.params['state']
         self.host = self.module.params['host']
+        self.hosts = self.module.params['hosts']
         self.backend = self.module.params['backend']
         self.weight = self.module.params['weight']
         self.socket = self.module.params['socket']
@@ -161,135 +232,146 @@ class HAProxy(object):
         self.wait_retries = self.module.params['wait_retries']
         self.wait_interval = self.module.params['wait_interval']
         self.command_results = []
+        self.session = None
 
-    def execute(self, cmd, timeout=200, capture_output=True):
+    def execute(self, cmds, timeout=200, capture_output=True):
         """
-        Executes a HAProxy command by sending a message to a HAProxy's local
-        UNIX socket and waiting up to 'timeout' milliseconds for the response.
+        Executes HAProxy commands over the session with HAProxy's local UNIX
+        socket, opened on first use, waiting up to 'timeout' seconds for
+        each response.
         """
-
-        self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        self.client.connect(self.socket)
-        self.client.sendall('%s\n' % cmd)
-        result = ''
-        buf = ''
-        buf = self.client.recv(RECV_SIZE)
-        while buf:
-            result += buf
-            buf = self.client.recv(RECV_SIZE)
+        try:
+            if self.session is None:
+                self.session = HAProxySession(self.socket, timeout)
+            results = self.session.execute(cmds)
+        except (socket.error, IOError), e:
+            self.module.fail_json(msg="unable to talk to haproxy on %s: %s" % (self.socket, str(e)))
         if capture_output:
-            self.command_results = result.strip()
-        self.client.close()
-        return result
+            self.command_results.extend([result.strip() for result in results if result.strip()])
+        return results
 
-    def wait_until_status(self, pxname, svname, status):
+    def get_stats(self):
         """
-        Wait for a service to reach the specified status. Try RETRIES times
-        with INTERVAL seconds of sleep in between. If the service has not reached
-        the expected status in that time, the module will fail. If the service was 
-        not found, the module will fail.
+        Returns the 'show stat' table indexed by (pxname, svname).
         """
+        data = self.execute(['show stat'], 200, False)[0].lstrip('# ')
+        stats = {}
+        for row in csv.DictReader(data.splitlines()):
+            stats[(row['pxname'], row['svname'])] = row
+        return stats
+
+    def wait_until_status(self, targets):
+        """
+        Wait for the services to reach the specified status, targets being
+        a dict of (pxname, svname) to status. Try RETRIES times with INTERVAL
+        seconds of sleep in between, polling all of them at once. If a service
+        has not reached the expected status in that time, the module will
+        fail. If a service was not found, the module will fail.
+        """
+        pending = dict(targets)
         for i in range(1, self.wait_retries):
-            data = self.execute('show stat', 200, False).lstrip('# ')
-            r = csv.DictReader(data.splitlines())
-            found = False
-            for row in r:
-                if row['pxname'] == pxname and row['svname'] == svname:
-                    found = True
-                    if row['status'] == status:
-                        return True;
-                    else:
-                        time.sleep(self.wait_interval)
-
-            if not found:
-                self.module.fail_json(msg="unable to find server %s/%s" % (pxname, svname))
-
-        self.module.fail_json(msg="server %s/%s not status '%s' after %d retries. Aborting." % (pxname, svname, status, self.wait_retries))
-
-    def enabled(self, host, backend, weight):
+            stats = self.get_stats()
+            for (pxname, svname), status in list(pending.items()):
+                if (pxname, svname) not in stats:
+                    self.module.fail_json(msg="unable to find server %s/%s" % (pxname, svname))
+                if stats[(pxname, svname)]['status'] == status:
+                    del pending[(pxname, svname)]
+            if not pending:
+                return True
+            time.sleep(self.wait_interval)
+
+        self.module.fail_json(msg="servers %s not status '%s' after %d retries. Aborting." % (
+            ', '.join(['%s/%s' % target for target in sorted(pending)]),
+            "', '".join(sorted(set(pending.values()))), self.wait_retries))
+
+    def commands(self, pxname, svname, server):
         """
-        Enabled action, marks server to UP and checks are re-enabled,
-        also supports to get current weight for server (default) and
-        set the weight for haproxy backend server when provides.
+        Returns the commands for one server, enabled marks the server UP
+        and re-enables checks, disabled marks it DOWN for maintenance. Both
+        get the current weight for the server, enabled also sets the weight
+        when provided and disabled can shut the sessions attached to it down.
+        Each command is sent on its own line, haproxy answers every command
+        of a line joined with ';' with its own prompt.
         """
-        svname = host
-        if self.backend is None:
-            output = self.execute('show stat')
-            #sanitize and make a list of lines
-            output = output.lstrip('# ').strip()
-            output = output.split('\n')
-            result = output
-
-            for line in result:
-                if 'BACKEND' in line:
-                    result =  line.split(',')[0]
-                    pxname = result
-                    cmd = "get weight %s/%s ; enable server %s/%s" % (pxname, svname, pxname, svname)
-                    if weight:
-                        cmd += "; set weight %s/%s %s" % (pxname, svname, weight)
-                    self.execute(cmd)
-                    if self.wait:
-                        self.wait_until_status(pxname, svname, 'UP')
-
+        if server['state'] == 'enabled':
+            cmds = [ "get weight %s/%s" % (pxname, svname), "enable server %s/%s" % (pxname, svname) ]
+            if server['weight']:
+                cmds.append("set weight %s/%s %s" % (pxname, svname, server['weight']))
         else:
-            pxname = backend
-            cmd = "get weight %s/%s ; enable server %s/%s" % (pxname, svname, pxname, svname)
-            if weight:
-                cmd += "; set weight %s/%s %s" % (pxname, svname, weight)
-            self.execute(cmd)
-            if self.wait:
-                self.wait_until_status(pxname, svname, 'UP')
-
-    def disabled(self, host, backend, shutdown_sessions):
+            cmds = [ "get weight %s/%s" % (pxname, svname), "disable server %s/%s" % (pxname, svname) ]
+            if server['shutdown_sessions']:
+                cmds.append("shutdown sessions server %s/%s" % (pxname, svname))
+        return cmds
+
+    def servers(self):
         """
-        Disabled action, marks server to DOWN for maintenance. In this mode, no more checks will be
-        performed on the server until it leaves maintenance,
-        also it shutdown sessions while disabling backend host server.
+        Returns the servers to act on, from host or from the hosts list.
         """
-        svname = host
-        if self.backend is None:
-            output = self.execute('show stat')
-            #sanitize and make a list of lines
-            output = output.lstrip('# ').strip()
-            output = output.split('\n')
-            result = output
-
-            for line in result:
-                if 'BACKEND' in line:
-                    result =  line.split(',')[0]
-                    pxname = result
-                    cmd = "get weight %s/%s ; disable server %s/%s" % (pxname, svname, pxname, svname)
-                    if shutdown_sessions:
-                        cmd += "; shutdown sessions server %s/%s" % (pxname, svname)
-                    self.execute(cmd)
-                    if self.wait:
-                        self.wait_until_status(pxname, svname, 'MAINT')
-
-        else:
-            pxname = backend
-            cmd = "get weight %s/%s ; disable server %s/%s" % (pxname, svname, pxname, svname)
-            if shutdown_sessions:
-                cmd += "; shutdown sessions server %s/%s" % (pxname, svname)
-            self.execute(cmd)
-            if self.wait:
-                self.wait_until_status(pxname, svname, 'MAINT')
+        defaults = dict(backend=self.backend, state=self.state, weight=self.weight,
+                        shutdown_sessions=self.shutdown_sessions)
+        if self.hosts is None:
+            server = dict(defaults)
+            server['host'] = self.host
+            return [ server ]
+
+        servers = []
+        for spec in self.hosts:
+            if not isinstance(spec, dict):
+                spec = { 'host': spec }
+            unknown = [ k for k in spec.keys() if k != 'host' and k not in defaults ]
+            if unknown or not spec.get('host'):
+                self.module.fail_json(msg="hosts entries need a host and may only set %s: %s" % (', '.join(sorted(defaults)), spec))
+            server = dict(defaults)
+            server.update(spec)
+            if server['state'] not in ACTION_CHOICES:
+                self.module.fail_json(msg="unknown state specified for %s: '%s'" % (server['host'], server['state']))
+            servers.append(server)
+        return servers
 
     def act(self):
         """
         Figure out what you want to do from ansible, and then do it.
         """
-
-        # toggle enable/disbale server
-        if self.state == 'enabled':
-            self.enabled(self.host, self.backend, self.weight)
-
-        elif self.state == 'disabled':
-            self.disabled(self.host, self.backend, self.shutdown_sessions)
-
-        else:
-            self.module.fail_json(msg="unknown state specified: '%s'" % self.state)
-
-        self.module.exit_json(stdout=self.command_results, changed=True)
+        servers = self.servers()
+
+        # without a backend the server is acted on in every backend it is part of
+        stats = None
+        if [server for server in servers if server['backend'] is None]:
+            stats = self.get_stats()
+
+        targets = []
+        for server in servers:
+            svname = server['host']
+            if server['backend'] is not None:
+                pxnames = [ server['backend'] ]
+            else:
+                pxnames = sorted(set([px for (px, sv) in stats.keys() if sv == svname]))
+            for pxname in pxnames:
+                targets.append((pxname, svname, server))
+
+        # toggle enable/disable servers, all in one session
+        cmds = []
+        for (pxname, svname, server) in targets:
+            cmds.extend(self.commands(pxname, svname, server))
+        self.execute(cmds)
+
+        if self.wait and targets:
+            waits = {}
+            for (pxname, svname, server) in targets:
+                if server['state'] == 'enabled':
+                    waits[(pxname, svname)] = 'UP'
+                else:
+                    waits[(pxname, svname)] = 'MAINT'
+            self.wait_until_status(waits)
+
+        if self.session is not None:
+            self.session.close()
+
+        result = dict(stdout='\n'.join(self.command_results), changed=True)
+        if self.hosts is not None:
+            result['servers'] = [dict(backend=pxname, host=svname, state=server['state'])
+                                 for (pxname, svname, server) in targets]
+        self.module.exit_json(**result)
 
 def main():
 
@@ -297,7 +379,8 @@ def main():
     module = AnsibleModule(
         argument_spec = dict(
             state = dict(required=True, default=None, choices=ACTION_CHOICES),
-            host=dict(required=True, default=None),
+            host=dict(required=False, default=None),
+            hosts=dict(required=False, default=None, type='list'),
             backend=dict(required=False, default=None),
             weight=dict(required=False, default=None),
             socket = dict(required=False, default=DEFAULT_SOCKET_LOCATION),
@@ -306,7 +389,8 @@ def main():
             wait_retries=dict(required=False, default=WAIT_RETRIES, type='int'),
             wait_interval=dict(required=False, default=WAIT_INTERVAL, type='int'),
         ),
-
+        required_one_of = [ ['host', 'hosts'] ],
+        mutually_exclusive = [ ['host', 'hosts'] ],
     )
 
     if not socket:
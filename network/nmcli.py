@@ -385,6 +385,63 @@ import dbus
 from gi.repository import NetworkManager, NMClient
 
 
+class NmConnectionStore(object):
+    """
+    Index of the NetworkManager connections keyed by id and uuid.
+    The connection paths are listed with a single ListConnections call. The
+    settings of a connection are only fetched when a lookup reaches it.
+    """
+
+    SERVICE_NAME="org.freedesktop.NetworkManager"
+    SETTINGS_PATH="/org/freedesktop/NetworkManager/Settings"
+
+    def __init__(self, bus):
+        self.bus=bus
+        self.forget()
+
+    def forget(self):
+        # drop everything, the next lookup lists the connections again
+        self.paths=None
+        self.unresolved=[]
+        self.by_id={}
+        self.by_uuid={}
+
+    def connection(self, path):
+        proxy=self.bus.get_object(self.SERVICE_NAME, path)
+        return dbus.Interface(proxy, "org.freedesktop.NetworkManager.Settings.Connection")
+
+    def load(self):
+        if self.paths is None:
+            proxy=self.bus.get_object(self.SERVICE_NAME, self.SETTINGS_PATH)
+            settings=dbus.Interface(proxy, "org.freedesktop.NetworkManager.Settings")
+            self.paths=list(settings.ListConnections())
+            self.unresolved=list(self.paths)
+
+    def resolve(self, path):
+        config=self.connection(path).GetSettings()
+        s_con=config['connection']
+        # ids are kept as unicode, they may well not be ascii (Wi-Fi SSIDs)
+        self.by_id.setdefault(s_con['id'], []).append(path)
+        self.by_uuid[s_con['uuid']]=path
+        return s_con
+
+    def find(self, name):
+        # return the path of the connection whose id or uuid is name
+        if isinstance(name, str):
+            name=name.decode('utf-8', 'replace')
+        if name in self.by_id:
+            return self.by_id[name][0]
+        if name in self.by_uuid:
+            return self.by_uuid[name]
+        self.load()
+        while self.unresolved:
+            path=self.unresolved.pop(0)
+            s_con=self.resolve(path)
+            if name==s_con['id'] or name==s_con['uuid']:
+                return path
+        return None
+
+
 class Nmcli(object):
     """
     This is the generic nmcli manipulation class that is subclassed based on platform.
@@ -466,6 +523,8 @@ class Nmcli(object):
         self.flags=module.params['flags']
         self.ingress=module.params['ingress']
         self.egress=module.params['egress']
+        # index of the existing connections, filled on first lookup
+        self.connections=NmConnectionStore(self.bus)
         # select whether we dump additional debug info through syslog
         self.syslogging=True
 
@@ -476,91 +535,9 @@ class Nmcli(object):
 
         return self.module.run_command(cmd, use_unsafe_shell=use_unsafe_shell, data=data)
 
-    def merge_secrets(self, proxy, config, setting_name):
-        try:
-            # returns a dict of dicts mapping name::setting, where setting is a dict
-            # mapping key::value.  Each member of the 'setting' dict is a secret
-            secrets=proxy.GetSecrets(setting_name)
-
-            # Copy the secrets into our connection config
-            for setting in secrets:
-                for key in secrets[setting]:
-                    config[setting_name][key]=secrets[setting][key]
-        except Exception, e:
-            pass
-
-    def dict_to_string(self, d):
-        # Try to trivially translate a dictionary's elements into nice string
-        # formatting.
-        dstr=""
-        for key in d:
-            val=d[key]
-            str_val=""
-            add_string=True
-            if type(val)==type(dbus.Array([])):
-                for elt in val:
-                    if type(elt)==type(dbus.Byte(1)):
-                        str_val+="%s " % int(elt)
-                    elif type(elt)==type(dbus.String("")):
-                        str_val+="%s" % elt
-            elif type(val)==type(dbus.Dictionary({})):
-                dstr+=self.dict_to_string(val)
-                add_string=False
-            else:
-                str_val=val
-            if add_string:
-                dstr+="%s: %s\n" % ( key, str_val)
-        return dstr
-
-    def connection_to_string(self, config):
-        # dump a connection configuration to use in list_connection_info
-        setting_list=[]
-        for setting_name in config:
-            setting_list.append(self.dict_to_string(config[setting_name]))
-        return setting_list
-        # print ""
-
-    def list_connection_info(self):
-        # Ask the settings service for the list of connections it provides
-        bus=dbus.SystemBus()
-
-        service_name="org.freedesktop.NetworkManager"
-        proxy=bus.get_object(service_name, "/org/freedesktop/NetworkManager/Settings")
-        settings=dbus.Interface(proxy, "org.freedesktop.NetworkManager.Settings")
-        connection_paths=settings.ListConnections()
-        connection_list=[]
-        # List each connection's name, UUID, and type
-        for path in connection_paths:
-            con_proxy=bus.get_object(service_name, path)
-            settings_connection=dbus.Interface(con_proxy, "org.freedesktop.NetworkManager.Settings.Connection")
-            config=settings_connection.GetSettings()
-
-            # Now get secrets too; we grab the secrets for each type of connection
-            # (since there isn't a "get all secrets" call because most of the time
-            # you only need 'wifi' secrets or '802.1x' secrets, not everything) and
-            # merge that into the configuration data - To use at a later stage
-            self.merge_secrets(settings_connection, config, '802-11-wireless')
-            self.merge_secrets(settings_connection, config, '802-11-wireless-security')
-            self.merge_secrets(settings_connection, config, '802-1x')
-            self.merge_secrets(settings_connection, config, 'gsm')
-            self.merge_secrets(settings_connection, config, 'cdma')
-            self.merge_secrets(settings_connection, config, 'ppp')
-
-            # Get the details of the 'connection' setting
-            s_con=config['connection']
-            connection_list.append(s_con['id'])
-            connection_list.append(s_con['uuid'])
-            connection_list.append(s_con['type'])
-            connection_list.append(self.connection_to_string(config))
-        return connection_list
-
     def connection_exists(self):
-        # we are going to use name and type in this instance to find if that connection exists and is of type x
-        connections=self.list_connection_info()
-
-        for con_item in connections:
-            if self.conn_name==con_item:
-                return True
+        # look the connection up by name or uuid in the connection index
+        return self.connections.find(self.conn_name) is not None
 
     def down_connection(self):
         cmd=[self.module.get_bin_path('nmcli', True)]
@@ -939,6 +916,10 @@ class Nmcli(object):
             cmd=self.create_connection_vlan()
         return self.execute_command(cmd)
 
+    def forget_connections(self):
+        # connections were added or removed, the index has to be rebuilt
+        self.connections.forget()
+
     def remove_connection(self):
         # self.down_connection()
         cmd=[self.module.get_bin_path('nmcli', True)]
@@ -1034,6 +1015,7 @@ def main():
                 module.exit_json(changed=True)
             (rc, out, err)=nmcli.down_connection()
             (rc, out, err)=nmcli.remove_connection()
+            nmcli.forget_connections()
         if rc!=0:
             module.fail_json(name =('No Connection named %s exists' % nmcli.conn_name), msg=err, rc=rc)
 
@@ -1050,6 +1032,7 @@ def main():
             if module.check_mode:
                 module.exit_json(changed=True)
             (rc, out, err)=nmcli.create_connection()
+            nmcli.forget_connections()
         if rc is not None and rc!=0:
             module.fail_json(name=nmcli.conn_name, msg=err, rc=rc)
 
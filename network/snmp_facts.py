@@ -31,7 +31,22 @@ options:
     host:
         description:
             - Set to target snmp server (normally {{inventory_hostname}})
-        required: true
+            - Required unless I(hosts) is given.
+        required: false
+    hosts:
+        description:
+            - List of snmp servers to poll at the same time. Their facts are returned
+              per device in C(devices) instead of in ansible_facts, and devices which
+              could not be polled in C(errors); the task only fails if none could be.
+        required: false
+        version_added: "2.0"
+    max_repetitions:
+        description:
+            - Number of rows fetched with each GETBULK request when walking the
+              interface and ip address tables.
+        required: false
+        default: 25
+        version_added: "2.0"
     version:
         description:
             - SNMP Version to use, v2/v2c or v3
@@ -86,6 +101,16 @@ EXAMPLES = '''
     authkey=abc12345
     privkey=def6789
   delegate_to: localhost
+
+# Poll all of the switches of a site at once
+- snmp_facts:
+    hosts: "{{ groups['switches'] }}"
+    version: v2c
+    community: public
+    max_repetitions: 50
+  run_once: true
+  delegate_to: localhost
+  register: switches
 '''
 
 from ansible.module_utils.basic import *
@@ -93,10 +118,14 @@ from collections import defaultdict
 
 try:
     from pysnmp.entity.rfc3413.oneliner import cmdgen
+    from pysnmp.error import PySnmpError
+    from pyasn1.type import univ
     has_pysnmp = True
 except:
     has_pysnmp = False
 
+MAX_REPETITIONS = 25
+
 class DefineOid(object):
 
     def __init__(self,dotprefix=False):
@@ -173,10 +202,154 @@ def lookup_operstatus(int_operstatus):
     else:
         return ""
 
+class SnmpWalker(object):
+    """
+    Polls devices with the asynchronous command generator so that all of
+    them are queried at the same time, walking the tables with GETBULK.
+    """
+
+    def __init__(self, snmp_auth, max_repetitions):
+        self.snmp_auth = snmp_auth
+        self.max_repetitions = max_repetitions
+        self.cmdGen = cmdgen.AsynCommandGenerator()
+        self.devices = {}
+
+    def poll(self, host, p):
+        device = { 'system': [], 'interfaces': [], 'ipv4': [], 'error': None }
+        self.devices[host] = device
+        try:
+            # the address is resolved right here
+            target = cmdgen.UdpTransportTarget((host, 161))
+        except PySnmpError, e:
+            device['error'] = str(e)
+            return
+
+        self.cmdGen.asyncGetCmd(
+            self.snmp_auth, target,
+            [cmdgen.MibVariable(oid,) for oid in (p.sysDescr, p.sysObjectId, p.sysUpTime,
+                                                   p.sysContact, p.sysName, p.sysLocation)],
+            (self.get_cb, device))
+
+        self.walk(target, device, 'interfaces', (p.ifIndex, p.ifDescr, p.ifMtu, p.ifSpeed, p.ifPhysAddress,
+                                                 p.ifAdminStatus, p.ifOperStatus, p.ifAlias))
+        self.walk(target, device, 'ipv4', (p.ipAdEntAddr, p.ipAdEntIfIndex, p.ipAdEntNetMask))
+
+    def walk(self, target, device, table, oids):
+        # the walk stops once every column has left its subtree
+        prefixes = [oid.lstrip('.') + '.' for oid in oids]
+        self.cmdGen.asyncBulkCmd(
+            self.snmp_auth, target, 0, self.max_repetitions,
+            [cmdgen.MibVariable(oid,) for oid in oids],
+            (self.walk_cb, (device, table, prefixes)))
+
+    def get_cb(self, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBinds, device):
+        if errorIndication or errorStatus:
+            device['error'] = device['error'] or str(errorIndication or errorStatus.prettyPrint())
+            return
+        device['system'] = [(oid.prettyPrint(), val.prettyPrint()) for oid, val in varBinds]
+
+    def walk_cb(self, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBindTable, cbCtx):
+        device, table, prefixes = cbCtx
+        if errorIndication or errorStatus:
+            device['error'] = device['error'] or str(errorIndication or errorStatus.prettyPrint())
+            return False
+        more = False
+        for row in varBindTable:
+            more = False
+            for idx, (oid, val) in enumerate(row):
+                current_oid = oid.prettyPrint()
+                if idx >= len(prefixes) or isinstance(val, univ.Null) or not current_oid.startswith(prefixes[idx]):
+                    continue
+                device[table].append((current_oid, val.prettyPrint()))
+                more = True
+        return more
+
+    def run(self):
+        # there is no dispatcher until a request was sent
+        dispatcher = self.cmdGen.snmpEngine.transportDispatcher
+        if dispatcher is not None:
+            dispatcher.runDispatcher()
+
+def device_facts(v, device):
+    Tree = lambda: defaultdict(Tree)
+
+    results = Tree()
+
+    for current_oid, current_val in device['system']:
+        if current_oid == v.sysDescr:
+            results['ansible_sysdescr'] = decode_hex(current_val)
+        elif current_oid == v.sysObjectId:
+            results['ansible_sysobjectid'] = current_val
+        elif current_oid == v.sysUpTime:
+            results['ansible_sysuptime'] = current_val
+        elif current_oid == v.sysContact:
+            results['ansible_syscontact'] = current_val
+        elif current_oid == v.sysName:
+            results['ansible_sysname'] = current_val
+        elif current_oid == v.sysLocation:
+            results['ansible_syslocation'] = current_val
+
+    for current_oid, current_val in device['interfaces']:
+        column, ifIndex = current_oid.rsplit('.', 1)
+        ifIndex = int(ifIndex)
+        if column == v.ifIndex:
+            results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
+        elif column == v.ifDescr:
+            results['ansible_interfaces'][ifIndex]['name'] = current_val
+        elif column == v.ifMtu:
+            results['ansible_interfaces'][ifIndex]['mtu'] = current_val
+        elif column == v.ifSpeed:
+            results['ansible_interfaces'][ifIndex]['speed'] = current_val
+        elif column == v.ifPhysAddress:
+            results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
+        elif column == v.ifAdminStatus:
+            results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
+        elif column == v.ifOperStatus:
+            results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
+        elif column == v.ifAlias:
+            results['ansible_interfaces'][ifIndex]['description'] = current_val
+
+    all_ipv4_addresses = []
+    ipv4_networks = Tree()
+
+    for current_oid, current_val in device['ipv4']:
+        curIPList = current_oid.rsplit('.', 4)
+        column = curIPList[0]
+        curIP = ".".join(curIPList[1:])
+        if column == v.ipAdEntAddr:
+            ipv4_networks[curIP]['address'] = current_val
+            all_ipv4_addresses.append(current_val)
+        elif column == v.ipAdEntIfIndex:
+            ipv4_networks[curIP]['interface'] = current_val
+        elif column == v.ipAdEntNetMask:
+            ipv4_networks[curIP]['netmask'] = current_val
+
+    interface_to_ipv4 = {}
+    for ipv4_network in ipv4_networks:
+        current_interface = ipv4_networks[ipv4_network]['interface']
+        current_network = {
+                            'address':  ipv4_networks[ipv4_network]['address'],
+                            'netmask':  ipv4_networks[ipv4_network]['netmask']
+                          }
+        if not current_interface in interface_to_ipv4:
+            interface_to_ipv4[current_interface] = []
+            interface_to_ipv4[current_interface].append(current_network)
+        else:
+            interface_to_ipv4[current_interface].append(current_network)
+
+    for interface in interface_to_ipv4:
+        results['ansible_interfaces'][int(interface)]['ipv4'] = interface_to_ipv4[interface]
+
+    results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
+
+    return results
+
 def main():
     module = AnsibleModule(
         argument_spec=dict(
-            host=dict(required=True),
+            host=dict(required=False),
+            hosts=dict(required=False, type='list'),
+            max_repetitions=dict(required=False, default=MAX_REPETITIONS, type='int'),
             version=dict(required=True, choices=['v2', 'v2c', 'v3']),
             community=dict(required=False, default=False),
             username=dict(required=False),
@@ -187,6 +360,8 @@ def main():
             privkey=dict(required=False),
             removeplaceholder=dict(required=False)),
             required_together = ( ['username','level','integrity','authkey'],['privacy','privkey'],),
+            required_one_of = ( ['host','hosts'],),
+            mutually_exclusive = ( ['host','hosts'],),
         supports_check_mode=False)
 
     m_args = module.params
@@ -194,8 +369,6 @@ def main():
     if not has_pysnmp:
         module.fail_json(msg='Missing required pysnmp module (check docs)')
 
-    cmdGen = cmdgen.CommandGenerator()
-
     # Verify that we receive a community when using snmp v2
     if m_args['version'] == "v2" or m_args['version'] == "v2c":
         if m_args['community'] == False:
@@ -236,131 +409,34 @@ def main():
     # Use v without a prefix to use with return values
     v = DefineOid(dotprefix=False)
 
-    Tree = lambda: defaultdict(Tree)
-                               
-    results = Tree()
-            
-    errorIndication, errorStatus, errorIndex, varBinds = cmdGen.getCmd(
-        snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)),
-        cmdgen.MibVariable(p.sysDescr,),
-        cmdgen.MibVariable(p.sysObjectId,), 
-        cmdgen.MibVariable(p.sysUpTime,),
-        cmdgen.MibVariable(p.sysContact,), 
-        cmdgen.MibVariable(p.sysName,),
-        cmdgen.MibVariable(p.sysLocation,),
-    )
-
-
-    if errorIndication:
-        module.fail_json(msg=str(errorIndication))
-
-    for oid, val in varBinds:
-        current_oid = oid.prettyPrint()
-        current_val = val.prettyPrint()
-        if current_oid == v.sysDescr:
-            results['ansible_sysdescr'] = decode_hex(current_val)
-        elif current_oid == v.sysObjectId:
-            results['ansible_sysobjectid'] = current_val
-        elif current_oid == v.sysUpTime:
-            results['ansible_sysuptime'] = current_val
-        elif current_oid == v.sysContact:
-            results['ansible_syscontact'] = current_val
-        elif current_oid == v.sysName:
-            results['ansible_sysname'] = current_val
-        elif current_oid == v.sysLocation:
-            results['ansible_syslocation'] = current_val
+    walker = SnmpWalker(snmp_auth, m_args['max_repetitions'])
 
-    errorIndication, errorStatus, errorIndex, varTable = cmdGen.nextCmd(
-        snmp_auth,
-        cmdgen.UdpTransportTarget((m_args['host'], 161)), 
-        cmdgen.MibVariable(p.ifIndex,),
-        cmdgen.MibVariable(p.ifDescr,),
-        cmdgen.MibVariable(p.ifMtu,),
-        cmdgen.MibVariable(p.ifSpeed,),
-        cmdgen.MibVariable(p.ifPhysAddress,),
-        cmdgen.MibVariable(p.ifAdminStatus,),
-        cmdgen.MibVariable(p.ifOperStatus,),
-        cmdgen.MibVariable(p.ipAdEntAddr,), 
-        cmdgen.MibVariable(p.ipAdEntIfIndex,), 
-        cmdgen.MibVariable(p.ipAdEntNetMask,), 
-
-        cmdgen.MibVariable(p.ifAlias,),
-    )
- 
+    if m_args['hosts'] is None:
+        walker.poll(m_args['host'], p)
+        walker.run()
 
-    if errorIndication:
-        module.fail_json(msg=str(errorIndication))
+        device = walker.devices[m_args['host']]
+        if device['error']:
+            module.fail_json(msg=device['error'])
 
-    interface_indexes = []
-    
-    all_ipv4_addresses = []     
-    ipv4_networks = Tree()
+        module.exit_json(ansible_facts=device_facts(v, device))
 
-    for varBinds in varTable:
-        for oid, val in varBinds:
-            current_oid = oid.prettyPrint()
-            current_val = val.prettyPrint()
-            if v.ifIndex in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['ifindex'] = current_val
-                interface_indexes.append(ifIndex)
-            if v.ifDescr in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['name'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mtu'] = current_val
-            if v.ifMtu in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['speed'] = current_val
-            if v.ifPhysAddress in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['mac'] = decode_mac(current_val)
-            if v.ifAdminStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['adminstatus'] = lookup_adminstatus(int(current_val))
-            if v.ifOperStatus in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['operstatus'] = lookup_operstatus(int(current_val))
-            if v.ipAdEntAddr in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['address'] = current_val
-                all_ipv4_addresses.append(current_val)
-            if v.ipAdEntIfIndex in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['interface'] = current_val
-            if v.ipAdEntNetMask in current_oid:
-                curIPList = current_oid.rsplit('.', 4)[-4:]
-                curIP = ".".join(curIPList)
-                ipv4_networks[curIP]['netmask'] = current_val
-
-            if v.ifAlias in current_oid:
-                ifIndex = int(current_oid.rsplit('.', 1)[-1])
-                results['ansible_interfaces'][ifIndex]['description'] = current_val
+    for host in m_args['hosts']:
+        walker.poll(host, p)
+    walker.run()
 
-    interface_to_ipv4 = {}
-    for ipv4_network in ipv4_networks:
-        current_interface = ipv4_networks[ipv4_network]['interface']
-        current_network = {
-                            'address':  ipv4_networks[ipv4_network]['address'],
-                            'netmask':  ipv4_networks[ipv4_network]['netmask']
-                          }
-        if not current_interface in interface_to_ipv4:
-            interface_to_ipv4[current_interface] = []
-            interface_to_ipv4[current_interface].append(current_network)
+    devices = {}
+    errors = {}
+    for host, device in walker.devices.items():
+        if device['error']:
+            errors[host] = device['error']
         else:
-            interface_to_ipv4[current_interface].append(current_network)
+            devices[host] = device_facts(v, device)
 
-    for interface in interface_to_ipv4:
-        results['ansible_interfaces'][int(interface)]['ipv4'] = interface_to_ipv4[interface]
+    if not devices:
+        module.fail_json(msg='None of the devices could be polled', errors=errors)
 
-    results['ansible_all_ipv4_addresses'] = all_ipv4_addresses
- 
-    module.exit_json(ansible_facts=results)
+    module.exit_json(devices=devices, errors=errors)
     
 
 main()
-
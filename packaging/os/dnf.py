@@ -22,6 +22,8 @@
 
 import traceback
 import os
+import glob
+import hashlib
 import dnf
 
 try:
@@ -130,6 +132,9 @@ if not os.path.exists(repoquery):
 
 dnfbin='/usr/bin/dnf'
 
+repo_metadata_glob = '/var/cache/dnf/*/repodata/repomd.xml'
+rpmdb_path = '/var/lib/rpm'
+
 import syslog
 
 def log(msg):
@@ -148,6 +153,122 @@ def dnf_base(conf_file=None, cachedir=False):
 
     return my
 
+def metadata_fingerprint():
+    """checksum of the cached repo metadata and the rpmdb state"""
+
+    h = hashlib.sha1()
+    for path in sorted(glob.glob(repo_metadata_glob)):
+        try:
+            f = open(path, 'rb')
+            try:
+                h.update(path)
+                h.update(f.read())
+            finally:
+                f.close()
+        except IOError:
+            pass
+    if os.path.isdir(rpmdb_path):
+        for name in sorted(os.listdir(rpmdb_path)):
+            try:
+                st = os.stat(os.path.join(rpmdb_path, name))
+            except OSError:
+                continue
+            h.update('%s %d %d' % (name, st.st_mtime, st.st_size))
+    return h.hexdigest()
+
+class RepoQueryCache(object):
+    """
+    in-process cache of successful repoquery results, keyed by the full
+    repoquery command line (pkgspec, qf and enabled/disabled repos).
+    Everything is dropped as soon as the repo metadata checksums or the
+    rpmdb change, e.g. after a dnf transaction run by this module.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.fingerprint = None
+
+    def _validate(self):
+        fingerprint = metadata_fingerprint()
+        if fingerprint != self.fingerprint:
+            self.results = {}
+            self.fingerprint = fingerprint
+
+    def get(self, cmd):
+        self._validate()
+        return self.results.get(tuple(cmd))
+
+    def set(self, cmd, result):
+        self._validate()
+        self.results[tuple(cmd)] = result
+
+repoquery_cache = RepoQueryCache()
+
+def run_repoquery(module, cmd):
+
+    result = repoquery_cache.get(cmd)
+    if result is None:
+        result = module.run_command(cmd)
+        if result[0] == 0:
+            repoquery_cache.set(cmd, result)
+    return result
+
+def repoq_with_repos(repoq, en_repos=[], dis_repos=[]):
+
+    myrepoq = list(repoq)
+    for repoid in dis_repos:
+        r_cmd = ['--disablerepo', repoid]
+        myrepoq.extend(r_cmd)
+
+    for repoid in en_repos:
+        r_cmd = ['--enablerepo', repoid]
+        myrepoq.extend(r_cmd)
+
+    return myrepoq
+
+def warm_repoquery_cache(module, repoq, items, en_repos=[], dis_repos=[]):
+    """
+    resolve the installed and available packages of all plain package names
+    in items with one bulk repoquery each and seed the cache with the
+    results the per-spec lookups in is_installed and is_available would get
+    """
+
+    names = []
+    for spec in items:
+        if spec.startswith('@') or '://' in spec or spec.endswith('.rpm'):
+            continue
+        if set('*?[<>=/ ').intersection(set(spec)):
+            continue
+        names.append(spec)
+    if not names:
+        return
+
+    installed_cmd = repoq + ["--disablerepo=*", "--pkgnarrow=installed"]
+    available_cmd = repoq_with_repos(repoq, en_repos, dis_repos)
+
+    found = {}
+    for prefix in (installed_cmd, available_cmd):
+        cmd = prefix + ["--qf", "%{name}|" + def_qf] + names
+        rc, out, err = module.run_command(cmd)
+        if rc != 0:
+            return
+        by_name = {}
+        for line in out.split('\n'):
+            if '|' in line:
+                name, nevra = line.split('|', 1)
+                by_name.setdefault(name, []).append(nevra)
+        found[tuple(prefix)] = by_name
+
+    for name in names:
+        # only names that matched a package somewhere are known to be
+        # package names, anything else could be a provide
+        if not [p for p in found.values() if name in p]:
+            continue
+        for prefix in (installed_cmd, available_cmd):
+            pkgs = found[tuple(prefix)].get(name, [])
+            out = ''.join([ '%s\n' % p for p in pkgs ])
+            repoquery_cache.set(prefix + ["--qf", def_qf, name], (0, out, ''))
+
 def install_dnf_utils(module):
 
     if not module.check_mode:
@@ -190,10 +311,10 @@ def is_installed(module, repoq, pkgspec, conf_file, qf=def_qf, en_repos=[], dis_
     else:
 
         cmd = repoq + ["--disablerepo=*", "--pkgnarrow=installed", "--qf", qf, pkgspec]
-        rc,out,err = module.run_command(cmd)
+        rc,out,err = run_repoquery(module, cmd)
         if not is_pkg:
             cmd = repoq + ["--disablerepo=*", "--pkgnarrow=installed", "--qf", qf, "--whatprovides", pkgspec]
-            rc2,out2,err2 = module.run_command(cmd)
+            rc2,out2,err2 = run_repoquery(module, cmd)
         else:
             rc2,out2,err2 = (0, '', '')
             
@@ -227,18 +348,10 @@ def is_available(module, repoq, pkgspec, conf_file, qf=def_qf, en_repos=[], dis_
         return [ po_to_nevra(p) for p in pkgs ]
 
     else:
-        myrepoq = list(repoq)
-                 
-        for repoid in dis_repos:
-            r_cmd = ['--disablerepo', repoid]
-            myrepoq.extend(r_cmd)
-
-        for repoid in en_repos:
-            r_cmd = ['--enablerepo', repoid]
-            myrepoq.extend(r_cmd)
+        myrepoq = repoq_with_repos(repoq, en_repos, dis_repos)
 
         cmd = myrepoq + ["--qf", qf, pkgspec]
-        rc,out,err = module.run_command(cmd)
+        rc,out,err = run_repoquery(module, cmd)
         if rc == 0:
             return [ p for p in out.split('\n') if p.strip() ]
         else:
@@ -277,17 +390,10 @@ def is_update(module, repoq, pkgspec, conf_file, qf=def_qf, en_repos=[], dis_rep
         return set([ po_to_nevra(p) for p in retpkgs ])
 
     else:
-        myrepoq = list(repoq)
-        for repoid in dis_repos:
-            r_cmd = ['--disablerepo', repoid]
-            myrepoq.extend(r_cmd)
-
-        for repoid in en_repos:
-            r_cmd = ['--enablerepo', repoid]
-            myrepoq.extend(r_cmd)
+        myrepoq = repoq_with_repos(repoq, en_repos, dis_repos)
 
         cmd = myrepoq + ["--pkgnarrow=updates", "--qf", qf, pkgspec]
-        rc,out,err = module.run_command(cmd)
+        rc,out,err = run_repoquery(module, cmd)
         
         if rc == 0:
             return set([ p for p in out.split('\n') if p.strip() ])
@@ -322,19 +428,12 @@ def what_provides(module, repoq, req_spec, conf_file,  qf=def_qf, en_repos=[], d
         return set([ po_to_nevra(p) for p in pkgs ])
 
     else:
-        myrepoq = list(repoq)
-        for repoid in dis_repos:
-            r_cmd = ['--disablerepo', repoid]
-            myrepoq.extend(r_cmd)
-
-        for repoid in en_repos:
-            r_cmd = ['--enablerepo', repoid]
-            myrepoq.extend(r_cmd)
+        myrepoq = repoq_with_repos(repoq, en_repos, dis_repos)
 
         cmd = myrepoq + ["--qf", qf, "--whatprovides", req_spec]
-        rc,out,err = module.run_command(cmd)
+        rc,out,err = run_repoquery(module, cmd)
         cmd = myrepoq + ["--qf", qf, req_spec]
-        rc2,out2,err2 = module.run_command(cmd)
+        rc2,out2,err2 = run_repoquery(module, cmd)
         if rc == 0 and rc2 == 0:
             out += out2
             pkgs = set([ p for p in out.split('\n') if p.strip() ])
@@ -664,7 +763,7 @@ def latest(module, items, repoq, dnf_basecmd, conf_file, en_repos, dis_repos):
                     nothing_to_do = False
                     break
                     
-                if basecmd == 'update' and is_update(module, repoq, this, conf_file, en_repos=en_repos, dis_repos=en_repos):
+                if basecmd == 'update' and is_update(module, repoq, this, conf_file, en_repos=en_repos, dis_repos=dis_repos):
                     nothing_to_do = False
                     break
                     
@@ -758,6 +857,9 @@ def ensure(module, state, pkgspec, conf_file, enablerepo, disablerepo,
         except dnf.exceptions.Error, e:
             module.fail_json(msg="Error accessing repos: %s" % e)
 
+    if repoq:
+        warm_repoquery_cache(module, repoq, items, en_repos, dis_repos)
+
     if state in ['installed', 'present']:
         if disable_gpg_check:
             dnf_basecmd.append('--nogpgcheck')
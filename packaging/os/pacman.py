@@ -90,37 +90,53 @@ import sys
 
 PACMAN_PATH = "/usr/bin/pacman"
 
-def get_version(pacman_output):
-    """Take pacman -Qi or pacman -Si output and get the Version"""
-    lines = pacman_output.split('\n')
-    for line in lines:
-        if 'Version' in line:
-            return line.split(':')[1].strip()
-    return None
-
-def query_package(module, name, state="present"):
-    """Query the package status in both the local system and the repository. Returns a boolean to indicate if the package is installed, and a second boolean to indicate if the package is up-to-date."""
-    if state == "present":
-        lcmd = "pacman -Qi %s" % (name)
-        lrc, lstdout, lstderr = module.run_command(lcmd, check_rc=False)
-        if lrc != 0:
-            # package is not installed locally
-            return False, False
-        
-        # get the version installed locally (if any)
-        lversion = get_version(lstdout)
-        
-        rcmd = "pacman -Si %s" % (name)
-        rrc, rstdout, rstderr = module.run_command(rcmd, check_rc=False)
-        # get the version in the repository
-        rversion = get_version(rstdout)
-
-        if rrc == 0:
-            # Return True to indicate that the package is installed locally, and the result of the version number comparison
-            # to determine if the package is up-to-date.
-            return True, (lversion == rversion)
-
-        return False, False
+def get_installed_versions(module):
+    """Return a dict of all locally installed packages and their versions, using a single pacman -Q"""
+    rc, stdout, stderr = module.run_command("pacman -Q", check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="could not list installed packages", stderr=stderr)
+
+    installed = {}
+    for line in stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            installed[fields[0]] = fields[1]
+    return installed
+
+
+def get_repo_versions(module):
+    """Return a dict of all packages in the sync repositories and their versions, using a single pacman -Sl"""
+    rc, stdout, stderr = module.run_command("pacman -Sl", check_rc=False)
+    if rc != 0:
+        module.fail_json(msg="could not list repository packages", stderr=stderr)
+
+    available = {}
+    for line in stdout.splitlines():
+        fields = line.split()
+        # repositories are listed in pacman.conf order, the first one wins
+        if len(fields) >= 3 and fields[1] not in available:
+            available[fields[1]] = fields[2]
+    return available
+
+
+def query_packages(module, packages, state="present"):
+    """Query the package status of all packages at once, using at most one pacman -Q and one pacman -Sl. Returns a dict mapping each package to a boolean to indicate if it is installed, and a second boolean to indicate if it is up-to-date."""
+    installed = get_installed_versions(module)
+    if state == "latest":
+        available = get_repo_versions(module)
+    else:
+        available = {}
+
+    status = {}
+    for package in packages:
+        if package not in installed:
+            status[package] = (False, False)
+        elif package not in available:
+            # packages not found in any repository cannot be upgraded
+            status[package] = (True, True)
+        else:
+            status[package] = (True, installed[package] == available[package])
+    return status
 
 
 def update_package_db(module):
@@ -139,51 +155,51 @@ def remove_packages(module, packages):
     else:
         args = "R"
 
-    remove_c = 0
-    # Using a for loop incase of error, we can report the package that failed
-    for package in packages:
-        # Query the package first, to see if we even need to remove
-        installed, updated = query_package(module, package)
-        if not installed:
-            continue
+    # Query all packages first, to see if we even need to remove
+    status = query_packages(module, packages)
+    to_remove = [package for package in packages if status[package][0]]
 
-        cmd = "pacman -%s %s --noconfirm" % (args, package)
+    if to_remove:
+        # remove everything in a single transaction
+        cmd = "pacman -%s %s --noconfirm" % (args, " ".join(to_remove))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to remove %s" % (package))
+            module.fail_json(msg="failed to remove %s" % (" ".join(to_remove)), stdout=stdout, stderr=stderr)
 
-        remove_c += 1
-
-    if remove_c > 0:
-
-        module.exit_json(changed=True, msg="removed %s package(s)" % remove_c)
+        module.exit_json(changed=True, msg="removed %s package(s)" % len(to_remove))
 
     module.exit_json(changed=False, msg="package(s) already absent")
 
 
 def install_packages(module, state, packages, package_files):
-    install_c = 0
+    status = query_packages(module, packages, state)
 
+    to_sync = []
+    to_upgrade = []
     for i, package in enumerate(packages):
         # if the package is installed and state == present or state == latest and is up-to-date then skip
-        installed, updated = query_package(module, package)
+        installed, updated = status[package]
         if installed and (state == 'present' or (state == 'latest' and updated)):
             continue
 
         if package_files[i]:
-            params = '-U %s' % package_files[i]
+            to_upgrade.append(package_files[i])
         else:
-            params = '-S %s' % package
+            to_sync.append(package)
 
-        cmd = "pacman %s --noconfirm" % (params)
+    # repository packages and package files each go into a single transaction
+    for params, targets in (('-S', to_sync), ('-U', to_upgrade)):
+        if not targets:
+            continue
+
+        cmd = "pacman %s %s --noconfirm" % (params, " ".join(targets))
         rc, stdout, stderr = module.run_command(cmd, check_rc=False)
 
         if rc != 0:
-            module.fail_json(msg="failed to install %s" % (package))
-
-        install_c += 1
+            module.fail_json(msg="failed to install %s" % (" ".join(targets)), stdout=stdout, stderr=stderr)
 
+    install_c = len(to_sync) + len(to_upgrade)
     if install_c > 0:
         module.exit_json(changed=True, msg="installed %s package(s)" % (install_c))
 
@@ -191,9 +207,10 @@ def install_packages(module, state, packages, package_files):
 
 
 def check_packages(module, packages, state):
+    status = query_packages(module, packages, state)
     would_be_changed = []
     for package in packages:
-        installed, updated = query_package(module, package)
+        installed, updated = status[package]
         if ((state in ["present", "latest"] and not installed) or
                 (state == "absent" and installed) or
                 (state == "latest" and not updated)):
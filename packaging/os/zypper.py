@@ -101,67 +101,66 @@ def zypper_version(module):
     else:
         return rc, stderr
 
-# Function used for getting versions of currently installed packages.
-def get_current_version(m, packages):
-    cmd = ['/bin/rpm', '-q', '--qf', '%{NAME} %{VERSION}-%{RELEASE}\n']
-    cmd.extend(packages)
-
+# Function used to build an index of all installed packages with a single rpmdb query.
+def get_installed_packages(m):
+    """Return dict mapping package names to the list of installed VERSION-RELEASE strings"""
+    cmd = ['/bin/rpm', '--query', '--all', '--qf', '%{NAME} %{VERSION}-%{RELEASE}\n']
     rc, stdout, stderr = m.run_command(cmd, check_rc=False)
+    if rc != 0:
+        m.fail_json(msg="failed to query the rpm database: %s" % stderr)
 
-    current_version = {}
+    installed = {}
     rpmoutput_re = re.compile('^(\S+) (\S+)$')
-
     for stdoutline in stdout.splitlines():
         match = rpmoutput_re.match(stdoutline)
-        if match == None:
-            return None
-        package = match.group(1)
-        version = match.group(2)
-        current_version[package] = version
-
-    for package in packages:
-        if package not in current_version:
-            print package + ' was not returned by rpm \n'
-            return None
-
-    return current_version
-
+        if match:
+            installed.setdefault(match.group(1), []).append(match.group(2))
+    return installed
+
+# Function used to find the installed versions of a package specifier.
+def lookup_package(installed, package):
+    """Return the installed versions matching C(name), C(name-version) or C(name-version-release)"""
+    if package in installed:
+        return installed[package]
+    parts = package.split('-')
+    for i in range(len(parts) - 1, 0, -1):
+        name = '-'.join(parts[:i])
+        version = '-'.join(parts[i:])
+        if name in installed:
+            return [v for v in installed[name] if v == version or v.startswith(version + '-')]
+    return []
 
 # Function used to find out if a package is currently installed.
-def get_package_state(m, packages):
-    cmd = ['/bin/rpm', '--query', '--qf', 'package %{NAME} is installed\n']
-    cmd.extend(packages)
-
-    rc, stdout, stderr = m.run_command(cmd, check_rc=False)
-
+def get_package_state(installed, packages):
     installed_state = {}
-    rpmoutput_re = re.compile('^package (\S+) (.*)$')
-    for stdoutline in stdout.splitlines():
-        match = rpmoutput_re.match(stdoutline)
-        if match == None:
-            return None
-        package = match.group(1)
-        result = match.group(2)
-        if result == 'is installed':
-            installed_state[package] = True
-        else:
-            installed_state[package] = False
+    for package in packages:
+        installed_state[package] = bool(lookup_package(installed, package))
+    return installed_state
 
+# Function used to get the versions of the requested packages.
+def get_current_version(installed, packages):
+    current_version = {}
     for package in packages:
-        if package not in installed_state:
-            print package + ' was not returned by rpm \n'
-            return None
+        current_version[package] = sorted(lookup_package(installed, package))
+    return current_version
 
-    return installed_state
+# Function used to turn the desired state into a single zypper transaction.
+def plan_transaction(name, state, installed_state):
+    """Return (command, packages) for the one zypper call needed, or (None, []) if nothing is to be done"""
+    if state in ['installed', 'present']:
+        return 'install', [package for package in name if not installed_state[package]]
+    elif state in ['absent', 'removed']:
+        return 'remove', [package for package in name if installed_state[package]]
+    elif state == 'latest':
+        # zypper install also upgrades packages that are already installed,
+        # so missing and outdated packages are handled in one transaction
+        return 'install', list(name)
+    return None, []
 
-# Function used to make sure a package is present.
-def package_present(m, name, installed_state, package_type, disable_gpg_check, disable_recommends, old_zypper):
-    packages = []
-    for package in name:
-        if installed_state[package] is False:
-            packages.append(package)
-    if len(packages) != 0:
-        cmd = ['/usr/bin/zypper', '--non-interactive']
+# Function used to run the planned zypper transaction.
+def run_transaction(m, command, packages, package_type, disable_gpg_check, disable_recommends, old_zypper):
+    cmd = ['/usr/bin/zypper', '--non-interactive']
+    if command == 'install':
         # add global options before zypper command
         if disable_gpg_check:
             cmd.append('--no-gpg-checks')
@@ -169,74 +168,15 @@ def package_present(m, name, installed_state, package_type, disable_gpg_check, d
         # add install parameter
         if disable_recommends and not old_zypper:
             cmd.append('--no-recommends')
-        cmd.extend(packages)
-        rc, stdout, stderr = m.run_command(cmd, check_rc=False)
-
-        if rc == 0:
-            changed=True
-        else:
-            changed=False
-    else:
-        rc = 0
-        stdout = ''
-        stderr = ''
-        changed=False
-
-    return (rc, stdout, stderr, changed)
-
-# Function used to make sure a package is the latest available version.
-def package_latest(m, name, installed_state, package_type, disable_gpg_check, disable_recommends, old_zypper):
-
-    # first of all, make sure all the packages are installed
-    (rc, stdout, stderr, changed) = package_present(m, name, installed_state, package_type, disable_gpg_check, disable_recommends, old_zypper)
-
-    # if we've already made a change, we don't have to check whether a version changed
-    if not changed:
-        pre_upgrade_versions = get_current_version(m, name)
-
-    cmd = ['/usr/bin/zypper', '--non-interactive']
-
-    if disable_gpg_check:
-        cmd.append('--no-gpg-checks')
-
-    if old_zypper:
-        cmd.extend(['install', '--auto-agree-with-licenses', '-t', package_type])
-    else:
-        cmd.extend(['update', '--auto-agree-with-licenses', '-t', package_type])
-
-    cmd.extend(name)
-    rc, stdout, stderr = m.run_command(cmd, check_rc=False)
-
-    # if we've already made a change, we don't have to check whether a version changed
-    if not changed:
-        post_upgrade_versions = get_current_version(m, name)
-        if pre_upgrade_versions != post_upgrade_versions:
-            changed = True
-
-    return (rc, stdout, stderr, changed)
-
-# Function used to make sure a package is not installed.
-def package_absent(m, name, installed_state, package_type, old_zypper):
-    packages = []
-    for package in name:
-        if installed_state[package] is True:
-            packages.append(package)
-    if len(packages) != 0:
-        cmd = ['/usr/bin/zypper', '--non-interactive', 'remove', '-t', package_type]
-        cmd.extend(packages)
-        rc, stdout, stderr = m.run_command(cmd)
-
-        if rc == 0:
-            changed=True
-        else:
-            changed=False
     else:
-        rc = 0
-        stdout = ''
-        stderr = ''
-        changed=False
+        cmd.extend(['remove', '-t', package_type])
+    cmd.extend(packages)
+    return m.run_command(cmd, check_rc=False)
 
-    return (rc, stdout, stderr, changed)
+# Function used to tell from zypper's output whether a transaction did anything.
+def transaction_changed(stdout):
+    # zypper reports "Nothing to do." when everything already is as requested
+    return re.search(r'^Nothing to do', stdout, re.M) is None
 
 # ===========================================
 # Main control flow
@@ -269,23 +209,31 @@ def main():
     result['name'] = name
     result['state'] = state
 
-    rc, out = zypper_version(module)
+    version_rc, out = zypper_version(module)
     match = re.match(r'zypper\s+(\d+)\.(\d+)\.(\d+)', out)
     if not match or  int(match.group(1)) > 0:
         old_zypper = False
     else:
         old_zypper = True
 
-    # Get package state
-    installed_state = get_package_state(module, name)
+    # Get package state from a single rpmdb query
+    installed = get_installed_packages(module)
+    installed_state = get_package_state(installed, name)
 
-    # Perform requested action
-    if state in ['installed', 'present']:
-        (rc, stdout, stderr, changed) = package_present(module, name, installed_state, type_, disable_gpg_check, disable_recommends, old_zypper)
-    elif state in ['absent', 'removed']:
-        (rc, stdout, stderr, changed) = package_absent(module, name, installed_state, type_, old_zypper)
-    elif state == 'latest':
-        (rc, stdout, stderr, changed) = package_latest(module, name, installed_state, type_, disable_gpg_check, disable_recommends, old_zypper)
+    # Perform requested action in one zypper transaction
+    command, packages = plan_transaction(name, state, installed_state)
+    changed = False
+    if packages:
+        rc, stdout, stderr = run_transaction(module, command, packages, type_, disable_gpg_check, disable_recommends, old_zypper)
+        if rc == 0:
+            if type_ != 'package':
+                # patches, patterns and products aren't in the rpmdb by name
+                changed = transaction_changed(stdout)
+            elif state == 'latest':
+                # only count it as a change if a version actually changed
+                changed = get_current_version(installed, name) != get_current_version(get_installed_packages(module), name)
+            else:
+                changed = True
 
     if rc != 0:
         if stderr:
@@ -57,6 +57,14 @@ options:
      - If a matching job is present a new job will not be added.
     required: false
     default: false
+  index_file:
+    description:
+     - File in which the digests of the queued jobs' commands are cached between runs, so that only
+       jobs which were queued since are read again. Without it the queued jobs are read on every run.
+     - Jobs match when their command is identical to the given one, apart from surrounding whitespace.
+    required: false
+    default: null
+    version_added: "2.0"
 requirements:
  - at
 author: "Richard Isaacson (@risaacson)"
@@ -71,11 +79,183 @@ EXAMPLES = '''
 
 # Schedule a command to execute in 20 minutes making sure it is unique in the queue.
 - at: command="ls -d / > /dev/null" unique=true count=20 units="minutes"
+
+# Keep the index of queued jobs between runs, so that only new jobs are read.
+- at: command="ls -d / > /dev/null" unique=true count=20 units="minutes" index_file=/var/cache/ansible/at_index
 '''
 
 import os
+import re
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import sha as sha1
+try:
+    import json
+except ImportError:
+    import simplejson as json
 import tempfile
 
+# where the at daemon keeps the queued jobs, one file per job
+AT_SPOOL_DIRS = [ '/var/spool/cron/atjobs', '/var/spool/at', '/var/at/jobs' ]
+
+# at -c prints the environment and a cd into the working directory before the
+# job's own commands, newer versions wrap those commands in a here document
+AT_CD_BLOCK = re.compile(r'^cd .* \|\| \{$')
+AT_HEREDOC = re.compile(r"^\$\{SHELL:-/bin/sh\} << '(\S+)'$")
+AT_JOB_HEADER = re.compile(r'^#!/bin/sh\n# atrun ', re.M)
+
+
+def job_body(text):
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        if AT_CD_BLOCK.match(line) and '}' in lines[i:]:
+            lines = lines[lines.index('}', i) + 1:]
+            break
+    if lines:
+        heredoc = AT_HEREDOC.match(lines[0])
+        if heredoc and heredoc.group(1) in lines:
+            lines = lines[1:lines.index(heredoc.group(1))]
+    return '\n'.join(lines).strip()
+
+
+def body_digest(body):
+    return sha1(body).hexdigest()
+
+
+def read_file(path):
+    fileh = open(path)
+    try:
+        return fileh.read()
+    finally:
+        fileh.close()
+
+
+class AtJobIndex(object):
+    """ Digests of the command of every queued job, by job number.
+
+        When an index_file is given the digests are cached in it along with the
+        spool directory's mtime, an unchanged spool is not read at all and
+        otherwise only the jobs which were not indexed before are read. Jobs are
+        read straight from the spool when it is readable or with a single at -c
+        for all of them. """
+
+    def __init__(self, module, at_cmd, index_file=None):
+        self.module = module
+        self.at_cmd = at_cmd
+        self.index_file = index_file and os.path.expanduser(index_file)
+        self.index = None
+
+    def load(self):
+        index = None
+        if not self.index_file:
+            return { 'spool': None, 'mtime': None, 'jobs': {} }
+        try:
+            fileh = open(self.index_file)
+            try:
+                index = json.load(fileh)
+            finally:
+                fileh.close()
+        except (IOError, ValueError):
+            pass
+        if isinstance(index, dict) and isinstance(index.get('jobs'), dict):
+            return index
+        return { 'spool': None, 'mtime': None, 'jobs': {} }
+
+    def save(self, index):
+        if not self.index_file:
+            return
+        try:
+            fd, tmp = tempfile.mkstemp(prefix='.at_index', dir=os.path.dirname(self.index_file) or '.')
+            fileh = os.fdopen(fd, 'w')
+            try:
+                json.dump(index, fileh)
+            finally:
+                fileh.close()
+        except (IOError, OSError):
+            # the index is only a cache
+            return
+        self.module.atomic_move(tmp, self.index_file)
+
+    def spool_dir(self):
+        for spool in AT_SPOOL_DIRS:
+            if os.path.isdir(spool) and os.access(spool, os.R_OK | os.X_OK):
+                return spool
+        return None
+
+    def jobs(self):
+        if self.index is None:
+            cached = self.load()
+            spool = self.spool_dir()
+            if spool is not None:
+                mtime = os.stat(spool).st_mtime
+                if cached['spool'] == spool and cached['mtime'] == mtime:
+                    self.index = cached
+                else:
+                    self.index = { 'spool': spool, 'mtime': mtime, 'jobs': self.read_spool(spool, cached['jobs']) }
+                    self.save(self.index)
+            else:
+                self.index = { 'spool': None, 'mtime': None, 'jobs': self.read_atq(cached['jobs']) }
+                # atq is read on every run, only rewrite the index when a job came or went
+                if self.index != cached:
+                    self.save(self.index)
+        return dict((job, digest) for job, (key, digest) in self.index['jobs'].items())
+
+    def read_spool(self, spool, cached):
+        jobs = {}
+        for name in os.listdir(spool):
+            path = os.path.join(spool, name)
+            # job files are named <queue><job number, 5 hex digits><minutes, 8 hex digits>
+            if name.startswith('.') or len(name) != 14 or not os.path.isfile(path):
+                continue
+            try:
+                job = str(int(name[1:6], 16))
+            except ValueError:
+                continue
+            key = '%s %s' % (name, os.stat(path).st_mtime)
+            if job in cached and cached[job][0] == key:
+                jobs[job] = cached[job]
+            else:
+                jobs[job] = [ key, body_digest(job_body(read_file(path))) ]
+        return jobs
+
+    def read_atq(self, cached):
+        atq_cmd = self.module.get_bin_path('atq', True)
+        rc, out, err = self.module.run_command(atq_cmd, check_rc=True)
+
+        jobs = {}
+        unknown = []
+        for line in out.splitlines():
+            if not line.split():
+                continue
+            job = line.split()[0]
+            if job in cached and cached[job][0] == line:
+                jobs[job] = cached[job]
+            else:
+                jobs[job] = [ line, None ]
+                unknown.append(job)
+
+        if unknown:
+            for job, text in zip(unknown, self.read_jobs(unknown)):
+                jobs[job][1] = body_digest(job_body(text))
+        return jobs
+
+    def read_jobs(self, jobs):
+        rc, out, err = self.module.run_command([ self.at_cmd, '-c' ] + jobs, check_rc=True)
+        starts = [ m.start() for m in AT_JOB_HEADER.finditer(out) ]
+        if len(starts) == len(jobs):
+            return [ out[start:end] for start, end in zip(starts, starts[1:] + [ len(out) ]) ]
+        # the output of this at could not be split up by job, read them one by one
+        texts = []
+        for job in jobs:
+            rc, out, err = self.module.run_command([ self.at_cmd, '-c', job ], check_rc=True)
+            texts.append(out)
+        return texts
+
+    def matching(self, script_file):
+        digest = body_digest(read_file(script_file).strip())
+        return sorted([ job for job, job_digest in self.jobs().items() if job_digest == digest ], key=int)
+
 
 def add_job(module, result, at_cmd, count, units, command, script_file):
     at_command = "%s -f %s now + %s %s" % (at_cmd, script_file, count, units)
@@ -85,9 +265,10 @@ def add_job(module, result, at_cmd, count, units, command, script_file):
     result['changed'] = True
 
 
-def delete_job(module, result, at_cmd, command, script_file):
-    for matching_job in get_matching_jobs(module, at_cmd, script_file):
-        at_command = "%s -d %s" % (at_cmd, matching_job)
+def delete_job(module, result, at_cmd, command, script_file, index):
+    matching_jobs = index.matching(script_file)
+    if matching_jobs:
+        at_command = [ at_cmd, '-d' ] + matching_jobs
         rc, out, err = module.run_command(at_command, check_rc=True)
         result['changed'] = True
     if command:
@@ -95,34 +276,6 @@ def delete_job(module, result, at_cmd, command, script_file):
     module.exit_json(**result)
 
 
-def get_matching_jobs(module, at_cmd, script_file):
-    matching_jobs = []
-
-    atq_cmd = module.get_bin_path('atq', True)
-
-    # Get list of job numbers for the user.
-    atq_command = "%s" % atq_cmd
-    rc, out, err = module.run_command(atq_command, check_rc=True)
-    current_jobs = out.splitlines()
-    if len(current_jobs) == 0:
-        return matching_jobs
-
-    # Read script_file into a string.
-    script_file_string = open(script_file).read().strip()
-
-    # Loop through the jobs.
-    #   If the script text is contained in a job add job number to list.
-    for current_job in current_jobs:
-        split_current_job = current_job.split()
-        at_command = "%s -c %s" % (at_cmd, split_current_job[0])
-        rc, out, err = module.run_command(at_command, check_rc=True)
-        if script_file_string in out:
-            matching_jobs.append(split_current_job[0])
-
-    # Return the list.
-    return matching_jobs
-
-
 def create_tempfile(command):
     filed, script_file = tempfile.mkstemp(prefix='at')
     fileh = os.fdopen(filed, 'w')
@@ -151,7 +304,10 @@ def main():
                        type='str'),
             unique=dict(required=False,
                         default=False,
-                        type='bool')
+                        type='bool'),
+            index_file=dict(required=False,
+                            default=None,
+                            type='str')
         ),
         mutually_exclusive=[['command', 'script_file']],
         required_one_of=[['command', 'script_file']],
@@ -166,6 +322,7 @@ def main():
     units          = module.params['units']
     state          = module.params['state']
     unique         = module.params['unique']
+    index_file     = module.params['index_file']
 
     if (state == 'present') and (not count or not units):
         module.fail_json(msg="present state requires count and units")
@@ -176,13 +333,15 @@ def main():
     if command:
         script_file = create_tempfile(command)
 
+    index = AtJobIndex(module, at_cmd, index_file)
+
     # if absent remove existing and return
     if state == 'absent':
-        delete_job(module, result, at_cmd, command, script_file)
+        delete_job(module, result, at_cmd, command, script_file, index)
 
     # if unique if existing return unchanged
     if unique:
-        if len(get_matching_jobs(module, at_cmd, script_file)) != 0:
+        if len(index.matching(script_file)) != 0:
             if command:
                 os.unlink(script_file)
             module.exit_json(**result)
@@ -40,6 +40,37 @@ options:
         description:
             - key from which to return values from the specified database, otherwise the
               full contents are returned.
+    keys:
+        required: False
+        default: None
+        version_added: "2.0"
+        description:
+            - list of keys to look up in the specified database. They are resolved with as few
+              getent calls as possible instead of one task per key. Mutually exclusive with C(key).
+            - Missing keys are found by comparing them with the first field of the returned
+              entries, so they should be given in that form (e.g. user names, not uids).
+    fields:
+        required: False
+        default: None
+        version_added: "2.0"
+        description:
+            - list of fields to return for each entry instead of all of them, given by position
+              (0 being the key itself) or, for passwd, shadow, group and gshadow, by name
+              (e.g. C(uid), C(home), C(members)).
+    match:
+        required: False
+        default: None
+        version_added: "2.0"
+        description:
+            - regular expression, only entries whose raw line matches it are returned, so
+              that only those are turned into facts on large databases.
+    max_entries:
+        required: False
+        default: None
+        version_added: "2.0"
+        description:
+            - stop reading after this many matching entries and return them, to bound the size
+              of the facts on large directory services.
     split:
         required: False
         default: None
@@ -78,16 +109,109 @@ EXAMPLES = '''
 - getent: database=shadow key=www-data split=:
 - debug: var=getent_shadow
 
+# check many users at once, only keeping uid and home
+- getent:
+    database: passwd
+    keys: "{{ users }}"
+    fields: [ uid, home ]
+    fail_key: False
+- debug: var=getent_passwd
+
+# scan a large LDAP backed group database for the admin groups only
+- getent: database=group match='^adm' max_entries=100
+
 '''
 
+import os
+import re
+import signal
+import subprocess
+import tempfile
+
+# maximum number of keys passed to a single getent call
+KEYS_PER_CALL = 500
+
+FIELD_NAMES = {
+    'passwd':  [ 'name', 'password', 'uid', 'gid', 'gecos', 'home', 'shell' ],
+    'shadow':  [ 'name', 'password', 'lastchg', 'min', 'max', 'warn', 'inactive', 'expire', 'flag' ],
+    'group':   [ 'name', 'password', 'gid', 'members' ],
+    'gshadow': [ 'name', 'password', 'admins', 'members' ],
+}
+
+def field_positions(module, database, fields):
+    positions = []
+    names = FIELD_NAMES.get(database, [])
+    for field in fields:
+        field = str(field)
+        if field.isdigit():
+            positions.append(int(field))
+        elif field in names:
+            positions.append(names.index(field))
+        else:
+            module.fail_json(msg="Unknown field '%s' for database %s" % (field, database))
+    return positions
+
+def run_getent(module, cmd, split, match, positions, max_entries, entries, seen=None):
+    """ Streams the getent output line by line into entries, returns the rc and whether
+        the output was cut short by max_entries, in which case getent is killed. The key
+        of every line is added to seen, if given. stderr goes to a temporary file so
+        that getent never blocks on it while stdout is read. """
+    try:
+        errf = tempfile.TemporaryFile()
+        cmd = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errf, close_fds=True)
+    except (OSError, IOError), e:
+        module.fail_json(msg=str(e))
+
+    truncated = False
+    for line in iter(cmd.stdout.readline, ''):
+        line = line.rstrip('\n')
+        if not line:
+            continue
+        record = line.split(split)
+        if seen is not None:
+            seen.add(record[0])
+        if match is not None and not match.search(line):
+            continue
+        if max_entries is not None and len(entries) >= max_entries:
+            truncated = True
+            break
+        if positions is None:
+            entries[record[0]] = record[1:]
+        else:
+            fields = []
+            for i in positions:
+                if i < len(record):
+                    fields.append(record[i])
+                else:
+                    fields.append(None)
+            entries[record[0]] = fields
+
+    if truncated:
+        try:
+            os.kill(cmd.pid, signal.SIGTERM)
+        except OSError:
+            # already done
+            pass
+    cmd.stdout.close()
+    rc = cmd.wait()
+    errf.close()
+    if truncated:
+        rc = 0
+    return rc, truncated
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
             database = dict(required=True),
             key      = dict(required=False, default=None),
+            keys     = dict(required=False, default=None, type='list'),
+            fields   = dict(required=False, default=None, type='list'),
+            match    = dict(required=False, default=None),
+            max_entries = dict(required=False, default=None, type='int'),
             split    = dict(required=False, default=None),
             fail_key = dict(required=False, type='bool', default=True),
         ),
+        mutually_exclusive = [ ['key', 'keys'] ],
         supports_check_mode = True,
     )
 
@@ -95,42 +219,70 @@ def main():
 
     database = module.params['database']
     key      = module.params.get('key')
+    keys     = module.params.get('keys')
     split    = module.params.get('split')
     fail_key = module.params.get('fail_key')
+    fields   = module.params.get('fields')
+    match    = module.params.get('match')
+    max_entries = module.params.get('max_entries')
 
     getent_bin = module.get_bin_path('getent', True)
 
     if key is not None:
-        cmd = [ getent_bin, database, key ]
-    else:
-        cmd = [ getent_bin, database ]
+        keys = [ key ]
 
     if split is None and database in colon:
         split = ':'
 
-    try:
-        rc, out, err = module.run_command(cmd)
-    except Exception, e:
-        module.fail_json(msg=str(e))
+    positions = None
+    if fields:
+        positions = field_positions(module, database, fields)
+
+    if match is not None:
+        try:
+            match = re.compile(match)
+        except re.error, e:
+            module.fail_json(msg="Invalid match expression '%s': %s" % (match, str(e)))
 
     msg = "Unexpected failure!"
     dbtree = 'getent_%s' % database
     results = { dbtree: {} }
+    truncated = False
 
-    if rc == 0:
-        for line in out.splitlines():
-            record = line.split(split)
-            results[dbtree][record[0]] = record[1:]
+    if keys is None:
+        rc, truncated = run_getent(module, [ getent_bin, database ], split, match, positions, max_entries, results[dbtree])
+        missing = []
+    else:
+        # getent takes several keys at once and returns 2 if any of them is missing,
+        # those are the keys of the chunk which are not the key of a returned line
+        rc = 0
+        missing = []
+        for i in range(0, len(keys), KEYS_PER_CALL):
+            chunk = keys[i:i + KEYS_PER_CALL]
+            seen = set()
+            chunk_rc, truncated = run_getent(module, [ getent_bin, database ] + chunk, split, match, positions, max_entries, results[dbtree], seen)
+            if truncated:
+                break
+            if chunk_rc == 2:
+                missing.extend([ k for k in chunk if k not in seen ])
+                rc = 2
+            elif chunk_rc != 0:
+                rc = chunk_rc
+                break
 
-        module.exit_json(ansible_facts=results)
+    if rc == 0:
+        module.exit_json(ansible_facts=results, truncated=truncated)
 
     elif rc == 1:
         msg = "Missing arguments, or database unknown."
     elif rc == 2:
         msg = "One or more supplied key could not be found in the database."
         if not fail_key:
-            results[dbtree][key] = None
-            module.exit_json(ansible_facts=results, msg=msg)
+            for k in missing:
+                results[dbtree][k] = None
+            module.exit_json(ansible_facts=results, msg=msg, missing=missing)
+        if missing:
+            msg = "%s Missing: %s" % (msg, ', '.join(missing))
     elif rc == 3:
         msg = "Enumeration not supported on this database."
 
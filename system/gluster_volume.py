@@ -103,6 +103,7 @@ options:
 notes:
   - "Requires cli tools for GlusterFS on servers"
   - "Will add new bricks, but not remove them"
+  - "Requires Python 2.5 or newer, or the elementtree package on Python 2.4"
 author: "Taneli Leppä (@rosmo)"
 """
 
@@ -131,9 +132,18 @@ EXAMPLES = """
   run_once: true
 """
 
+import re
 import shutil
 import time
 import socket
+try:
+    from xml.etree import ElementTree
+except ImportError:
+    try:
+        # Python 2.4 only has the standalone elementtree package
+        from elementtree import ElementTree
+    except ImportError:
+        ElementTree = None
 
 glusterbin = ''
 
@@ -170,77 +180,107 @@ def run_gluster_yes(gargs):
         module.fail_json(msg='error running gluster (%s) command (rc=%d): %s' % (' '.join(args), rc, out or err))
     return out
 
-def get_peers():
-    out = run_gluster([ 'peer', 'status'])
-    i = 0
-    peers = {}
-    hostname = None
-    uuid = None
-    state = None
-    for row in out.split('\n'):
-        if ': ' in row:
-            key, value = row.split(': ')
-            if key.lower() == 'hostname':
-                hostname = value
-            if key.lower() == 'uuid':
-                uuid = value
-            if key.lower() == 'state':
-                state = value
-                peers[hostname] = [ uuid, state ]
-    return peers
+# gluster --xml reports the transport as a number
+TRANSPORT_TYPES = { '0': 'tcp', '1': 'rdma', '2': 'tcp,rdma' }
 
-def get_volumes():
-    out = run_gluster([ 'volume', 'info' ])
-
-    volumes = {}
-    volume = {}
-    for row in out.split('\n'):
-        if ': ' in row:
-            key, value = row.split(': ')
-            if key.lower() == 'volume name':
-                volume['name'] = value
-                volume['options'] = {}
-                volume['quota'] = False
-            if key.lower() == 'volume id':
-                volume['id'] = value
-            if key.lower() == 'status':
-                volume['status'] = value
-            if key.lower() == 'transport-type':
-                volume['transport'] = value
-            if key.lower() != 'bricks' and key.lower()[:5] == 'brick':
-                if not 'bricks' in volume:
-                    volume['bricks'] = []
-                volume['bricks'].append(value)
-            # Volume options
-            if '.' in key:
-                if not 'options' in volume:
-                    volume['options'] = {}
-                volume['options'][key] = value
-                if key == 'features.quota' and value == 'on':
-                    volume['quota'] = True
-        else:
-            if row.lower() != 'bricks:' and row.lower() != 'options reconfigured:':
-                if len(volume) > 0:
-                    volumes[volume['name']] = volume
-                volume = {}
-    return volumes
+QUOTA_UNITS = { 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4, 'PB': 1024 ** 5 }
 
-def get_quotas(name, nofail):
-    quotas = {}
+def run_gluster_xml(gargs, nofail=False):
     if nofail:
-        out = run_gluster_nofail([ 'volume', 'quota', name, 'list' ])
+        out = run_gluster_nofail(gargs + [ '--xml' ])
         if not out:
-            return quotas
+            return None
     else:
-        out = run_gluster([ 'volume', 'quota', name, 'list' ])
-    for row in out.split('\n'):
-        if row[:1] == '/':
-            q = re.split('\s+', row)
-            quotas[q[0]] = q[1]
-    return quotas
+        out = run_gluster(gargs + [ '--xml' ])
+    try:
+        root = ElementTree.fromstring(out)
+    except Exception, e:
+        if nofail:
+            return None
+        module.fail_json(msg='error parsing gluster (%s) xml output: %s' % (' '.join(gargs), str(e)))
+    if root.findtext('opRet', '0') != '0':
+        if nofail:
+            return None
+        module.fail_json(msg='error running gluster (%s) command: %s' % (' '.join(gargs), root.findtext('opErrstr')))
+    return root
+
+class GlusterState(object):
+    """Snapshot of the gluster peers, volumes and quotas.
+
+    Each part is read with a single gluster --xml command and kept until
+    one of the module's own mutations invalidates it.
+    """
+
+    def __init__(self):
+        self.cache = {}
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.cache.pop(key, None)
+
+    def peers(self):
+        if 'peers' not in self.cache:
+            peers = {}
+            root = run_gluster_xml([ 'peer', 'status' ])
+            for peer in root.findall('peerStatus/peer'):
+                peers[peer.findtext('hostname')] = [ peer.findtext('uuid'), peer.findtext('stateStr') ]
+            self.cache['peers'] = peers
+        return self.cache['peers']
+
+    def volumes(self):
+        if 'volumes' not in self.cache:
+            volumes = {}
+            root = run_gluster_xml([ 'volume', 'info' ])
+            for vol in root.findall('volInfo/volumes/volume'):
+                volume = {}
+                volume['name'] = vol.findtext('name')
+                volume['id'] = vol.findtext('id')
+                volume['status'] = vol.findtext('statusStr')
+                volume['transport'] = TRANSPORT_TYPES.get(vol.findtext('transport'), vol.findtext('transport'))
+                volume['bricks'] = []
+                for brick in vol.findall('bricks/brick'):
+                    volume['bricks'].append(brick.findtext('name') or (brick.text or '').strip())
+                volume['options'] = {}
+                for option in vol.findall('options/option'):
+                    volume['options'][option.findtext('name')] = option.findtext('value')
+                volume['quota'] = volume['options'].get('features.quota') == 'on'
+                volumes[volume['name']] = volume
+            self.cache['volumes'] = volumes
+        return self.cache['volumes']
+
+    def quotas(self, name, nofail):
+        key = ('quotas', name)
+        if key not in self.cache:
+            quotas = {}
+            root = run_gluster_xml([ 'volume', 'quota', name, 'list' ], nofail)
+            if root is None:
+                return quotas
+            for limit in root.findall('volQuota/limit'):
+                quotas[limit.findtext('path')] = limit.findtext('hard_limit')
+            self.cache[key] = quotas
+        return self.cache[key]
+
+gluster_state = GlusterState()
+
+def get_peers():
+    return gluster_state.peers()
+
+def get_volumes():
+    return gluster_state.volumes()
+
+def get_quotas(name, nofail):
+    return gluster_state.quotas(name, nofail)
+
+def quota_bytes(value):
+    # gluster may report limits in bytes while they are given as e.g. 20.0MB
+    match = re.match('^\s*([0-9.]+)\s*([KMGTP]?B)?\s*$', str(value), re.I)
+    if not match:
+        return value
+    return int(float(match.group(1)) * QUOTA_UNITS[(match.group(2) or 'B').upper()])
 
 def wait_for_peer(host):
     for x in range(0, 4):
+        gluster_state.invalidate('peers')
         peers = get_peers()
         if host in peers and peers[host][1].lower().find('peer in cluster') != -1:
             return True
@@ -250,6 +290,7 @@ def wait_for_peer(host):
 def probe(host, myhostname):
     global module
     run_gluster([ 'peer', 'probe', host ])
+    gluster_state.invalidate('peers')
     if not wait_for_peer(host):
         module.fail_json(msg='failed to probe peer %s on %s' % (host, myhostname))
     changed = True
@@ -279,30 +320,42 @@ def create_volume(name, stripe, replica, transport, hosts, bricks, force):
     if force:
         args.append('force')
     run_gluster(args)
+    gluster_state.invalidate('volumes')
 
 def start_volume(name):
     run_gluster([ 'volume', 'start', name ])
+    gluster_state.invalidate('volumes')
 
 def stop_volume(name):
     run_gluster_yes([ 'volume', 'stop', name ])
+    gluster_state.invalidate('volumes')
+
+def delete_volume(name):
+    run_gluster_yes([ 'volume', 'delete', name ])
+    gluster_state.invalidate('volumes', ('quotas', name))
 
 def set_volume_option(name, option, parameter):
     run_gluster([ 'volume', 'set', name, option, parameter ])
+    gluster_state.invalidate('volumes')
 
-def add_brick(name, brick, force):
-    args = [ 'volume', 'add-brick', name, brick ]
+def add_bricks(name, bricks, force):
+    # all of the new bricks are added with a single add-brick
+    args = [ 'volume', 'add-brick', name ] + bricks
     if force:
         args.append('force')
     run_gluster(args)
+    gluster_state.invalidate('volumes')
 
 def do_rebalance(name):
     run_gluster([ 'volume', 'rebalance', name, 'start' ])
 
 def enable_quota(name):
     run_gluster([ 'volume', 'quota', name, 'enable' ])
+    gluster_state.invalidate('volumes', ('quotas', name))
 
 def set_quota(name, directory, value):
     run_gluster([ 'volume', 'quota', name, 'limit-usage', directory, value ])
+    gluster_state.invalidate(('quotas', name))
 
 
 def main():
@@ -328,6 +381,9 @@ def main():
             )
         )
 
+    if ElementTree is None:
+        module.fail_json(msg='ElementTree is required to read the output of gluster --xml, use Python 2.5 or newer or install the elementtree package')
+
     global glusterbin
     glusterbin = module.get_bin_path('gluster', True)
 
@@ -375,7 +431,7 @@ def main():
         if volume_name in volumes:
             if volumes[volume_name]['status'].lower() != 'stopped':
                 stop_volume(volume_name)
-            run_gluster_yes([ 'volume', 'delete', volume_name ])
+            delete_volume(volume_name)
             changed = True
 
     if action == 'present':
@@ -408,8 +464,8 @@ def main():
                 if brick not in all_bricks:
                     removed_bricks.append(brick)
 
-            for brick in new_bricks:
-                add_brick(volume_name, brick, force)
+            if new_bricks:
+                add_bricks(volume_name, new_bricks, force)
                 changed = True
 
             # handle quotas
@@ -417,8 +473,9 @@ def main():
                 if not volumes[volume_name]['quota']:
                     enable_quota(volume_name)
                 quotas = get_quotas(volume_name, False)
-                if directory not in quotas or quotas[directory] != quota:
+                if directory not in quotas or quota_bytes(quotas[directory]) != quota_bytes(quota):
                     set_quota(volume_name, directory, quota)
+                    quotas = get_quotas(volume_name, False)
                     changed = True
 
             # set options
@@ -444,6 +501,7 @@ def main():
             changed = True
 
     if changed:
+        # only re-read when one of the mutations above invalidated the state
         volumes = get_volumes()
         if rebalance:
             do_rebalance(volume_name)
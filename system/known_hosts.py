@@ -25,14 +25,15 @@ short_description: Add or remove a host from the C(known_hosts) file
 description:
    - The M(known_hosts) module lets you add or remove a host from the C(known_hosts) file. 
      This is useful if you're going to want to use the M(git) module over ssh, for example. 
-     If you have a very large number of host keys to manage, you will find the M(template) module more useful.
+     If you have a very large number of host keys to manage, pass them all at once with I(hosts).
 version_added: "1.9"
 options:
   name:
     aliases: [ 'host' ]
     description:
       - The host to add or remove (must match a host specified in key)
-    required: true
+      - Required unless I(hosts) is given.
+    required: false
     default: null
   key:
     description:
@@ -50,6 +51,15 @@ options:
     choices: [ "present", "absent" ]
     required: no
     default: present
+  hosts:
+    description:
+      - List of hosts to add or remove, each a dict with a I(name) and optionally a I(key)
+        and a I(state), which defaults to the module's I(state). The file is read once and
+        all of the additions, replacements and removals are written with a single rewrite.
+      - Mutually exclusive with I(name) and I(key).
+    required: no
+    default: null
+    version_added: "2.0"
 requirements: [ ]
 author: "Matthew Vernon (@mcv21)"
 '''
@@ -60,6 +70,14 @@ EXAMPLES = '''
   known_hosts: path='/etc/ssh/ssh_known_hosts'
                host='foo.com.invalid'
                key="{{ lookup('file', 'pubkeys/foo.com.invalid') }}"
+
+# Manage the keys of a whole fleet with a single rewrite of the file
+- known_hosts:
+    path: /etc/ssh/ssh_known_hosts
+    hosts:
+      - { name: 'foo.com.invalid', key: "{{ lookup('file', 'pubkeys/foo.com.invalid') }}" }
+      - { name: 'bar.com.invalid', key: "{{ lookup('file', 'pubkeys/bar.com.invalid') }}" }
+      - { name: 'old.com.invalid', state: absent }
 '''
 
 # Makes sure public host keys are present or absent in the given known_hosts
@@ -71,26 +89,171 @@ EXAMPLES = '''
 #    key = line(s) to add to known_hosts file
 #    path = the known_hosts file to edit (default: ~/.ssh/known_hosts)
 #    state = absent|present (default: present)
+#    hosts = list of dicts with name, key and state, all applied at once
 
 import os
 import os.path
 import tempfile
 import errno
+import base64
+import fnmatch
+import hmac
+
+try:
+    from hashlib import sha1
+except ImportError:
+    import sha as sha1
+
+def match_pattern(host, pattern):
+    #Only * and ? are wildcards, [ is literal as in [host]:port
+    if '*' in pattern or '?' in pattern:
+        return fnmatch.fnmatchcase(host, pattern.replace('[', '[[]'))
+    return host == pattern
+
+class KnownHostsEntry(object):
+    """
+    One line of a known_hosts file. Lines which are not host keys (comments,
+    blank lines) have no key and never match a host.
+    """
 
-def enforce_state(module, params):
+    def __init__(self, line):
+        self.line = line
+        self.marker = None
+        self.hosts = None
+        self.key = None
+        self.salted = None
+        self.pattern = False
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            return
+        #The optional "marker" field, used for @cert-authority or @revoked
+        if fields[0].startswith('@'):
+            self.marker = fields.pop(0)
+        if len(fields) < 3:
+            return
+        self.hosts = fields[0]
+        self.key = (self.marker, fields[1], fields[2])
+        self.pattern = len([c for c in self.hosts if c in '*?!']) > 0
+        if self.hosts.startswith('|1|'):
+            try:
+                salt, digest = self.hosts[3:].split('|')
+                self.salted = (hmac.new(base64.b64decode(salt), digestmod=sha1),
+                               base64.b64decode(digest))
+            except (ValueError, TypeError):
+                self.key = None
+
+    def matches(self, host):
+        if self.key is None:
+            return False
+        if self.salted is not None:
+            mac = self.salted[0].copy()
+            mac.update(host)
+            return mac.digest() == self.salted[1]
+        host = host.lower()
+        found = False
+        for pattern in self.hosts.lower().split(','):
+            if pattern.startswith('!'):
+                if match_pattern(host, pattern[1:]):
+                    return False
+            elif match_pattern(host, pattern):
+                found = True
+        return found
+
+class KnownHosts(object):
+    """
+    A known_hosts file, parsed once and edited in memory.
+
+    Plain host names are indexed, hashed (|1|) entries and wildcard patterns
+    have to be checked line by line but each host is only looked up once.
+    """
+
+    def __init__(self, module, path):
+        self.module = module
+        self.path = path
+        self.exists = True
+        self.entries = []
+        self.index = {}
+        self.patterns = []
+        self.lookups = {}
+        self.changed = False
+        try:
+            inf=open(path,"r")
+        except IOError, e:
+            if e.errno == errno.ENOENT:
+                self.exists = False
+                return
+            module.fail_json(msg="Failed to read %s: %s" % (path,str(e)))
+        for line in inf:
+            self.append(line)
+        inf.close()
+
+    def append(self, line):
+        if not line.endswith('\n'):
+            line+='\n'
+        entry = KnownHostsEntry(line)
+        self.entries.append(entry)
+        if entry.key is None:
+            return
+        if entry.salted is None and not entry.pattern:
+            for name in entry.hosts.lower().split(','):
+                self.index.setdefault(name, []).append(entry)
+        else:
+            self.patterns.append(entry)
+        self.lookups.clear()
+
+    def lookup(self, host):
+        """Returns the entries matching host"""
+        if host not in self.lookups:
+            found = [e for e in self.index.get(host.lower(), []) if e.key is not None]
+            found.extend([e for e in self.patterns if e.matches(host)])
+            self.lookups[host] = found
+        return self.lookups[host]
+
+    def host_entries(self, host):
+        """Returns the plain key entries of host itself, as ssh-keygen -R
+        would remove them: @cert-authority and @revoked lines and wildcard
+        patterns are left alone"""
+        return [e for e in self.lookup(host) if e.marker is None and not e.pattern]
+
+    def add(self, host, key):
+        current_keys = set([e.key for e in self.lookup(host)])
+        for line in key.splitlines():
+            if line.strip() and KnownHostsEntry(line).key not in current_keys:
+                self.append(line)
+        self.changed = True
+
+    def remove(self, host):
+        for entry in self.host_entries(host):
+            entry.key = None
+            entry.line = None
+        self.lookups.clear()
+        self.changed = True
+
+    def write(self):
+        try:
+            outf=tempfile.NamedTemporaryFile(dir=os.path.dirname(self.path))
+            for entry in self.entries:
+                if entry.line is not None:
+                    outf.write(entry.line)
+            outf.flush()
+            self.module.atomic_move(outf.name,self.path)
+        except (IOError,OSError),e:
+            self.module.fail_json(msg="Failed to write to file %s: %s" % \
+                                      (self.path,str(e)))
+
+        try:
+            outf.close()
+        except:
+            pass
+
+def enforce_state(module, params, known_hosts):
     """
     Add or remove key.
     """
 
     host = params["name"]
     key = params.get("key",None)
-    port = params.get("port",None)
-    #expand the path parameter; otherwise module.add_path_info
-    #(called by exit_json) unhelpfully says the unexpanded path is absent.
-    path = os.path.expanduser(params.get("path"))
     state = params.get("state")
-    #Find the ssh-keygen binary
-    sshkeygen = module.get_bin_path("ssh-keygen",True)
 
     #trailing newline in files gets lost, so re-add if necessary
     if key is not None and key[-1]!='\n':
@@ -99,154 +262,129 @@ def enforce_state(module, params):
     if key is None and state != "absent":
         module.fail_json(msg="No key specified when adding a host")
 
-    sanity_check(module,host,key,sshkeygen)
+    sanity_check(module,host,key)
 
-    current,replace=search_for_host_key(module,host,key,path,sshkeygen)
+    current,replace=search_for_host_key(module,host,key,known_hosts)
 
     #We will change state if current==True & state!="present"
     #or current==False & state=="present"
     #i.e (current) XOR (state=="present")
     #Alternatively, if replace is true (i.e. key present, and we must change it)
-    if module.check_mode:
-        module.exit_json(changed = replace or ((state=="present") != current))
+    changed = replace or ((state=="present") != current)
 
-    #Now do the work.
+    #Now do the work, in memory; the file is written once all hosts are done.
 
     #First, remove an extant entry if required
     if replace==True or (current==True and state=="absent"):
-        module.run_command([sshkeygen,'-R',host,'-f',path],
-                           check_rc=True)
-        params['changed'] = True
+        known_hosts.remove(host)
     #Next, add a new (or replacing) entry
     if replace==True or (current==False and state=="present"):
-        try:
-            inf=open(path,"r")
-        except IOError, e:
-            if e.errno == errno.ENOENT:
-                inf=None
-            else:
-                module.fail_json(msg="Failed to read %s: %s" % \
-                                     (path,str(e)))
-        try:
-            outf=tempfile.NamedTemporaryFile(dir=os.path.dirname(path))
-            if inf is not None:
-                for line in inf:
-                    outf.write(line)
-                inf.close()
-            outf.write(key)
-            outf.flush()
-            module.atomic_move(outf.name,path)
-        except (IOError,OSError),e:
-            module.fail_json(msg="Failed to write to file %s: %s" % \
-                                 (path,str(e)))
-
-        try:
-            outf.close()
-        except:
-            pass
+        known_hosts.add(host, key)
 
-        params['changed'] = True
+    return changed
 
-    return params
-
-def sanity_check(module,host,key,sshkeygen):
+def sanity_check(module,host,key):
     '''Check supplied key is sensible
 
     host and key are parameters provided by the user; If the host
     provided is inconsistent with the key supplied, then this function
     quits, providing an error to the user.
-    sshkeygen is the path to ssh-keygen, found earlier with get_bin_path
     '''
     #If no key supplied, we're doing a removal, and have nothing to check here.
     if key is None:
         return
-    #Rather than parsing the key ourselves, get ssh-keygen to do it
-    #(this is essential for hashed keys, but otherwise useful, as the
-    #key question is whether ssh-keygen thinks the key matches the host).
-
-    #The approach is to write the key to a temporary file,
-    #and then attempt to look up the specified host in that file.
-    try:
-        outf=tempfile.NamedTemporaryFile()
-        outf.write(key)
-        outf.flush()
-    except IOError,e:
-        module.fail_json(msg="Failed to write to temporary file %s: %s" % \
-                             (outf.name,str(e)))
-    rc,stdout,stderr=module.run_command([sshkeygen,'-F',host,
-                                         '-f',outf.name],
-                                        check_rc=True)
-    try:
-        outf.close()
-    except:
-        pass
-
-    if stdout=='': #host not found
-        module.fail_json(msg="Host parameter does not match hashed host field in supplied key")
-
-def search_for_host_key(module,host,key,path,sshkeygen):
-    '''search_for_host_key(module,host,key,path,sshkeygen) -> (current,replace)
-
-    Looks up host in the known_hosts file path; if it's there, looks to see
+    #The key question is whether the host matches the host field of one of the
+    #supplied key lines, which for hashed keys means computing the hash.
+    for line in key.splitlines():
+        if KnownHostsEntry(line).matches(host):
+            return
+
+    module.fail_json(msg="Host parameter does not match hashed host field in supplied key")
+
+def search_for_host_key(module,host,key,known_hosts):
+    '''search_for_host_key(module,host,key,known_hosts) -> (current,replace)
+
+    Looks up host in the known_hosts file; if it's there, looks to see
     if one of those entries matches key. Returns:
     current (Boolean): is host found in path?
     replace (Boolean): is the key in path different to that supplied by user?
     if current=False, then replace is always False.
-    sshkeygen is the path to ssh-keygen, found earlier with get_bin_path
     '''
-    replace=False
-    if os.path.exists(path)==False:
-        return False, False
-    #openssh >=6.4 has changed ssh-keygen behaviour such that it returns
-    #1 if no host is found, whereas previously it returned 0
-    rc,stdout,stderr=module.run_command([sshkeygen,'-F',host,'-f',path],
-                                 check_rc=False)
-    if stdout=='' and stderr=='' and (rc==0 or rc==1):
-        return False, False #host not found, no other errors
-    if rc!=0: #something went wrong
-        module.fail_json(msg="ssh-keygen failed (rc=%d,stdout='%s',stderr='%s')" % (rc,stdout,stderr))
+    #Marker lines and wildcard patterns are never replaced or removed, so
+    #only the host's own plain entries make it current
+    entries=known_hosts.host_entries(host)
 
 #If user supplied no key, we don't want to try and replace anything with it
     if key is None:
-        return True, False
-
-    lines=stdout.split('\n')
-    k=key.strip() #trim trailing newline
-    #ssh-keygen returns only the host we ask about in the host field,
-    #even if the key entry has multiple hosts. Emulate this behaviour here,
-    #otherwise we get false negatives.
-    #Only necessary for unhashed entries.
-    if k[0] !='|':
-        k=k.split()
-        #The optional "marker" field, used for @cert-authority or @revoked
-        if k[0][0] == '@':
-            k[1]=host
-        else:
-            k[0]=host
-        k=' '.join(k)
-    for l in lines:
-        if l=='': 
+        return len(entries) > 0, False
+
+    #Entries match on the key itself, the host field may list other hosts
+    #or be hashed with a different salt. Supplied marker or pattern lines
+    #are looked for among all of the lines matching host.
+    plain_keys=set([e.key for e in entries])
+    all_keys=set([e.key for e in known_hosts.lookup(host)])
+    missing=False
+    for line in key.splitlines():
+        entry=KnownHostsEntry(line)
+        if entry.key is None:
             continue
-        if l[0]=='#': #comment
-            continue
-        if k==l: #found a match
-            return True, False #current, not-replace
-    #No match found, return current and replace
-    return True, True
+        if entry.marker is None and not entry.pattern:
+            if entry.key not in plain_keys:
+                missing=True
+        elif entry.key not in all_keys:
+            missing=True
+    if not entries:
+        #host not found, unless every supplied line is already there
+        return not missing, False
+    return True, missing #current, replace if a key differs
 
 def main():
 
     module = AnsibleModule(
         argument_spec = dict(
-            name      = dict(required=True,  type='str', aliases=['host']),
+            name      = dict(required=False, type='str', aliases=['host']),
             key       = dict(required=False,  type='str'),
             path      = dict(default="~/.ssh/known_hosts", type='str'),
             state     = dict(default='present', choices=['absent','present']),
+            hosts     = dict(required=False, type='list'),
             ),
+        required_one_of = [ ['name', 'hosts'] ],
+        mutually_exclusive = [ ['name', 'hosts'], ['key', 'hosts'] ],
         supports_check_mode = True
         )
 
-    results = enforce_state(module,module.params)
+    #expand the path parameter; otherwise module.add_path_info
+    #(called by exit_json) unhelpfully says the unexpanded path is absent.
+    path = os.path.expanduser(module.params['path'])
+    known_hosts = KnownHosts(module, path)
+
+    if module.params['hosts'] is None:
+        params = module.params
+        params['changed'] = enforce_state(module, params, known_hosts)
+        results = params
+    else:
+        host_keys = [ 'name', 'host', 'key', 'state' ]
+        hosts = []
+        for spec in module.params['hosts']:
+            if not isinstance(spec, dict):
+                spec = { 'name': spec }
+            unknown = [ k for k in spec.keys() if k not in host_keys ]
+            if unknown:
+                module.fail_json(msg="Unsupported parameters in hosts: %s" % ', '.join(unknown))
+            params = { 'name': spec.get('name', spec.get('host')),
+                       'key': spec.get('key'),
+                       'state': spec.get('state', module.params['state']) }
+            if not params['name']:
+                module.fail_json(msg="Every entry of hosts needs a name")
+            if params['state'] not in ('absent', 'present'):
+                module.fail_json(msg="state of host %s must be one of: absent, present" % params['name'])
+            params['changed'] = enforce_state(module, params, known_hosts)
+            hosts.append(params)
+        results = dict(path=path, state=module.params['state'], hosts=hosts,
+                       changed=len([h for h in hosts if h['changed']]) > 0)
+
+    if known_hosts.changed and not module.check_mode:
+        known_hosts.write()
     module.exit_json(**results)
 
 # import module snippets
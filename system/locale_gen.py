@@ -5,6 +5,8 @@ import os
 import os.path
 from subprocess import Popen, PIPE, call
 import re
+import tempfile
+import threading
 
 DOCUMENTATION = '''
 ---
@@ -18,6 +20,8 @@ options:
     name:
         description:
              - Name and encoding of the locale, such as "en_GB.UTF-8".
+             - Since 2.0 a list of locales may be given, /etc/locale.gen is then rewritten
+               once and only the locales which changed are compiled.
         required: true
         default: null
         aliases: []
@@ -27,11 +31,22 @@ options:
       required: false
       choices: ["present", "absent"]
       default: "present"
+    workers:
+      description:
+           - Number of locales compiled in parallel with localedef.
+      required: false
+      default: 1
+      version_added: "2.0"
 '''
 
 EXAMPLES = '''
 # Ensure a locale exists.
 - locale_gen: name=de_CH.UTF-8 state=present
+
+# Ensure several locales exist, compiling up to 4 at a time.
+- locale_gen:
+    name: [ de_CH.UTF-8, fr_CH.UTF-8, it_CH.UTF-8, en_GB.UTF-8 ]
+    workers: 4
 '''
 
 LOCALE_NORMALIZATION = {
@@ -39,15 +54,20 @@ LOCALE_NORMALIZATION = {
     ".eucjp": ".EUC-JP",
 }
 
+# passed to localedef by Debian's locale-gen
+LOCALE_ALIAS = "/usr/share/locale/locale.alias"
+
+# localedef exits with 1 when -c made it write a locale despite warnings
+LOCALEDEF_WARNINGS = 1
+
 # ===========================================
 # location module specific support methods.
 #
 
-def is_available(name, ubuntuMode):
-    """Check if the given locale is available on the system. This is done by
-    checking either :
-    * if the locale is present in /etc/locales.gen
-    * or if the locale is present in /usr/share/i18n/SUPPORTED"""
+def available_locales(ubuntuMode):
+    """Returns the set of locales available on the system, those listed either:
+    * in /etc/locales.gen
+    * or in /usr/share/i18n/SUPPORTED"""
     if ubuntuMode:
         __regexp = '^(?P<locale>\S+_\S+) (?P<charset>\S+)\s*$'
         __locales_available = '/usr/share/i18n/SUPPORTED'
@@ -56,18 +76,21 @@ def is_available(name, ubuntuMode):
         __locales_available = '/etc/locale.gen'
 
     re_compiled = re.compile(__regexp)
+    locales = set()
     fd = open(__locales_available, 'r')
-    for line in fd:
-        result = re_compiled.match(line)
-        if result and result.group('locale') == name:
-            return True
-    fd.close()
-    return False
-
-def is_present(name):
-    """Checks if the given locale is currently installed."""
+    try:
+        for line in fd:
+            result = re_compiled.match(line)
+            if result:
+                locales.add(result.group('locale'))
+    finally:
+        fd.close()
+    return locales
+
+def present_locales():
+    """Returns the set of currently installed locales."""
     output = Popen(["locale", "-a"], stdout=PIPE).communicate()[0]
-    return any(fix_case(name) == fix_case(line) for line in output.splitlines())
+    return set(fix_case(line) for line in output.splitlines())
 
 def fix_case(name):
     """locale -a might return the encoding in either lower or upper case.
@@ -76,81 +99,139 @@ def fix_case(name):
         name = name.replace(s, r)
     return name
 
-def replace_line(existing_line, new_line):
-    """Replaces lines in /etc/locale.gen"""
-    try:
-        f = open("/etc/locale.gen", "r")
-        lines = [line.replace(existing_line, new_line) for line in f]
-    finally:
-        f.close()
+def archive_name(name):
+    """Returns the name of a locale in the locale archive, where the codeset is
+    lower case without punctuation as glibc normalizes it, such as de_CH.utf8
+    for de_CH.UTF-8. localedef --delete-from-archive only takes these names."""
+    result = re.match('^(?P<language>[^.@]*)(\\.(?P<codeset>[^@]*))?(?P<modifier>@.*)?$', name)
+    if not result or not result.group('codeset'):
+        return name
+    codeset = ''.join([c for c in result.group('codeset').lower() if c.isalnum()])
+    if codeset.isdigit():
+        codeset = 'iso' + codeset
+    return '%s.%s%s' % (result.group('language'), codeset, result.group('modifier') or '')
+
+def write_lines(module, path, lines):
+    """Atomically replaces the content of path."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    f = os.fdopen(fd, 'w')
     try:
-        f = open("/etc/locale.gen", "w")
         f.write("".join(lines))
     finally:
         f.close()
+    module.atomic_move(tmp, path)
 
-def set_locale(name, enabled=True):
-    """ Sets the state of the locale. Defaults to enabled. """
-    search_string = '#{0,1}\s*%s (?P<charset>.+)' % name
-    if enabled:
-        new_string = '%s \g<charset>' % (name)
-    else:
-        new_string = '# %s \g<charset>' % (name)
+def set_locales(module, enable, disable):
+    """ Enables and disables the given locales in /etc/locale.gen with a single
+    rewrite. Returns the charset of every locale that was touched. """
+    line_re = re.compile('^#{0,1}\s*(?P<locale>\S+) (?P<charset>.+)$')
+    charsets = {}
+    lines = []
+    f = open("/etc/locale.gen", "r")
     try:
-        f = open("/etc/locale.gen", "r")
-        lines = [re.sub(search_string, new_string, line) for line in f]
-    finally:
-        f.close()
-    try:
-        f = open("/etc/locale.gen", "w")
-        f.write("".join(lines))
+        for line in f:
+            result = line_re.match(line.rstrip('\n'))
+            if result and result.group('locale') in enable:
+                line = '%s %s\n' % (result.group('locale'), result.group('charset'))
+            elif result and result.group('locale') in disable:
+                line = '# %s %s\n' % (result.group('locale'), result.group('charset'))
+            if result:
+                charsets.setdefault(result.group('locale'), result.group('charset').strip())
+            lines.append(line)
     finally:
         f.close()
+    write_lines(module, "/etc/locale.gen", lines)
+    return charsets
+
+def compile_locales(module, names, charsets, workers):
+    """Compiles only the given locales, up to workers at a time. localedef
+    locks the locale archive while adding to it so it can run in parallel.
+    localedef is run with the same flags as Debian's locale-gen."""
+    localedef = module.get_bin_path('localedef')
+    if localedef is None:
+        return call("locale-gen")
+    options = ["-c"]
+    if os.path.exists(LOCALE_ALIAS):
+        options.extend(["-A", LOCALE_ALIAS])
+
+    pending = list(names)
+    failed = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            lock.acquire()
+            try:
+                if not pending:
+                    return
+                name = pending.pop(0)
+            finally:
+                lock.release()
+            # de_CH.UTF-8 and sr_RS.UTF-8@latin are built from de_CH and sr_RS@latin
+            source = re.sub('\\.[^@]*', '', name)
+            rc = call([localedef, "-i", source] + options + ["-f", charsets[name], name])
+            if rc not in [0, LOCALEDEF_WARNINGS]:
+                lock.acquire()
+                failed.append(rc)
+                lock.release()
+
+    threads = [threading.Thread(target=worker) for i in range(max(1, min(workers, len(names))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failed:
+        return failed[0]
+    return 0
 
-def apply_change(targetState, name):
-    """Create or remove locale.
+def apply_change(module, targetState, names, workers):
+    """Create or remove locales.
 
     Keyword arguments:
     targetState -- Desired state, either present or absent.
-    name -- Name including encoding such as de_CH.UTF-8.
+    names -- Names including encoding such as de_CH.UTF-8.
+    workers -- Number of locales compiled in parallel.
     """
     if targetState=="present":
-        # Create locale.
-        set_locale(name, enabled=True)
+        # Create locales.
+        charsets = set_locales(module, set(names), set())
+        localeGenExitValue = compile_locales(module, names, charsets, workers)
     else:
-        # Delete locale.
-        set_locale(name, enabled=False)
-    
-    localeGenExitValue = call("locale-gen")
+        # Delete locales.
+        set_locales(module, set(), set(names))
+        localedef = module.get_bin_path('localedef')
+        if localedef is None:
+            localeGenExitValue = call("locale-gen")
+        else:
+            localeGenExitValue = call([localedef, "--delete-from-archive"] + [archive_name(name) for name in names])
+
     if localeGenExitValue!=0:
         raise EnvironmentError(localeGenExitValue, "locale.gen failed to execute, it returned "+str(localeGenExitValue))
 
-def apply_change_ubuntu(targetState, name):
-    """Create or remove locale.
+def apply_change_ubuntu(module, targetState, names):
+    """Create or remove locales.
     
     Keyword arguments:
     targetState -- Desired state, either present or absent.
-    name -- Name including encoding such as de_CH.UTF-8.
+    names -- Names including encoding such as de_CH.UTF-8.
     """
     if targetState=="present":
-        # Create locale.
-        # Ubuntu's patched locale-gen automatically adds the new locale to /var/lib/locales/supported.d/local
-        localeGenExitValue = call(["locale-gen", name])
+        # Create locales.
+        # Ubuntu's patched locale-gen automatically adds the new locales to /var/lib/locales/supported.d/local
+        localeGenExitValue = call(["locale-gen"] + names)
     else:
-        # Delete locale involves discarding the locale from /var/lib/locales/supported.d/local and regenerating all locales.
+        # Delete locales involves discarding them from /var/lib/locales/supported.d/local and regenerating all locales.
         try:
             f = open("/var/lib/locales/supported.d/local", "r")
             content = f.readlines()
         finally:
             f.close()
-        try:
-            f = open("/var/lib/locales/supported.d/local", "w")
-            for line in content:
-                locale, charset = line.split(' ')
-                if locale != name:
-                    f.write(line)
-        finally:
-            f.close()
+        lines = []
+        for line in content:
+            locale, charset = line.split(' ')
+            if locale not in names:
+                lines.append(line)
+        write_lines(module, "/var/lib/locales/supported.d/local", lines)
         # Purge locales and regenerate.
         # Please provide a patch if you know how to avoid regenerating the locales to keep!
         localeGenExitValue = call(["locale-gen", "--purge"])
@@ -165,14 +246,16 @@ def main():
 
     module = AnsibleModule(
         argument_spec = dict(
-            name = dict(required=True),
+            name = dict(required=True, type='list'),
             state = dict(choices=['present','absent'], default='present'),
+            workers = dict(default=1, type='int'),
         ),
         supports_check_mode=True
     )
 
-    name = module.params['name']
+    names = module.params['name']
     state = module.params['state']
+    workers = module.params['workers']
 
     if not os.path.exists("/etc/locale.gen"):
         if os.path.exists("/var/lib/locales/supported.d/local"):
@@ -184,29 +267,34 @@ def main():
         # We found the common way to manage locales.
         ubuntuMode = False
 
-    if not is_available(name, ubuntuMode):
-        module.fail_json(msg="The locales you've entered is not available "
-                             "on your system.")
+    available = available_locales(ubuntuMode)
+    missing = [name for name in names if name not in available]
+    if missing:
+        module.fail_json(msg="The locales you've entered are not available "
+                             "on your system: %s" % ", ".join(missing))
 
-    if is_present(name):
-        prev_state = "present"
+    present = present_locales()
+    changed_locales = [name for name in names if (fix_case(name) in present) != (state == "present")]
+    changed = len(changed_locales) > 0
+
+    if len(names) == 1:
+        name = names[0]
     else:
-        prev_state = "absent"
-    changed = (prev_state!=state)
-    
+        name = names
+
     if module.check_mode:
-        module.exit_json(changed=changed)
+        module.exit_json(changed=changed, changed_locales=changed_locales)
     else:
         if changed:
             try:
                 if ubuntuMode==False:
-                    apply_change(state, name)
+                    apply_change(module, state, changed_locales, workers)
                 else:
-                    apply_change_ubuntu(state, name)
+                    apply_change_ubuntu(module, state, changed_locales)
             except EnvironmentError, e:
                 module.fail_json(msg=e.strerror, exitValue=e.errno)
 
-        module.exit_json(name=name, changed=changed, msg="OK")
+        module.exit_json(name=name, changed=changed, changed_locales=changed_locales, msg="OK")
 
 # import module snippets
 from ansible.module_utils.basic import *